@@ -0,0 +1,47 @@
+"""unique envelope event id
+
+Revision ID: 7da189799b30
+Revises: 0b6caeae586d
+Create Date: 2026-10-19 18:29:24.494672
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7da189799b30"
+down_revision: str | Sequence[str] | None = "0b6caeae586d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("envelopes") as batch_op:
+        batch_op.alter_column("event_id", existing_type=sa.VARCHAR(), nullable=True)
+
+    # envelopes without an event id must not collide in the unique index,
+    # older duplicates keep their row but lose the event id
+    op.execute("UPDATE envelopes SET event_id = NULL WHERE event_id = ''")
+    op.execute(
+        "UPDATE envelopes SET event_id = NULL WHERE id NOT IN "
+        "(SELECT MIN(id) FROM envelopes GROUP BY project_id, event_id)"
+    )
+    op.create_index(
+        "ix_envelopes_project_id_event_id",
+        "envelopes",
+        ["project_id", "event_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_envelopes_project_id_event_id", table_name="envelopes")
+    op.execute("UPDATE envelopes SET event_id = '' WHERE event_id IS NULL")
+    with op.batch_alter_table("envelopes") as batch_op:
+        batch_op.alter_column("event_id", existing_type=sa.VARCHAR(), nullable=False)
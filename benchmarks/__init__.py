@@ -0,0 +1,4 @@
+"""Ingest benchmarks: corpus generator, microbenchmarks and a load driver.
+
+Run `python -m benchmarks --help` from the repository root.
+"""
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# resentry settings require a telegram token, benchmarks never send alerts
+os.environ.setdefault("RESENTRY_TELEGRAM_TOKEN", "benchmark")
+
+from benchmarks import corpus, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Resentry ingest benchmarks"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_corpus_args(p):
+        p.add_argument("--count", type=int, default=2000, help="Envelopes to generate")
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--kinds", nargs="+", default=list(corpus.KINDS))
+        p.add_argument("--encodings", nargs="+", default=["identity", "gzip", "br"])
+        p.add_argument("--depth", type=int, default=30, help="Stack frames per error")
+
+    corpus_parser = subparsers.add_parser("corpus", help="Write envelope files")
+    add_corpus_args(corpus_parser)
+    corpus_parser.add_argument("directory", type=Path)
+
+    micro_parser = subparsers.add_parser("micro", help="Run microbenchmarks")
+    add_corpus_args(micro_parser)
+    micro_parser.add_argument("--repeat", type=int, default=5)
+    micro_parser.add_argument("--output", type=Path, help="Write results as JSON")
+
+    load_parser = subparsers.add_parser("load", help="Load a running instance")
+    add_corpus_args(load_parser)
+    load_parser.add_argument("--url", default="http://127.0.0.1:8000")
+    load_parser.add_argument("--project-id", type=int, required=True)
+    load_parser.add_argument("--key", required=True, help="Project DSN public key")
+    load_parser.add_argument("--duration", type=float, default=30.0)
+    load_parser.add_argument("--concurrency", type=int, default=32)
+    load_parser.add_argument("--output", type=Path, help="Write results as JSON")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.05, help="Allowed throughput drop"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        sys.exit(0 if stats.compare(args.old, args.new, args.threshold) else 1)
+
+    params = {
+        "count": args.count,
+        "seed": args.seed,
+        "kinds": args.kinds,
+        "encodings": args.encodings,
+        "depth": args.depth,
+    }
+    samples = corpus.generate(
+        args.count,
+        seed=args.seed,
+        kinds=tuple(args.kinds),
+        encodings=tuple(None if e == "identity" else e for e in args.encodings),
+        depth=args.depth,
+    )
+
+    if args.command == "corpus":
+        corpus.write_corpus(args.directory, samples)
+        print(f"Wrote {len(samples)} envelopes to {args.directory}")
+        return
+
+    if args.command == "micro":
+        from benchmarks import micro
+
+        results = micro.run(samples, repeat=args.repeat)
+        params["repeat"] = args.repeat
+    else:
+        from benchmarks import load
+
+        results, statuses = asyncio.run(
+            load.run(
+                args.url,
+                args.project_id,
+                args.key,
+                samples,
+                duration=args.duration,
+                concurrency=args.concurrency,
+            )
+        )
+        params |= {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "statuses": dict(statuses),
+        }
+        print(f"status codes: {dict(statuses)}")
+
+    for result in results:
+        print(result)
+    if args.output:
+        stats.write_results(args.output, args.command, results, **params)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Deterministic generator of realistic Sentry envelopes.
+
+The same seed always yields the same bytes, so results of different
+commits are measured on identical input.
+"""
+
+import gzip
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import brotli
+
+KINDS = ("error", "transaction", "attachment", "session")
+ENCODINGS = (None, "gzip", "br")
+
+BASE_TIME = datetime(2025, 1, 1, tzinfo=UTC)
+MODULES = ("app.views", "app.services", "app.repos", "django.core", "sqlalchemy.orm")
+EXCEPTIONS = ("ValueError", "KeyError", "TimeoutError", "IntegrityError")
+LEVELS = ("error", "error", "error", "warning", "fatal", "info")
+
+
+@dataclass(frozen=True)
+class Sample:
+    kind: str
+    encoding: str | None
+    body: bytes
+
+
+def _line(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _event_id(rng: random.Random) -> str:
+    return uuid.UUID(int=rng.getrandbits(128)).hex
+
+
+def _frames(rng: random.Random, depth: int) -> list[dict]:
+    return [
+        {
+            "filename": f"{module.replace('.', '/')}.py",
+            "module": module,
+            "function": f"handler_{rng.randrange(1000)}",
+            "lineno": rng.randrange(1, 2000),
+            "in_app": module.startswith("app"),
+            "context_line": "    result = self.process(request, *args, **kwargs)",
+            "pre_context": ["", "def call(self):", "    try:"],
+            "post_context": ["    except Exception:", "        raise", ""],
+            "vars": {"self": "<Handler>", "request": "<Request GET '/api/items'>"},
+        }
+        for module in (rng.choice(MODULES) for _ in range(depth))
+    ]
+
+
+def error_event(rng: random.Random, event_id: str, depth: int) -> dict:
+    exc_type = rng.choice(EXCEPTIONS)
+    return {
+        "event_id": event_id,
+        "level": rng.choice(LEVELS),
+        "platform": "python",
+        "server_name": f"web-{rng.randrange(8)}",
+        "environment": rng.choice(("production", "staging")),
+        "release": f"app@1.{rng.randrange(20)}.0",
+        "timestamp": (BASE_TIME + timedelta(seconds=rng.randrange(86400))).isoformat(),
+        "exception": {
+            "values": [
+                {
+                    "type": exc_type,
+                    "value": f"{exc_type} in request {rng.randrange(10**6)}",
+                    "stacktrace": {"frames": _frames(rng, depth)},
+                }
+            ]
+        },
+        "breadcrumbs": {
+            "values": [
+                {"category": "query", "message": "SELECT * FROM items WHERE id = %s"}
+                for _ in range(rng.randrange(5, 30))
+            ]
+        },
+        "tags": {"url": "/api/items", "browser": "Firefox"},
+    }
+
+
+def transaction_event(rng: random.Random, event_id: str) -> dict:
+    start = BASE_TIME + timedelta(seconds=rng.randrange(86400))
+    duration = rng.expovariate(1 / 0.2)
+    return {
+        "event_id": event_id,
+        "type": "transaction",
+        "transaction": f"/api/items/{rng.randrange(50)}",
+        "start_timestamp": start.timestamp(),
+        "timestamp": start.timestamp() + duration,
+        "contexts": {
+            "trace": {
+                "trace_id": uuid.UUID(int=rng.getrandbits(128)).hex,
+                "span_id": f"{rng.getrandbits(64):016x}",
+                "op": "http.server",
+                "status": "ok",
+            }
+        },
+        "spans": [
+            {
+                "op": "db",
+                "description": "SELECT * FROM items",
+                "start_timestamp": start.timestamp(),
+                "timestamp": start.timestamp() + duration / 2,
+            }
+            for _ in range(rng.randrange(1, 20))
+        ],
+        "environment": "production",
+    }
+
+
+def envelope(rng: random.Random, kind: str, depth: int = 30) -> bytes:
+    event_id = _event_id(rng)
+    sent_at = (BASE_TIME + timedelta(seconds=rng.randrange(86400))).isoformat()
+    lines = [_line({"event_id": event_id, "sent_at": sent_at})]
+    if kind == "error":
+        lines += [_line({"type": "event"}), _line(error_event(rng, event_id, depth))]
+    elif kind == "transaction":
+        lines += [
+            _line({"type": "transaction"}),
+            _line(transaction_event(rng, event_id)),
+        ]
+    elif kind == "attachment":
+        data = rng.randbytes(rng.randrange(1024, 64 * 1024))
+        lines += [
+            _line({"type": "event"}),
+            _line(error_event(rng, event_id, depth)),
+            _line(
+                {
+                    "type": "attachment",
+                    "length": len(data),
+                    "filename": "dump.bin",
+                    "content_type": "application/octet-stream",
+                }
+            ),
+            data,
+        ]
+    elif kind == "session":
+        lines += [
+            _line({"type": "session"}),
+            _line({"sid": _event_id(rng), "status": rng.choice(("ok", "exited"))}),
+        ]
+    else:
+        raise ValueError(f"unknown envelope kind {kind!r}")
+    return b"\n".join(lines) + b"\n"
+
+
+def encode(body: bytes, encoding: str | None) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, mtime=0)
+    if encoding == "br":
+        return brotli.compress(body)
+    return body
+
+
+def generate(
+    count: int,
+    seed: int = 0,
+    kinds: tuple[str, ...] = KINDS,
+    encodings: tuple[str | None, ...] = ENCODINGS,
+    depth: int = 30,
+) -> list[Sample]:
+    """`count` envelopes cycling through `kinds` and `encodings`."""
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        encoding = encodings[(i // len(kinds)) % len(encodings)]
+        samples.append(
+            Sample(kind, encoding, encode(envelope(rng, kind, depth), encoding))
+        )
+    return samples
+
+
+def write_corpus(directory: Path, samples: list[Sample]) -> None:
+    """One file per envelope.
+
+    Plain and gzip files can be loaded with `python -m resentry.cli import`;
+    brotli has no magic number, so .br files are only useful over HTTP.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for i, sample in enumerate(samples):
+        suffix = {"gzip": ".gz", "br": ".br"}.get(sample.encoding or "", "")
+        (directory / f"{i:06d}-{sample.kind}.envelope{suffix}").write_bytes(sample.body)
@@ -0,0 +1,75 @@
+"""End-to-end load driver against a running resentry instance.
+
+Closed loop: `concurrency` workers each send the next envelope as soon as
+the previous one was answered. For open-loop (fixed arrival rate) runs use
+`resentry loadtest` from the client.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.corpus import Sample
+from benchmarks.stats import Result
+
+
+async def run(
+    url: str,
+    project_id: int,
+    key: str,
+    samples: list[Sample],
+    duration: float = 30.0,
+    concurrency: int = 32,
+) -> tuple[list[Result], Counter]:
+    endpoint = f"{url.rstrip('/')}/api/{project_id}/envelope/"
+    auth = f"Sentry sentry_key={key}, sentry_version=7"
+    # once the corpus wraps around event ids repeat and the server answers
+    # from its dedupe cache, size --count above the expected request count
+    cycle = itertools.cycle(samples)
+    timings: dict[str, list[float]] = {}
+    statuses: Counter = Counter()
+    deadline = time.monotonic() + duration
+
+    async def worker(client: httpx.AsyncClient):
+        while time.monotonic() < deadline:
+            sample = next(cycle)
+            headers = {
+                "X-Sentry-Auth": auth,
+                "Content-Type": "application/x-sentry-envelope",
+            }
+            if sample.encoding:
+                headers["Content-Encoding"] = sample.encoding
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    endpoint, content=sample.body, headers=headers
+                )
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            timings.setdefault(sample.kind, []).append(time.perf_counter() - started)
+
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    started = time.monotonic()
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    results = [
+        Result.from_timings(f"load[{kind}]", values, total=elapsed)
+        for kind, values in sorted(timings.items())
+    ]
+    results.append(
+        Result.from_timings(
+            "load[all]",
+            [t for values in timings.values() for t in values],
+            total=elapsed,
+        )
+    )
+    return results, statuses
@@ -0,0 +1,90 @@
+"""Microbenchmarks of the ingest hot path on an in-memory SQLite database."""
+
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from benchmarks.corpus import Sample
+from benchmarks.stats import Result
+from resentry.database.models.project import Project
+from resentry.domain.project import ProjectDTO
+from resentry.repos.envelope import EnvelopeItemRepository, EnvelopeRepository
+from resentry.repos.queue import QueuedEventRepository
+from resentry.repos.transaction import ItemCounterRepository, TransactionRepository
+from resentry.sentry import unpack_sentry_envelope_from_request
+from resentry.usecases.envelope import StoreEnvelope, StoreResult
+from resentry.usecases.events import ScheduleEnvelope
+
+
+def bench_unpack(samples: list[Sample], repeat: int) -> list[Result]:
+    results = []
+    for encoding in sorted({s.encoding or "identity" for s in samples}):
+        group = [s for s in samples if (s.encoding or "identity") == encoding]
+        timings = []
+        for _ in range(repeat):
+            for sample in group:
+                started = time.perf_counter()
+                unpack_sentry_envelope_from_request(sample.body, sample.encoding)
+                timings.append(time.perf_counter() - started)
+        results.append(
+            Result.from_timings(f"unpack_sentry_envelope[{encoding}]", timings)
+        )
+    return results
+
+
+async def _create_db():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        project = Project(name="bench", lang="python", key="0" * 32)
+        session.add(project)
+        await session.commit()
+        return engine, ProjectDTO(id=project.id, name="bench", lang="python")
+
+
+async def bench_store_and_schedule(samples: list[Sample]) -> list[Result]:
+    """StoreEnvelope.execute and ScheduleEnvelope.execute, one commit per envelope
+    like the ingest route. Envelopes have unique ids, so each is stored once."""
+    engine, project = await _create_db()
+    store_timings, schedule_timings = [], []
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        for sample in samples:
+            started = time.perf_counter()
+            result: StoreResult | None = await StoreEnvelope(
+                repo=EnvelopeRepository(session),
+                repo_items=EnvelopeItemRepository(session),
+                repo_transactions=TransactionRepository(session),
+                repo_counters=ItemCounterRepository(session),
+                body=sample.body,
+                content_encoding=sample.encoding,
+                project_id=project.id,
+            ).execute()
+            stored = time.perf_counter()
+            store_timings.append(stored - started)
+
+            if result is not None and result.envelope is not None:
+                await ScheduleEnvelope(
+                    repo=QueuedEventRepository(session), project=project
+                ).execute(result.envelope, result.items)
+                schedule_timings.append(time.perf_counter() - stored)
+            await session.commit()
+    await engine.dispose()
+    return [
+        Result.from_timings("StoreEnvelope.execute", store_timings),
+        Result.from_timings("ScheduleEnvelope.execute", schedule_timings),
+    ]
+
+
+def run(samples: list[Sample], repeat: int = 5) -> list[Result]:
+    return bench_unpack(samples, repeat) + asyncio.run(
+        bench_store_and_schedule(samples)
+    )
@@ -0,0 +1,100 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(q * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+@dataclass
+class Result:
+    name: str
+    count: int
+    total_s: float
+    ops_per_s: float
+    mean_us: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    max_us: float
+
+    @classmethod
+    def from_timings(cls, name: str, timings: list[float], total: float | None = None):
+        ordered = sorted(timings)
+        total = sum(timings) if total is None else total
+        return cls(
+            name=name,
+            count=len(timings),
+            total_s=total,
+            ops_per_s=len(timings) / total if total else 0.0,
+            mean_us=statistics.fmean(timings) * 1e6 if timings else 0.0,
+            p50_us=percentile(ordered, 0.50) * 1e6,
+            p95_us=percentile(ordered, 0.95) * 1e6,
+            p99_us=percentile(ordered, 0.99) * 1e6,
+            max_us=(ordered[-1] if ordered else 0.0) * 1e6,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<40} {self.count:>7} ops {self.ops_per_s:>11.1f}/s "
+            f"p50 {self.p50_us:>9.1f}us p95 {self.p95_us:>9.1f}us "
+            f"p99 {self.p99_us:>9.1f}us"
+        )
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: Path, suite: str, results: list[Result], **params) -> None:
+    """Machine readable results, see `python -m benchmarks compare`."""
+    from resentry.utils import jsoncodec
+
+    path.write_text(
+        json.dumps(
+            {
+                "suite": suite,
+                "commit": _git_commit(),
+                "created": time.time(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "json_codec": jsoncodec.codec.name,
+                "params": params,
+                "results": [asdict(r) for r in results],
+            },
+            indent=2,
+        )
+    )
+
+
+def compare(old_path: Path, new_path: Path, threshold: float = 0.05) -> bool:
+    """Print throughput changes per benchmark, False if any regressed."""
+    old = {r["name"]: r for r in json.loads(old_path.read_text())["results"]}
+    new = {r["name"]: r for r in json.loads(new_path.read_text())["results"]}
+    ok = True
+    for name, result in new.items():
+        if (before := old.get(name)) is None or not before["ops_per_s"]:
+            print(f"{name:<40} new")
+            continue
+        change = result["ops_per_s"] / before["ops_per_s"] - 1
+        regressed = change < -threshold
+        ok = ok and not regressed
+        print(
+            f"{name:<40} {before['ops_per_s']:>11.1f}/s -> "
+            f"{result['ops_per_s']:>11.1f}/s ({change:+.1%})"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
@@ -1,26 +1,65 @@
 """API client for Resentry service."""
 
-from typing import List
-from http import HTTPStatus
 import json
-from client.http_client import HttpClient
-
+import os
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
 
+from client.config import Config
+from client.exceptions import LoginError
+from client.http_client import HttpClient
 from client.models import (
-    User,
-    UserCreate,
-    UserUpdate,
+    Envelope,
+    HealthCheck,
+    LoginSchema,
     Project,
     ProjectCreate,
     ProjectUpdate,
-    Envelope,
-    TokenSchema,
-    LoginSchema,
     RefreshTokenSchema,
-    HealthCheck,
+    TokenSchema,
+    User,
+    UserCreate,
+    UserUpdate,
 )
-from client.exceptions import LoginError
-from client.config import Config
+
+
+def load_tokens(path: str) -> TokenSchema | None:
+    try:
+        with open(path) as f:
+            tokens = json.load(f)
+            return TokenSchema(**tokens)
+    except FileNotFoundError:
+        return None
+
+
+def save_tokens(path: str, tokens: TokenSchema) -> None:
+    with open(path, "w") as f:
+        json.dump(tokens.model_dump(), f)
+
+
+def load_checkpoints(path: str) -> dict[str, int]:
+    """Last synced envelope id per project, as saved by `save_checkpoints`."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_checkpoints(path: str, checkpoints: dict[str, int]) -> None:
+    # write aside and rename, an interrupted sync keeps the old checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoints, f)
+    os.replace(tmp_path, path)
+
+
+def parse_events_page(response) -> tuple[list[Envelope], int | None]:
+    """Envelopes of a page and the cursor of the next one, None on the last."""
+    envelopes = [Envelope(**envelope_data) for envelope_data in response.json()]
+    next_cursor = response.headers.get("X-Next-Cursor")
+    return envelopes, int(next_cursor) if next_cursor else None
 
 
 class ResentryAPIClient:
@@ -59,16 +98,10 @@ class ResentryAPIClient:
             self._safe_tokens(tokens)
 
     def _load_tokens(self) -> TokenSchema | None:
-        try:
-            with open(self.config.tokens, "r") as f:
-                tokens = json.load(f)
-                return TokenSchema(**tokens)
-        except FileNotFoundError:
-            return None
+        return load_tokens(self.config.tokens)
 
     def _safe_tokens(self, new_tokens: TokenSchema) -> None:
-        with open(self.config.tokens, "w") as f:
-            json.dump(new_tokens.model_dump(), f)
+        save_tokens(self.config.tokens, new_tokens)
 
     def _add_auth_header(self):
         """Add authorization header if token is available."""
@@ -124,7 +157,7 @@ class ResentryAPIClient:
             response.raise_for_status()
 
     # User management methods
-    def get_users(self) -> List[User] | None:
+    def get_users(self) -> list[User] | None:
         """Get all users."""
         response = self._client.get("/api/v1/users/")
 
@@ -171,7 +204,7 @@ class ResentryAPIClient:
             response.raise_for_status()
 
     # Project management methods
-    def get_projects(self) -> List[Project] | None:
+    def get_projects(self) -> list[Project] | None:
         """Get all projects."""
         response = self._client.get("/api/v1/projects/")
 
@@ -222,12 +255,62 @@ class ResentryAPIClient:
             response.raise_for_status()
 
     # Event/envelope methods
-    def get_project_events(self, project_id: int) -> List[Envelope] | None:
+    def get_project_events(self, project_id: int) -> list[Envelope] | None:
         """Get all project events."""
-        response = self._client.get(f"/api/projects/{project_id}/events")
-
-        if response.status_code == HTTPStatus.OK:
-            envelopes_data = response.json()
-            return [Envelope(**envelope_data) for envelope_data in envelopes_data]
-        else:
-            response.raise_for_status()
+        return list(self.iter_project_events(project_id))
+
+    def get_project_events_page(
+        self, project_id: int, after: int = 0, limit: int = 100
+    ) -> tuple[list[Envelope], int | None]:
+        """Get one page of project events and the cursor of the next page."""
+        response = self._client.get(
+            f"/api/projects/{project_id}/events",
+            params={"after": after, "limit": limit},
+        )
+        response.raise_for_status()
+        return parse_events_page(response)
+
+    def _event_pages(
+        self, project_id: int, after: int, page_size: int
+    ) -> Iterator[list[Envelope]]:
+        # the next page is fetched in the background while the caller
+        # works through the current one
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future: Future | None = pool.submit(
+                self.get_project_events_page, project_id, after, page_size
+            )
+            while future is not None:
+                page, cursor = future.result()
+                future = (
+                    pool.submit(
+                        self.get_project_events_page, project_id, cursor, page_size
+                    )
+                    if cursor is not None
+                    else None
+                )
+                yield page
+
+    def iter_project_events(
+        self, project_id: int, after: int = 0, page_size: int = 100
+    ) -> Iterator[Envelope]:
+        """Iterate over project events page by page, oldest first."""
+        for page in self._event_pages(project_id, after, page_size):
+            yield from page
+
+    def sync_project_events(
+        self, project_id: int, since: int | None = None, page_size: int = 100
+    ) -> Iterator[Envelope]:
+        """Iterate over events added since the last sync of the project.
+
+        The checkpoint in `config.checkpoints` advances once a whole page has
+        been consumed, so an interrupted sync repeats at most one page.
+        `since` overrides the stored checkpoint.
+        """
+        checkpoints = load_checkpoints(self.config.checkpoints)
+        key = str(project_id)
+        after = since if since is not None else checkpoints.get(key, 0)
+        for page in self._event_pages(project_id, after, page_size):
+            yield from page
+            if page:
+                checkpoints[key] = page[-1].id
+                save_checkpoints(self.config.checkpoints, checkpoints)
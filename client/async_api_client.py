@@ -0,0 +1,299 @@
+"""Async API client for Resentry service."""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from http import HTTPStatus
+from typing import Self, TypeVar
+
+import httpx
+
+from client.api_client import (
+    load_checkpoints,
+    load_tokens,
+    parse_events_page,
+    save_checkpoints,
+    save_tokens,
+)
+from client.config import Config
+from client.exceptions import LoginError
+from client.http_client import AsyncHttpClient
+from client.models import (
+    Envelope,
+    HealthCheck,
+    LoginSchema,
+    Project,
+    ProjectCreate,
+    ProjectUpdate,
+    RefreshTokenSchema,
+    TokenSchema,
+    User,
+    UserCreate,
+    UserUpdate,
+)
+
+K = TypeVar("K")
+T = TypeVar("T")
+
+
+class AsyncResentryAPIClient:
+    """Async client for the Resentry API sharing one connection pool.
+
+    Use as an async context manager, it logs in (or loads saved tokens) on
+    enter and closes the pool on exit:
+
+        async with AsyncResentryAPIClient(config) as client:
+            events = await client.get_projects_events([1, 2, 3])
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        max_concurrency: int = 20,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.config = config
+        self.access_token: str | None = None
+        self.refresh_token: str | None = None
+        self._client = AsyncHttpClient(
+            base_url=config.api_url,
+            timeout=30.0,
+            reauth=self._reauth,
+            max_concurrency=max_concurrency,
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> Self:
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Load saved tokens or log in with the configured credentials."""
+        if tokens := load_tokens(self.config.tokens):
+            self.access_token = tokens.access_token
+            self.refresh_token = tokens.refresh_token
+            self._add_auth_header()
+            return
+        tokens = await self.login(self.config.login, self.config.password)
+        if tokens is None:
+            raise LoginError("Cant login")
+        save_tokens(self.config.tokens, tokens)
+
+    async def _reauth(self) -> None:
+        if self.refresh_token and (
+            tokens := await self.refresh_token_call(self.refresh_token)
+        ):
+            save_tokens(self.config.tokens, tokens)
+            return
+        if tokens := await self.login(self.config.login, self.config.password):
+            save_tokens(self.config.tokens, tokens)
+
+    def _add_auth_header(self):
+        """Add authorization header if token is available."""
+        if self.access_token:
+            self._client.update_header("Authorization", f"Bearer {self.access_token}")
+
+    def _set_tokens(self, token_data: dict) -> TokenSchema:
+        self.access_token = token_data.get("access_token")
+        self.refresh_token = token_data.get("refresh_token")
+        self._add_auth_header()
+        return TokenSchema(**token_data)
+
+    async def close(self):
+        """Close the HTTP client."""
+        await self._client.close()
+
+    async def login(self, login: str, password: str) -> TokenSchema | None:
+        """Authenticate with the API."""
+        login_data = LoginSchema(login=login, password=password)
+        response = await self._client.post(
+            "/api/v1/auth/login", json=login_data.model_dump(), retry=False
+        )
+
+        if response.status_code == HTTPStatus.OK:
+            return self._set_tokens(response.json())
+        return None
+
+    async def refresh_token_call(self, refresh_token: str) -> TokenSchema | None:
+        """Refresh the authentication token."""
+        token_data = RefreshTokenSchema(refresh_token=refresh_token)
+        response = await self._client.post(
+            "/api/v1/auth/refresh_token",
+            json=token_data.model_dump(),
+            retry=False,
+        )
+
+        if response.status_code == HTTPStatus.OK:
+            return self._set_tokens(response.json())
+        return None
+
+    async def health_check(self) -> HealthCheck:
+        """Check the health of the API."""
+        response = await self._client.get("/health/")
+        response.raise_for_status()
+        return HealthCheck(**response.json())
+
+    # User management methods
+    async def get_users(self) -> list[User]:
+        """Get all users."""
+        response = await self._client.get("/api/v1/users/")
+        response.raise_for_status()
+        return [User(**user_data) for user_data in response.json()]
+
+    async def get_user(self, user_id: int) -> User:
+        """Get a specific user by ID."""
+        response = await self._client.get(f"/api/v1/users/{user_id}")
+        response.raise_for_status()
+        return User(**response.json())
+
+    async def create_user(self, user_create: UserCreate) -> User:
+        """Create a new user."""
+        response = await self._client.post(
+            "/api/v1/users/", json=user_create.model_dump()
+        )
+        response.raise_for_status()
+        return User(**response.json())
+
+    async def update_user(self, user_id: int, user_update: UserUpdate) -> User:
+        """Update a user."""
+        response = await self._client.put(
+            f"/api/v1/users/{user_id}", json=user_update.model_dump()
+        )
+        response.raise_for_status()
+        return User(**response.json())
+
+    async def delete_user(self, user_id: int):
+        """Delete a user."""
+        response = await self._client.delete(f"/api/v1/users/{user_id}")
+        response.raise_for_status()
+
+    # Project management methods
+    async def get_projects(self) -> list[Project]:
+        """Get all projects."""
+        response = await self._client.get("/api/v1/projects/")
+        response.raise_for_status()
+        return [Project(**project_data) for project_data in response.json()]
+
+    async def get_project(self, project_id: int) -> Project:
+        """Get a specific project by ID."""
+        response = await self._client.get(f"/api/v1/projects/{project_id}")
+        response.raise_for_status()
+        return Project(**response.json())
+
+    async def create_project(self, project_create: ProjectCreate) -> Project:
+        """Create a new project."""
+        response = await self._client.post(
+            "/api/v1/projects/", json=project_create.model_dump()
+        )
+        response.raise_for_status()
+        return Project(**response.json())
+
+    async def update_project(
+        self, project_id: int, project_update: ProjectUpdate
+    ) -> Project:
+        """Update a project."""
+        response = await self._client.put(
+            f"/api/v1/projects/{project_id}", json=project_update.model_dump()
+        )
+        response.raise_for_status()
+        return Project(**response.json())
+
+    async def delete_project(self, project_id: int):
+        """Delete a project."""
+        response = await self._client.delete(f"/api/v1/projects/{project_id}")
+        response.raise_for_status()
+
+    # Event/envelope methods
+    async def get_project_events(self, project_id: int) -> list[Envelope]:
+        """Get all project events."""
+        return [event async for event in self.iter_project_events(project_id)]
+
+    async def get_project_events_page(
+        self, project_id: int, after: int = 0, limit: int = 100
+    ) -> tuple[list[Envelope], int | None]:
+        """Get one page of project events and the cursor of the next page."""
+        response = await self._client.get(
+            f"/api/projects/{project_id}/events",
+            params={"after": after, "limit": limit},
+        )
+        response.raise_for_status()
+        return parse_events_page(response)
+
+    async def _event_pages(
+        self, project_id: int, after: int, page_size: int
+    ) -> AsyncIterator[list[Envelope]]:
+        # the next page is requested while the caller handles the current one
+        task: asyncio.Task | None = asyncio.create_task(
+            self.get_project_events_page(project_id, after, page_size)
+        )
+        try:
+            while task is not None:
+                page, cursor = await task
+                task = (
+                    asyncio.create_task(
+                        self.get_project_events_page(project_id, cursor, page_size)
+                    )
+                    if cursor is not None
+                    else None
+                )
+                yield page
+        finally:
+            if task is not None:
+                task.cancel()
+
+    async def iter_project_events(
+        self, project_id: int, after: int = 0, page_size: int = 100
+    ) -> AsyncIterator[Envelope]:
+        """Iterate over project events page by page, oldest first."""
+        async for page in self._event_pages(project_id, after, page_size):
+            for envelope in page:
+                yield envelope
+
+    async def sync_project_events(
+        self, project_id: int, since: int | None = None, page_size: int = 100
+    ) -> AsyncIterator[Envelope]:
+        """Iterate over events added since the last sync of the project.
+
+        Shares the checkpoint file with ResentryAPIClient.sync_project_events.
+        """
+        checkpoints = load_checkpoints(self.config.checkpoints)
+        key = str(project_id)
+        after = since if since is not None else checkpoints.get(key, 0)
+        async for page in self._event_pages(project_id, after, page_size):
+            for envelope in page:
+                yield envelope
+            if page:
+                checkpoints[key] = page[-1].id
+                save_checkpoints(self.config.checkpoints, checkpoints)
+
+    # Fan-out helpers
+    async def fan_out(
+        self, fetch: Callable[[K], Awaitable[T]], keys: Iterable[K]
+    ) -> dict[K, T]:
+        """Run `fetch` for every key concurrently, results keyed by input.
+
+        Concurrency is bounded by the client's `max_concurrency`; the first
+        failure is raised once all requests have finished.
+        """
+        keys = list(keys)
+        results = await asyncio.gather(
+            *(fetch(key) for key in keys), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return dict(zip(keys, results))  # pyright: ignore[reportReturnType]
+
+    async def get_many_projects(self, project_ids: Iterable[int]) -> dict[int, Project]:
+        """Get several projects concurrently."""
+        return await self.fan_out(self.get_project, project_ids)
+
+    async def get_projects_events(
+        self, project_ids: Iterable[int] | None = None
+    ) -> dict[int, list[Envelope]]:
+        """Get events of several (by default all) projects concurrently."""
+        if project_ids is None:
+            project_ids = [project.id for project in await self.get_projects()]
+        return await self.fan_out(self.get_project_events, project_ids)
@@ -1,35 +1,59 @@
 """Command-line interface for Resentry API client."""
 
+import asyncio
+from datetime import datetime
+
 import click
 from dotenv import load_dotenv
+
 from client.api_client import ResentryAPIClient
 from client.config import Config
-from client.models import UserCreate, UserUpdate, ProjectCreate, ProjectUpdate
+from client.loadtest import LoadTest, parse_dsn, parse_mix
+from client.mirror import EventMirror
+from client.models import ProjectCreate, ProjectUpdate, UserCreate, UserUpdate
 
 load_dotenv()
 
 
 @click.group()
 @click.option("--api-url", default=None, help="Resentry API URL")
+@click.option("--mirror", default=None, help="Local SQLite mirror of events")
 @click.pass_context
-def cli(ctx, api_url):
+def cli(ctx, api_url, mirror):
     """Command-line interface for interacting with Resentry API."""
     # Load config from environment or override with CLI options
     config = Config()
 
     if api_url:
         config.api_url = api_url
+    if mirror:
+        config.mirror = mirror
     print(f"working with {config.api_url}")
 
-    # Store the API client in the context for subcommands
+    # The API client logs in on creation, subcommands create it on first use
+    # so mirror queries and load tests work without credentials
     ctx.ensure_object(dict)
-    ctx.obj["client"] = ResentryAPIClient(config)
+    ctx.obj["config"] = config
+
+
+def api_client() -> ResentryAPIClient:
+    """API client of the current invocation, created on first use."""
+    obj = click.get_current_context().obj
+    if "client" not in obj:
+        obj["client"] = ResentryAPIClient(obj["config"])
+    return obj["client"]
+
+
+def event_mirror() -> EventMirror | None:
+    """Local mirror configured with --mirror / RESENTRYCLI_MIRROR, if any."""
+    config = click.get_current_context().obj["config"]
+    return EventMirror(config.mirror) if config.mirror else None
 
 
 @cli.command()
 def health():
     """Check API health."""
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         result = client.health_check()
         click.echo(f"API Health: {result.status}")
@@ -42,7 +66,7 @@ def health():
 @click.password_option()
 def login(login, password):
     """Authenticate with the API."""
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         tokens = client.login(login, password)
         click.echo("Login successful!")
@@ -62,7 +86,7 @@ def user():
 @user.command(name="list")
 def user_list():
     """List all users."""
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         users = client.get_users()
         for user in users:
@@ -77,7 +101,7 @@ def user_list():
 @click.argument("user_id", type=int)
 def get_user(user_id):
     """Get user by ID."""
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         user = client.get_user(user_id)
         click.echo(f"ID: {user.id}")
@@ -93,7 +117,7 @@ def get_user(user_id):
 @click.password_option()
 def create_user(name, telegram_chat_id, password):
     """Create a new user."""
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         user_create = UserCreate(
             name=name, telegram_chat_id=telegram_chat_id, password=password
@@ -111,7 +135,7 @@ def create_user(name, telegram_chat_id, password):
 def update_user(user_id, name, telegram_chat_id):
     """Update a user."""
 
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         print(name, telegram_chat_id)
         user_update = UserUpdate(name=name, telegram_chat_id=telegram_chat_id)
@@ -125,7 +149,7 @@ def update_user(user_id, name, telegram_chat_id):
 @click.argument("user_id", type=int)
 def delete(user_id):
     """Delete a user."""
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         client.delete_user(user_id)
         click.echo(f"Deleted user with ID: {user_id}")
@@ -141,11 +165,16 @@ def project():
 
 
 @project.command(name="list")
-def project_list():
+@click.option("--refresh", is_flag=True, help="Pull new data into the mirror first")
+def project_list(refresh):
     """List all projects."""
-    client = click.get_current_context().obj["client"]
     try:
-        projects = client.get_projects()
+        if mirror := event_mirror():
+            if refresh:
+                mirror.refresh(api_client())
+            projects = mirror.projects()
+        else:
+            projects = api_client().get_projects()
         for proj in projects:
             click.echo(
                 f"ID: {proj.id}, Name: {proj.name}, Lang: {proj.lang}, Key: {proj.key}"
@@ -158,7 +187,7 @@ def project_list():
 @click.argument("project_id", type=int)
 def get(project_id):
     """Get project by ID."""
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         project = client.get_project(project_id)
         click.echo(f"ID: {project.id}")
@@ -174,12 +203,13 @@ def get(project_id):
 @click.option("--lang", required=True, help="Project language")
 def create(name, lang):
     """Create a new project."""
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         project_create = ProjectCreate(name=name, lang=lang)
         project = client.create_project(project_create)
         click.echo(
-            f"Created project: ID={project.id}, Name={project.name}, Lang={project.lang}"
+            f"Created project: ID={project.id}, Name={project.name}, "
+            f"Lang={project.lang}"
         )
     except Exception as e:
         click.echo(f"Error creating project: {e}")
@@ -195,7 +225,7 @@ def update(project_id, name, lang):
         click.echo("At least one field (name or lang) must be specified for update")
         return
 
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         # Get the current project to fill in non-updated values
         current_project = client.get_project(project_id)
@@ -209,7 +239,8 @@ def update(project_id, name, lang):
 
         project = client.update_project(project_id, project_update)
         click.echo(
-            f"Updated project: ID={project.id}, Name={project.name}, Lang={project.lang}"
+            f"Updated project: ID={project.id}, Name={project.name}, "
+            f"Lang={project.lang}"
         )
     except Exception as e:
         click.echo(f"Error updating project: {e}")
@@ -219,7 +250,7 @@ def update(project_id, name, lang):
 @click.argument("project_id", type=int)
 def delete_project(project_id):
     """Delete a project."""
-    client = click.get_current_context().obj["client"]
+    client = api_client()
     try:
         client.delete_project(project_id)
         click.echo(f"Deleted project with ID: {project_id}")
@@ -236,21 +267,130 @@ def events():
 
 @events.command(name="list")
 @click.argument("project_id", type=int)
-def events_list(project_id: int):
-    """List all events."""
-    client = click.get_current_context().obj["client"]
+@click.option("--refresh", is_flag=True, help="Pull new events into the mirror first")
+@click.option("--event-id", help="Only the event with this event ID")
+@click.option("--since", type=click.DateTime(), help="Sent at or after")
+@click.option("--until", type=click.DateTime(), help="Sent before")
+@click.option("--search", help="Text contained in an event payload")
+@click.option("--limit", type=int, help="Only the latest N events")
+def events_list(
+    project_id: int,
+    refresh: bool,
+    event_id: str | None,
+    since: datetime | None,
+    until: datetime | None,
+    search: str | None,
+    limit: int | None,
+):
+    """List all events.
+
+    With a mirror configured events are answered from the local copy and
+    can be filtered; otherwise they are fetched from the API.
+    """
     try:
-        envelopes = client.get_project_events(project_id)
-        for envelope in envelopes:
-            click.echo(
-                f"ID: {envelope.id}, Project ID: {envelope.project_id}, Event ID: {envelope.event_id}"
+        if mirror := event_mirror():
+            if refresh:
+                count = mirror.refresh(api_client(), [project_id])
+                click.echo(f"Pulled {count} new events")
+            envelopes = mirror.events(
+                project_id,
+                event_id=event_id,
+                since=since,
+                until=until,
+                search=search,
+                limit=limit,
             )
-            for event in envelope.items:
-                click.echo(f"\tID: {event.id} {event.payload}")
+        else:
+            if refresh or event_id or since or until or search or limit:
+                raise click.UsageError("Filters need a mirror, pass --mirror")
+            envelopes = api_client().iter_project_events(project_id)
+        for envelope in envelopes:
+            echo_envelope(envelope)
+    except click.UsageError:
+        raise
     except Exception as e:
         click.echo(f"Error getting events: {e}")
 
 
+@events.command(name="sync")
+@click.argument("project_id", type=int)
+@click.option("--since", type=int, help="Start after this event ID")
+def events_sync(project_id: int, since: int | None):
+    """List events added since the last sync."""
+    client = api_client()
+    try:
+        count = 0
+        for envelope in client.sync_project_events(project_id, since=since):
+            echo_envelope(envelope)
+            count += 1
+        click.echo(f"Synced {count} new events")
+    except Exception as e:
+        click.echo(f"Error syncing events: {e}")
+
+
+def echo_envelope(envelope):
+    click.echo(
+        f"ID: {envelope.id}, Project ID: {envelope.project_id}, "
+        f"Event ID: {envelope.event_id}"
+    )
+    for event in envelope.items or []:
+        click.echo(f"\tID: {event.id} {event.payload}")
+
+
+@cli.command()
+@click.option("--dsn", help="Project DSN, http://<key>@host/<project_id>")
+@click.option("--project-id", type=int, help="Project ID, if no DSN is given")
+@click.option("--key", help="Project key, if no DSN is given")
+@click.option(
+    "--mix",
+    default="error=70,transaction=20,session=10",
+    show_default=True,
+    help="Envelope kinds and weights",
+)
+@click.option(
+    "--rate",
+    type=float,
+    help="Requests per second (open loop); without it workers send back to back",
+)
+@click.option("--duration", type=float, default=30.0, show_default=True)
+@click.option(
+    "--concurrency",
+    type=int,
+    default=64,
+    show_default=True,
+    help="Connection pool size (and worker count in closed loop)",
+)
+@click.option("--gzip", "compress", is_flag=True, help="Gzip envelope bodies")
+@click.option("--timeout", type=float, default=30.0, show_default=True)
+def loadtest(dsn, project_id, key, mix, rate, duration, concurrency, compress, timeout):
+    """Send envelopes to a project at a target rate and report latencies."""
+    config = click.get_current_context().obj["config"]
+    try:
+        if dsn:
+            url, project_id, key = parse_dsn(dsn)
+        elif project_id is not None and key:
+            url = config.api_url.rstrip("/")
+        else:
+            raise click.UsageError("Either --dsn or --project-id and --key is required")
+        test = LoadTest(
+            url=url,
+            project_id=project_id,
+            key=key,
+            mix=parse_mix(mix),
+            duration=duration,
+            rate=rate,
+            concurrency=concurrency,
+            compress=compress,
+            timeout=timeout,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    report = asyncio.run(test.run())
+    for line in report.lines():
+        click.echo(line)
+
+
 def main():
     """Main entry point."""
     cli()
@@ -11,6 +11,8 @@ class Config(BaseSettings):
     password: str = Field(default_factory=str)
     api_url: str = "http://localhost:8000"
     tokens: str = "tokens.json"
+    checkpoints: str = "checkpoints.json"
+    mirror: str = ""
 
     model_config = SettingsConfigDict(
         env_prefix="RESENTRYCLI_",
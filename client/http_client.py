@@ -1,8 +1,10 @@
-import httpx
-from httpx import Response
+import asyncio
 
 # from http import HTTPStatus
-from typing import Callable
+from collections.abc import Awaitable, Callable
+
+import httpx
+from httpx import Response
 
 
 class HttpClient:
@@ -42,3 +44,80 @@ class HttpClient:
 
     def close(self) -> None:
         return self._client.close()
+
+
+class AsyncHttpClient:
+    """Pooled async counterpart of HttpClient.
+
+    At most `max_concurrency` requests are in flight. A 401 triggers one
+    `reauth` no matter how many requests fail together: each request notes
+    the auth generation it was sent with and only the first one to see a
+    stale generation refreshes, the others wait and retry.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        reauth: Callable[[], Awaitable[None]],
+        timeout: float = 30.0,
+        max_concurrency: int = 20,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            headers={"Content-Type": "application/json"},
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            transport=transport,
+        )
+        self.reauth = reauth
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._reauth_lock = asyncio.Lock()
+        self._auth_generation = 0
+
+    def update_header(self, key: str, value: str) -> None:
+        self._client.headers[key] = value
+
+    async def _send(self, method: str, url: str, **kwargs) -> tuple[Response, int]:
+        async with self._semaphore:
+            generation = self._auth_generation
+            response = await self._client.request(method=method, url=url, **kwargs)
+        return response, generation
+
+    async def _refresh(self, generation: int) -> None:
+        async with self._reauth_lock:
+            if generation != self._auth_generation:
+                # another request refreshed while this one was in flight
+                return
+            try:
+                await self.reauth()
+            finally:
+                self._auth_generation += 1
+
+    async def request(self, method: str, url: str, retry=True, **kwargs) -> Response:
+        response, generation = await self._send(method, url, **kwargs)
+        if response.status_code == 401 and retry:
+            await self._refresh(generation)
+            response, _ = await self._send(method, url, **kwargs)
+        return response
+
+    async def post(self, url: str, **kwargs) -> Response:
+        return await self.request(method="post", url=url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> Response:
+        return await self.request(method="get", url=url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> Response:
+        return await self.request(method="patch", url=url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> Response:
+        return await self.request(method="put", url=url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> Response:
+        return await self.request(method="delete", url=url, **kwargs)
+
+    async def close(self) -> None:
+        await self._client.aclose()
@@ -0,0 +1,309 @@
+"""Load generator for sizing Resentry instances.
+
+Sends a weighted mix of envelopes to a project's envelope endpoint over a
+pooled keep-alive ``httpx.AsyncClient``. Two modes are supported:
+
+* open loop: requests are scheduled at a constant arrival rate and latency
+  is measured from the *scheduled* send time, so a slow server shows up in
+  the tail instead of silently lowering the request rate (coordinated
+  omission);
+* closed loop: ``concurrency`` workers send back to back.
+"""
+
+import asyncio
+import gzip
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from urllib.parse import urlsplit
+
+import httpx
+
+KINDS = ("error", "transaction", "session")
+
+# upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse ``error=70,transaction=20,session=10`` into weights."""
+    mix: dict[str, int] = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise ValueError(f"Unknown envelope kind: {kind!r}")
+        mix[kind] = int(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("Envelope mix has no positive weights")
+    return mix
+
+
+def parse_dsn(dsn: str) -> tuple[str, int, str]:
+    """Split a DSN ``http://<key>@host/<project_id>`` into url, project and key."""
+    parts = urlsplit(dsn)
+    if not parts.username or not parts.path.strip("/"):
+        raise ValueError(f"Invalid DSN: {dsn!r}")
+    netloc = parts.hostname or ""
+    if parts.port:
+        netloc = f"{netloc}:{parts.port}"
+    project_id = int(parts.path.strip("/").rsplit("/", 1)[-1])
+    return f"{parts.scheme}://{netloc}", project_id, parts.username
+
+
+def _item(item_type: str, payload: dict) -> bytes:
+    body = json.dumps(payload).encode()
+    header = json.dumps({"type": item_type, "length": len(body)}).encode()
+    return header + b"\n" + body + b"\n"
+
+
+def _payloads(rng: random.Random) -> dict[str, bytes]:
+    """Envelope items per kind, built once; only the header changes per send."""
+    now = datetime.now(UTC).isoformat()
+    frames = [
+        {
+            "filename": f"app/module_{i}.py",
+            "function": f"handler_{i}",
+            "lineno": rng.randint(1, 500),
+            "context_line": "    result = process(request)",
+        }
+        for i in range(20)
+    ]
+    return {
+        "error": _item(
+            "event",
+            {
+                "timestamp": now,
+                "level": "error",
+                "platform": "python",
+                "server_name": "loadtest",
+                "environment": "loadtest",
+                "message": "Load test error",
+                "exception": {
+                    "values": [
+                        {
+                            "type": "ValueError",
+                            "value": "load test",
+                            "stacktrace": {"frames": frames},
+                        }
+                    ]
+                },
+            },
+        ),
+        "transaction": _item(
+            "transaction",
+            {
+                "timestamp": now,
+                "start_timestamp": now,
+                "transaction": "GET /loadtest",
+                "platform": "python",
+                "environment": "loadtest",
+                "spans": [
+                    {
+                        "op": "db.query",
+                        "description": "SELECT 1",
+                        "span_id": uuid.UUID(int=rng.getrandbits(128)).hex[:16],
+                        "start_timestamp": now,
+                        "timestamp": now,
+                    }
+                    for _ in range(10)
+                ],
+            },
+        ),
+        "session": _item(
+            "session",
+            {
+                "sid": uuid.UUID(int=rng.getrandbits(128)).hex,
+                "status": "ok",
+                "started": now,
+                "errors": 0,
+                "attrs": {"release": "loadtest@1.0", "environment": "loadtest"},
+            },
+        ),
+    }
+
+
+@dataclass
+class LatencyHistogram:
+    """Raw latencies kept for exact percentiles, bucketed for display."""
+
+    values: list[float] = field(default_factory=list)
+
+    def record(self, seconds: float) -> None:
+        self.values.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self.values:
+            return 0.0
+        ordered = sorted(self.values)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def buckets(self) -> list[tuple[str, int]]:
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for value in self.values:
+            ms = value * 1000
+            for index, bound in enumerate(BUCKETS_MS):
+                if ms <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+        labels = [f"<= {bound} ms" for bound in BUCKETS_MS]
+        labels.append(f"> {BUCKETS_MS[-1]} ms")
+        return list(zip(labels, counts))
+
+
+@dataclass
+class LoadReport:
+    mode: str
+    duration: float
+    target_rate: float | None
+    sent: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    per_kind: dict[str, LatencyHistogram] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        return self.sent / self.duration if self.duration else 0.0
+
+    def lines(self) -> list[str]:
+        target = f" (target {self.target_rate:.1f}/s)" if self.target_rate else ""
+        lines = [
+            f"Mode: {self.mode}, {self.sent} requests in {self.duration:.1f}s",
+            f"Throughput: {self.throughput:.1f} req/s{target}",
+            "Latency: "
+            + ", ".join(
+                f"p{int(q * 100)} {self.latency.percentile(q) * 1000:.1f} ms"
+                for q in (0.5, 0.9, 0.99)
+            )
+            + f", p99.9 {self.latency.percentile(0.999) * 1000:.1f} ms",
+        ]
+        for kind, histogram in sorted(self.per_kind.items()):
+            lines.append(
+                f"  {kind:<12} {len(histogram.values):>7} "
+                f"p50 {histogram.percentile(0.5) * 1000:.1f} ms "
+                f"p99 {histogram.percentile(0.99) * 1000:.1f} ms"
+            )
+        lines.append("Histogram:")
+        largest = max((count for _, count in self.latency.buckets()), default=0)
+        for label, count in self.latency.buckets():
+            bar = "#" * (round(40 * count / largest) if largest else 0)
+            lines.append(f"  {label:>11} {count:>7} {bar}")
+        lines.append(
+            "Status codes: "
+            + (", ".join(f"{k}={v}" for k, v in sorted(self.statuses.items())) or "-")
+        )
+        if self.errors:
+            lines.append(
+                "Errors: " + ", ".join(f"{k}={v}" for k, v in self.errors.items())
+            )
+        return lines
+
+
+@dataclass
+class LoadTest:
+    url: str
+    project_id: int
+    key: str
+    mix: dict[str, int]
+    duration: float = 30.0
+    rate: float | None = None
+    concurrency: int = 64
+    compress: bool = False
+    timeout: float = 30.0
+    seed: int = 0
+    transport: httpx.AsyncBaseTransport | None = None
+
+    def __post_init__(self):
+        rng = random.Random(self.seed)
+        self._rng = rng
+        self._payloads = _payloads(rng)
+        self._kinds = [kind for kind, weight in self.mix.items() if weight > 0]
+        self._weights = [self.mix[kind] for kind in self._kinds]
+        self._headers = {
+            "X-Sentry-Auth": f"Sentry sentry_key={self.key}, sentry_version=7",
+            "Content-Type": "application/x-sentry-envelope",
+        }
+        if self.compress:
+            self._headers["Content-Encoding"] = "gzip"
+
+    def _envelope(self, kind: str) -> bytes:
+        # a fresh event_id per send, duplicates would hit the dedupe cache
+        header = json.dumps({"event_id": uuid.uuid4().hex}).encode()
+        body = header + b"\n" + self._payloads[kind]
+        return gzip.compress(body, compresslevel=1) if self.compress else body
+
+    async def _send(
+        self, client: httpx.AsyncClient, report: LoadReport, started: float
+    ) -> None:
+        kind = self._rng.choices(self._kinds, self._weights)[0]
+        try:
+            response = await client.post(
+                f"/api/{self.project_id}/envelope/",
+                content=self._envelope(kind),
+                headers=self._headers,
+            )
+        except httpx.HTTPError as e:
+            report.errors[type(e).__name__] += 1
+            return
+        finally:
+            report.sent += 1
+        elapsed = time.perf_counter() - started
+        report.statuses[response.status_code] += 1
+        report.latency.record(elapsed)
+        report.per_kind.setdefault(kind, LatencyHistogram()).record(elapsed)
+
+    async def _open_loop(self, client: httpx.AsyncClient, report: LoadReport):
+        assert self.rate
+        interval = 1.0 / self.rate
+        start = time.perf_counter()
+        tasks: set[asyncio.Task] = set()
+        index = 0
+        while (scheduled := start + index * interval) - start < self.duration:
+            if (delay := scheduled - time.perf_counter()) > 0:
+                await asyncio.sleep(delay)
+            # latency counts from the scheduled time, not the actual send
+            task = asyncio.create_task(self._send(client, report, scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            index += 1
+        await asyncio.gather(*tasks)
+
+    async def _closed_loop(self, client: httpx.AsyncClient, report: LoadReport):
+        deadline = time.perf_counter() + self.duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self._send(client, report, time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def run(self) -> LoadReport:
+        report = LoadReport(
+            mode="open" if self.rate else "closed",
+            duration=self.duration,
+            target_rate=self.rate,
+        )
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency,
+        )
+        async with httpx.AsyncClient(
+            base_url=self.url,
+            limits=limits,
+            timeout=self.timeout,
+            transport=self.transport,
+        ) as client:
+            started = time.perf_counter()
+            if self.rate:
+                await self._open_loop(client, report)
+            else:
+                await self._closed_loop(client, report)
+            report.duration = time.perf_counter() - started
+        return report
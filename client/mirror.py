@@ -0,0 +1,185 @@
+"""Local SQLite mirror of projects and events for offline querying."""
+
+import sqlite3
+from collections.abc import Iterable
+from datetime import datetime
+
+from client.api_client import ResentryAPIClient
+from client.models import Envelope, EnvelopeItem, Project
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS envelopes (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    event_id TEXT,
+    sent_at TEXT,
+    dsn TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_envelopes_project_id ON envelopes (project_id, id);
+CREATE INDEX IF NOT EXISTS ix_envelopes_event_id ON envelopes (project_id, event_id);
+CREATE INDEX IF NOT EXISTS ix_envelopes_sent_at ON envelopes (project_id, sent_at);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    envelope_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_items_envelope_id ON items (envelope_id);
+"""
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+class EventMirror:
+    """Projects and events copied from the API into a local SQLite file.
+
+    `refresh` downloads only events newer than the largest mirrored id of
+    each project; `events` answers list/filter queries from the indexes.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def save_projects(self, projects: Iterable[Project]) -> None:
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO projects (id, name, lang, key) "
+                "VALUES (?, ?, ?, ?)",
+                [(p.id, p.name, p.lang, p.key) for p in projects],
+            )
+
+    def save_envelopes(self, envelopes: Iterable[Envelope]) -> None:
+        envelopes = list(envelopes)
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO envelopes "
+                "(id, project_id, event_id, sent_at, dsn) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (e.id, e.project_id, e.event_id, _iso(e.sent_at), e.dsn)
+                    for e in envelopes
+                ],
+            )
+            self.db.executemany(
+                "INSERT OR REPLACE INTO items (id, envelope_id, payload, sent_at) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (item.id, e.id, item.payload, _iso(item.sent_at))
+                    for e in envelopes
+                    for item in e.items or []
+                ],
+            )
+
+    def last_event_id(self, project_id: int) -> int:
+        row = self.db.execute(
+            "SELECT MAX(id) FROM envelopes WHERE project_id = ?", (project_id,)
+        ).fetchone()
+        return row[0] or 0
+
+    def refresh(
+        self, client: ResentryAPIClient, project_ids: Iterable[int] | None = None
+    ) -> int:
+        """Pull new projects and events, returns the number of new events."""
+        projects = client.get_projects() or []
+        self.save_projects(projects)
+        if project_ids is None:
+            project_ids = [project.id for project in projects]
+
+        count = 0
+        for project_id in project_ids:
+            batch: list[Envelope] = []
+            for envelope in client.iter_project_events(
+                project_id, after=self.last_event_id(project_id)
+            ):
+                batch.append(envelope)
+                if len(batch) >= self.batch_size:
+                    self.save_envelopes(batch)
+                    count += len(batch)
+                    batch = []
+            self.save_envelopes(batch)
+            count += len(batch)
+        return count
+
+    def projects(self) -> list[Project]:
+        rows = self.db.execute(
+            "SELECT id, name, lang, key FROM projects ORDER BY id"
+        ).fetchall()
+        return [
+            Project(id=i, name=name, lang=lang, key=key) for i, name, lang, key in rows
+        ]
+
+    def events(
+        self,
+        project_id: int,
+        event_id: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        search: str | None = None,
+        limit: int | None = None,
+    ) -> list[Envelope]:
+        """Mirrored events of a project in id order.
+
+        `since`/`until` filter on `sent_at` (`until` exclusive), `search` is
+        a substring of any item payload, `limit` keeps the latest events.
+        """
+        where = ["e.project_id = ?"]
+        params: list = [project_id]
+        if event_id is not None:
+            where.append("e.event_id = ?")
+            params.append(event_id)
+        if since is not None:
+            where.append("e.sent_at >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            where.append("e.sent_at < ?")
+            params.append(until.isoformat())
+        if search is not None:
+            where.append(
+                "EXISTS (SELECT 1 FROM items i "
+                "WHERE i.envelope_id = e.id AND instr(i.payload, ?) > 0)"
+            )
+            params.append(search)
+        query = (
+            "SELECT e.id, e.project_id, e.event_id, e.sent_at, e.dsn "
+            f"FROM envelopes e WHERE {' AND '.join(where)} ORDER BY e.id DESC"
+        )
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        rows = self.db.execute(query, params).fetchall()[::-1]
+
+        items: dict[int, list[EnvelopeItem]] = {}
+        if rows:
+            for item_id, envelope_id, payload, sent_at in self.db.execute(
+                "SELECT id, envelope_id, payload, sent_at FROM items "
+                "WHERE envelope_id BETWEEN ? AND ? AND envelope_id IN "
+                f"(SELECT e.id FROM ({query}) e) ORDER BY id",
+                [rows[0][0], rows[-1][0], *params],
+            ):
+                items.setdefault(envelope_id, []).append(
+                    EnvelopeItem(id=item_id, payload=payload, sent_at=sent_at)
+                )
+        return [
+            Envelope(
+                id=id,
+                project_id=project_id,
+                event_id=event_id,
+                sent_at=sent_at,
+                dsn=dsn,
+                items=items.get(id, []),
+            )
+            for id, project_id, event_id, sent_at, dsn in rows
+        ]
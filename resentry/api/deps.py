@@ -1,36 +1,93 @@
-from typing import AsyncGenerator, Type
-import jwt
-import asyncio
 import logging
-from fastapi import Depends, HTTPException, status, Request
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel.ext.asyncio.session import AsyncSession
+import typing
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime
 
+import jwt
+from fastapi import Depends, HTTPException, Query, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from resentry.database.database import get_async_db
+from resentry.core.cachebus import CacheBus
+from resentry.core.dedupe import RecentIds
+from resentry.core.hashing import Hasher
+from resentry.core.offload import Offloader
+from resentry.core.outcomes import Outcomes
+from resentry.core.projectkeys import ProjectKeyIndex
+from resentry.core.ratelimit import RateLimiter
+from resentry.core.responsecache import ResponseCache
+from resentry.core.rules import RuleCache
+from resentry.core.streams import EventHub
+from resentry.core.throttle import LoginThrottle
+from resentry.core.tokens import ClaimsCache, jwt_keys
+from resentry.database import database
+from resentry.database.session import LazySession
+from resentry.domain.envelope import EventFilter
+from resentry.domain.queue import LogLevel
 from resentry.repos.project import BaseRepo
-from resentry.config import settings
 
 
-async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
-    async for db in get_async_db():
-        try:
-            yield db
-            await db.commit()
-        except Exception as e:
-            logging.warning("async session rollback before %s", e)
-            await db.rollback()
-            raise
-        finally:
-            await db.close()
+async def get_async_db_session() -> AsyncGenerator[AsyncSession]:
+    # FastAPI caches this dependency per request, so every repo of a request
+    # shares the session, which is only opened once a repo uses it
+    db = LazySession(lambda: database.create_async_session())
+    try:
+        yield typing.cast(AsyncSession, db)
+        await db.commit()
+    except Exception as e:
+        logging.warning("async session rollback before %s", e)
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def get_rate_limiter(request: Request) -> RateLimiter:
+    return request.app.state.rate_limiter
+
+
+async def get_outcomes(request: Request) -> Outcomes:
+    return request.app.state.outcomes
+
+
+async def get_rule_cache(request: Request) -> RuleCache:
+    return request.app.state.rules
+
+
+async def get_recent_ids(request: Request) -> RecentIds:
+    return request.app.state.recent_ids
+
+
+async def get_offloader(request: Request) -> Offloader:
+    return request.app.state.offloader
 
 
-async def get_queue(request: Request) -> asyncio.Queue:
-    return request.app.state.queue
+async def get_project_keys(request: Request) -> ProjectKeyIndex:
+    return request.app.state.project_keys
+
+
+async def get_hasher(request: Request) -> Hasher:
+    return request.app.state.hasher
+
+
+async def get_login_throttle(request: Request) -> LoginThrottle:
+    return request.app.state.login_throttle
+
+
+async def get_response_cache(request: Request) -> ResponseCache:
+    return request.app.state.response_cache
+
+
+async def get_event_hub(request: Request) -> EventHub:
+    return request.app.state.event_hub
+
+
+async def get_cache_bus(request: Request) -> CacheBus:
+    return request.app.state.cache_bus
 
 
 def get_repo(
-    repo_cls: Type[BaseRepo],
+    repo_cls: type[BaseRepo],
     db: AsyncSession,
 ) -> BaseRepo:
     return repo_cls(db)
@@ -39,21 +96,27 @@ def get_repo(
 security_scheme = HTTPBearer()
 
 
-def get_router_repo(repo_cls: Type[BaseRepo]):
+def get_router_repo(repo_cls: type[BaseRepo]):
     def inner(db: AsyncSession = Depends(get_async_db_session)):
         return get_repo(repo_cls, db)
 
     return inner
 
 
+async def get_claims_cache(request: Request) -> ClaimsCache:
+    return request.app.state.claims_cache
+
+
 async def verify_access_token(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    claims_cache: ClaimsCache = Depends(get_claims_cache),
 ):
     token = credentials.credentials
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        if (payload := claims_cache.get(token)) is None:
+            keys = jwt_keys()
+            payload = jwt.decode(token, keys.verifying_key, algorithms=[keys.algorithm])
+            claims_cache.set(token, payload)
         user_id_str: str | None = payload.get("sub")
         if user_id_str is None:
             raise HTTPException(
@@ -73,3 +136,32 @@ async def verify_access_token(
 def get_current_user_id(current_user_id: int = Depends(verify_access_token)) -> int:
     """Dependency to get the current user ID from the token."""
     return current_user_id
+
+
+def _values(values: list[str] | None) -> frozenset[str] | None:
+    return frozenset(values) if values else None
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    # timestamps without an offset are UTC, like everything stored
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
+
+
+def get_event_filter(
+    since: datetime | None = Query(default=None, description="sent_at from"),
+    until: datetime | None = Query(default=None, description="sent_at before"),
+    level: list[str] | None = Query(default=None),
+    environment: list[str] | None = Query(default=None),
+    release: list[str] | None = Query(default=None),
+    type: list[str] | None = Query(default=None, description="Item type"),
+) -> EventFilter:
+    return EventFilter(
+        since=_aware(since),
+        until=_aware(until),
+        levels=_values([LogLevel.normalize(value) or value for value in level or []]),
+        environments=_values(environment),
+        releases=_values(release),
+        item_types=_values(type),
+    )
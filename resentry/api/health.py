@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from pydantic import BaseModel
 
 
@@ -6,9 +6,47 @@ class HealthCheck(BaseModel):
     status: str = "OK"
 
 
+class LoopLag(BaseModel):
+    last: float
+    mean: float
+    max: float
+    samples: int
+
+
+class Metrics(BaseModel):
+    loop_lag: LoopLag
+    offload_mode: str
+    offloaded: int
+    inline: int
+    response_cache_hits: int
+    response_cache_misses: int
+    stream_subscribers: int
+    stream_published: int
+    stream_evicted: int
+
+
 health_router = APIRouter()
 
 
 @health_router.get("/", response_model=HealthCheck)
 async def health_check():
     return HealthCheck(status="OK")
+
+
+@health_router.get("/metrics", response_model=Metrics)
+async def metrics(request: Request):
+    """Event loop lag in seconds, offload, cache and live stream counters."""
+    offloader = request.app.state.offloader
+    response_cache = request.app.state.response_cache
+    event_hub = request.app.state.event_hub
+    return Metrics(
+        loop_lag=LoopLag(**request.app.state.loop_lag.snapshot()),
+        offload_mode=offloader.mode,
+        offloaded=offloader.offloaded,
+        inline=offloader.inline,
+        response_cache_hits=response_cache.hits,
+        response_cache_misses=response_cache.misses,
+        stream_subscribers=sum(map(len, event_hub.subscribers.values())),
+        stream_published=event_hub.published,
+        stream_evicted=event_hub.evicted,
+    )
@@ -0,0 +1,50 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from resentry.core.responsecache import ResponseCache
+from resentry.utils import jsoncodec
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured codec (orjson if installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return jsoncodec.dumps(content)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+async def cached_json(
+    request: Request,
+    cache: ResponseCache,
+    tag: str,
+    etag: str,
+    render: Callable[[], Awaitable[tuple[Any, dict[str, str]]]],
+) -> Response:
+    """Conditional GET for list endpoints.
+
+    `etag` must be cheap to compute and change with the data. A matching
+    If-None-Match answers 304, a cached body with the same ETag is reused,
+    only otherwise `render` runs the query and returns content and headers.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    url = str(request.url)
+    if entry := cache.get(tag, url, etag):
+        return Response(
+            entry.body, media_type="application/json", headers=headers | entry.headers
+        )
+    content, extra = await render()
+    body = jsoncodec.dumps(content)
+    cache.put(tag, url, etag, body, extra)
+    return Response(body, media_type="application/json", headers=headers | extra)
@@ -1,14 +1,14 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
-from resentry.api.deps import get_router_repo
+from resentry.api.deps import get_hasher, get_login_throttle, get_router_repo
 from resentry.core.hashing import Hasher
+from resentry.core.throttle import LoginThrottle
 from resentry.database.schemas.auth import (
     LoginSchema,
     RefreshTokenSchema,
     TokenSchema,
 )
 from resentry.repos.user import UserRepository
-from resentry.config import settings
 from resentry.usecases.auth import Login, RefreshToken
 
 auth_router = APIRouter()
@@ -16,13 +16,30 @@ repo_dep = get_router_repo(UserRepository)
 
 
 @auth_router.post("/login", response_model=TokenSchema)
-async def login_route(body: LoginSchema, repo: UserRepository = Depends(repo_dep)):
-    result = await Login(repo=repo, hasher=Hasher(salt=settings.SALT)).execute(body)
+async def login_route(
+    body: LoginSchema,
+    request: Request,
+    repo: UserRepository = Depends(repo_dep),
+    hasher: Hasher = Depends(get_hasher),
+    throttle: LoginThrottle = Depends(get_login_throttle),
+):
+    user_key = f"user:{body.login}"
+    keys = [user_key, f"ip:{request.client.host if request.client else ''}"]
+    if retry_after := throttle.retry_after(keys):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="too many failed logins",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    result = await Login(repo=repo, hasher=hasher).execute(body)
     if result is None:
+        throttle.failure(keys)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="wrong login/password",
         )
+    throttle.success([user_key])
     return result
 
 
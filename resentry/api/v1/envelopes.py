@@ -1,52 +1,149 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Request, Path, Header
-from asyncio import Queue
+import hashlib
+from dataclasses import replace
+from urllib.parse import urlencode
 
-from resentry.api.deps import get_router_repo, get_current_user_id, get_queue
-from resentry.repos.project import ProjectRepository
-from resentry.repos.user import UserRepository
-from resentry.repos.envelope import EnvelopeItemRepository, EnvelopeRepository
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from resentry.api.deps import (
+    get_current_user_id,
+    get_event_filter,
+    get_event_hub,
+    get_offloader,
+    get_outcomes,
+    get_project_keys,
+    get_rate_limiter,
+    get_recent_ids,
+    get_response_cache,
+    get_router_repo,
+    get_rule_cache,
+)
+from resentry.api.responses import cached_json
+from resentry.config import settings
+from resentry.core.dedupe import RecentIds
+from resentry.core.offload import Offloader
+from resentry.core.outcomes import Outcomes
+from resentry.core.projectkeys import ProjectKeyIndex
+from resentry.core.ratelimit import RateLimiter
+from resentry.core.responsecache import ResponseCache, events_cache_tag
+from resentry.core.rules import RuleCache, RuleSet
+from resentry.core.sentry_auth import sentry_key
+from resentry.core.streams import EventHub, StreamEvent
+from resentry.database import database
+from resentry.database.schemas.envelope import EnvelopeResponse
+from resentry.database.schemas.transaction import (
+    ItemCounter as ItemCounterSchema,
+)
+from resentry.database.schemas.transaction import (
+    Transaction as TransactionSchema,
+)
+from resentry.domain.envelope import EventFilter, EventSort
 from resentry.domain.project import ProjectDTO
+from resentry.repos.envelope import (
+    EnvelopeItemRepository,
+    EnvelopeRepository,
+    encode_cursor,
+)
+from resentry.repos.lease import CacheVersionRepository
+from resentry.repos.project import ProjectRepository
+from resentry.repos.queue import QueuedEventRepository
+from resentry.repos.rule import ProjectRuleRepository
+from resentry.repos.transaction import ItemCounterRepository, TransactionRepository
 from resentry.services.project import ProjectService
-from resentry.services.user import UserService
-from resentry.database.schemas.envelope import EnvelopeResponse
-from resentry.usecases.envelope import StoreEnvelope
+from resentry.usecases.envelope import (
+    EnvelopeDropped,
+    EnvelopeDuplicate,
+    StoreEnvelope,
+    stream_event,
+)
 from resentry.usecases.events import ScheduleEnvelope
+from resentry.usecases.export import ExportEvents, gzip_stream
 
 envelopes_router = APIRouter()
 project_repo = get_router_repo(ProjectRepository)
 envelope_repo = get_router_repo(EnvelopeRepository)
 envelope_item_repo = get_router_repo(EnvelopeItemRepository)
-users_repo = get_router_repo(UserRepository)
+queue_repo = get_router_repo(QueuedEventRepository)
+rule_repo = get_router_repo(ProjectRuleRepository)
+transaction_repo = get_router_repo(TransactionRepository)
+counter_repo = get_router_repo(ItemCounterRepository)
+cache_version_repo = get_router_repo(CacheVersionRepository)
 
 
 async def load_and_check_project(
+    request: Request,
     project_id: int = Path(...),
-    x_sentry_auth: str = Header(...),
     repo: ProjectRepository = Depends(project_repo),
+    key_index: ProjectKeyIndex = Depends(get_project_keys),
 ) -> ProjectDTO:
-    project_service = ProjectService(repo=repo)
-    project = await project_service.get_project_by_id(project_id)
-    if project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
+    key = sentry_key(dict(request.headers), dict(request.query_params))
+    if key is None and request.headers.get("content-encoding") is None:
+        # tunneled envelopes carry the DSN in the envelope header only
+        key = sentry_key(body=await request.body())
+    if key is None:
+        raise HTTPException(status_code=401, detail="Missing sentry_key")
 
-    if f"sentry_key={project.key}" not in x_sentry_auth:
+    if not key_index.loaded:
+        key_index.load(await ProjectService(repo=repo).get_all())
+    project = key_index.get(key)
+    if project is None or project.id != project_id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
     return project
 
 
+async def load_project_rules(
+    project: ProjectDTO = Depends(load_and_check_project),
+    repo: ProjectRuleRepository = Depends(rule_repo),
+    cache: RuleCache = Depends(get_rule_cache),
+) -> RuleSet:
+    if (rule_set := cache.get(project.id)) is None:
+        rules = await repo.get_all_by_project(project.id)
+        rule_set = cache.set(project.id, RuleSet.compile(rules))
+    return rule_set
+
+
 @envelopes_router.post("/{project_id}/envelope/")
 async def store_envelope(
     request: Request,
     project: ProjectDTO = Depends(load_and_check_project),
     repo: EnvelopeRepository = Depends(envelope_repo),
     repo_items: EnvelopeItemRepository = Depends(envelope_item_repo),
-    repo_users: UserRepository = Depends(users_repo),
-    queue: Queue = Depends(get_queue),
+    repo_transactions: TransactionRepository = Depends(transaction_repo),
+    repo_counters: ItemCounterRepository = Depends(counter_repo),
+    repo_queue: QueuedEventRepository = Depends(queue_repo),
+    repo_versions: CacheVersionRepository = Depends(cache_version_repo),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+    outcomes: Outcomes = Depends(get_outcomes),
+    rules: RuleSet = Depends(load_project_rules),
+    recent_ids: RecentIds = Depends(get_recent_ids),
+    offloader: Offloader = Depends(get_offloader),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    event_hub: EventHub = Depends(get_event_hub),
 ):
     # Read the raw body bytes
     body = await request.body()
+
+    if retry_after := rate_limiter.acquire(project, size=len(body)):
+        outcomes.record(project.id, "ratelimited")
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={
+                "Retry-After": str(retry_after),
+                "X-Sentry-Rate-Limits": f"{retry_after}::project",
+            },
+        )
     content_encoding = request.headers.get("content-encoding", None)
 
     envelope_handler = StoreEnvelope(
@@ -54,30 +151,231 @@ async def store_envelope(
         body=body,
         repo=repo,
         repo_items=repo_items,
+        repo_transactions=repo_transactions,
+        repo_counters=repo_counters,
         project_id=project.id,
+        rules=rules,
+        outcomes=outcomes,
+        recent_ids=recent_ids,
+        offloader=offloader,
+        response_cache=response_cache,
+        event_hub=event_hub,
+        repo_versions=repo_versions,
     )
-    envelope_db = await envelope_handler.execute()
+    try:
+        result = await envelope_handler.execute()
+    except EnvelopeDropped:
+        return {"message": "Envelope dropped", "envelope_id": None}
+    except EnvelopeDuplicate:
+        # acknowledge so the SDK stops retrying
+        outcomes.record(project.id, "duplicate")
+        return {"message": "Envelope already stored", "envelope_id": None}
 
-    if envelope_db is None:
+    if result is None:
         raise HTTPException(status_code=400, detail="Invalid envelope format")
 
-    # Check if envelope_db.items exists and is iterable before the loop
-    user_service = UserService(repo=repo_users)
+    envelope_db = result.envelope
+    if envelope_db is None:
+        # performance and session data only, nothing to alert on
+        return {"message": "Envelope stored successfully", "envelope_id": None}
 
-    if user_dtos := await user_service.get_all():
-        await ScheduleEnvelope(queue=queue, project=project, users=user_dtos).execute(
-            envelope_db
-        )
+    await ScheduleEnvelope(
+        repo=repo_queue,
+        project=project,
+        levels=frozenset(settings.NOTIFY_LEVELS),
+    ).execute(envelope_db, result.items)
 
     return {"message": "Envelope stored successfully", "envelope_id": envelope_db.id}
 
 
+async def page_events(
+    request: Request,
+    repo: EnvelopeRepository,
+    cache: ResponseCache,
+    filters: EventFilter,
+    sort: EventSort,
+    cursor: str | None,
+    limit: int,
+    schema: type[BaseModel],
+    with_items: bool = True,
+) -> Response:
+    """One page of the event list as a conditional, cached response.
+
+    The ETag combines the project's events version, bumped by every ingest
+    and import, with a digest of the query string, so each page and filter
+    has its own tag. X-Next-Cursor is set when the page is full.
+    """
+
+    async def render():
+        try:
+            envelopes = await repo.find(
+                filters, sort=sort, cursor=cursor, limit=limit, with_items=with_items
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        headers = {}
+        if len(envelopes) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(envelopes[-1], sort)
+        content = [
+            schema.model_validate(envelope, from_attributes=True).model_dump(
+                mode="json"
+            )
+            for envelope in envelopes
+        ]
+        return content, headers
+
+    tag = events_cache_tag(filters.project_id)
+    versions = CacheVersionRepository(repo.db)
+    if filters.project_id is None:
+        # all projects: the sum of the per-project versions
+        version = await versions.get_total("events:")
+    else:
+        version = await versions.get_version(tag)
+    # same parameters in another order are the same page
+    query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2b(query.encode(), digest_size=8).hexdigest()
+    etag = f'"{tag}-{version}-{digest}"'
+    return await cached_json(request, cache, tag, etag, render)
+
+
 @envelopes_router.get(
-    "/projects/{project_id}/events", response_model=List[EnvelopeResponse]
+    "/projects/{project_id}/events", response_model=list[EnvelopeResponse]
 )
 async def get_project_events(
+    request: Request,
     project_id: int,
+    filters: EventFilter = Depends(get_event_filter),
+    sort: EventSort = Query(default=EventSort.id),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of a page"),
+    after: int | None = Query(
+        default=None, ge=0, description="Last seen envelope id, for the id sort"
+    ),
+    limit: int = Query(default=100, ge=1, le=1000),
     _: int = Depends(get_current_user_id),
     repo: EnvelopeRepository = Depends(envelope_repo),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    if cursor is None and after is not None:
+        cursor = str(after)
+    return await page_events(
+        request,
+        repo,
+        cache,
+        replace(filters, project_id=project_id),
+        sort,
+        cursor,
+        limit,
+        schema=EnvelopeResponse,
+    )
+
+
+@envelopes_router.get("/projects/{project_id}/events/export")
+async def export_project_events(
+    request: Request,
+    project_id: int,
+    after: int = Query(default=0, ge=0, description="Resume after this event id"),
+    filters: EventFilter = Depends(get_event_filter),
+    _: int = Depends(get_current_user_id),
+):
+    async def lines():
+        # the request session is closed before the body is streamed, the
+        # export reads through its own
+        async with database.create_async_session() as session:
+            export = ExportEvents(
+                repo=EnvelopeItemRepository(session),
+                project_id=project_id,
+                filters=filters,
+                after=after,
+            )
+            async for line in export.lines():
+                yield line
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return StreamingResponse(
+            gzip_stream(lines()),
+            media_type="application/x-ndjson",
+            headers={"Content-Encoding": "gzip"},
+        )
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def sse_event(event: StreamEvent) -> bytes:
+    return b"id: %d\nevent: envelope\ndata: %s\n\n" % (event.envelope_id, event.data)
+
+
+@envelopes_router.get("/projects/{project_id}/events/stream")
+async def stream_project_events(
+    project_id: int,
+    filters: EventFilter = Depends(get_event_filter),
+    last_event_id: int | None = Header(default=None, ge=0),
+    _: int = Depends(get_current_user_id),
+    hub: EventHub = Depends(get_event_hub),
+):
+    """Server-Sent Events of envelopes stored from now on.
+
+    Filters are level/environment/release/type, since/until do not apply to
+    a live stream. A client resuming with Last-Event-ID first gets the
+    events it missed. A client too slow to keep up gets an `evicted` event
+    and the stream ends; it reconnects with the last id it received.
+    """
+    filters = replace(filters, project_id=project_id, since=None, until=None)
+
+    async def events():
+        # subscribe before replaying, nothing is lost in between
+        subscription = hub.subscribe(project_id, filters)
+        try:
+            yield b"retry: 3000\n\n"
+            last_id = last_event_id
+            while last_id is not None:
+                # the request session is closed before the body is streamed
+                async with database.create_async_session() as session:
+                    envelopes = await EnvelopeRepository(session).find(
+                        filters, cursor=str(last_id), limit=settings.STREAM_REPLAY_BATCH
+                    )
+                for envelope in envelopes:
+                    last_id = envelope.id
+                    yield sse_event(stream_event(envelope, envelope.items))
+                if len(envelopes) < settings.STREAM_REPLAY_BATCH:
+                    break
+
+            # StreamingResponse cancels this generator once the client is gone
+            while True:
+                event = await subscription.get(settings.STREAM_HEARTBEAT)
+                if subscription.evicted:
+                    yield b"event: evicted\ndata: {}\n\n"
+                    return
+                if event is None:
+                    yield b": ping\n\n"
+                elif last_id is None or event.envelope_id > last_id:
+                    yield sse_event(event)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@envelopes_router.get(
+    "/projects/{project_id}/transactions", response_model=list[TransactionSchema]
+)
+async def get_project_transactions(
+    project_id: int,
+    limit: int = Query(default=100, ge=1, le=1000),
+    _: int = Depends(get_current_user_id),
+    repo: TransactionRepository = Depends(transaction_repo),
+):
+    return await repo.get_all_by_project(project_id, limit=limit)
+
+
+@envelopes_router.get(
+    "/projects/{project_id}/counters", response_model=list[ItemCounterSchema]
+)
+async def get_project_counters(
+    project_id: int,
+    _: int = Depends(get_current_user_id),
+    repo: ItemCounterRepository = Depends(counter_repo),
 ):
     return await repo.get_all_by_project(project_id)
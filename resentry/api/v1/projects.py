@@ -1,30 +1,78 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from dataclasses import replace
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from resentry.api.deps import (
-    get_router_repo,
+    get_cache_bus,
     get_current_user_id,
+    get_event_filter,
+    get_outcomes,
+    get_response_cache,
+    get_router_repo,
+)
+from resentry.api.responses import cached_json
+from resentry.api.v1.envelopes import page_events
+from resentry.core.cachebus import CacheBus
+from resentry.core.outcomes import Outcomes
+from resentry.core.responsecache import ResponseCache
+from resentry.database.models.channel import NotificationChannel
+from resentry.database.models.rule import ProjectRule
+from resentry.database.schemas.channel import (
+    NotificationChannel as NotificationChannelSchema,
+)
+from resentry.database.schemas.channel import (
+    NotificationChannelCreate,
 )
+from resentry.database.schemas.envelope import Envelope as EnvelopeSchema
 from resentry.database.schemas.project import (
     Project as ProjectSchema,
+)
+from resentry.database.schemas.project import (
     ProjectCreate,
+    ProjectOutcomes,
     ProjectUpdate,
 )
-from resentry.database.schemas.envelope import Envelope as EnvelopeSchema
-from resentry.repos.project import ProjectRepository
+from resentry.database.schemas.rule import (
+    ProjectRule as ProjectRuleSchema,
+)
+from resentry.database.schemas.rule import (
+    ProjectRuleCreate,
+)
+from resentry.domain.envelope import EventFilter, EventSort
+from resentry.repos.channel import NotificationChannelRepository
 from resentry.repos.envelope import EnvelopeRepository
+from resentry.repos.lease import CacheVersionRepository
+from resentry.repos.outcome import OutcomeRepository
+from resentry.repos.project import ProjectRepository
+from resentry.repos.rule import ProjectRuleRepository
 from resentry.usecases.project import CreateProject
 
 projects_router = APIRouter()
 repo_dep = get_router_repo(ProjectRepository)
+rule_repo_dep = get_router_repo(ProjectRuleRepository)
+channel_repo_dep = get_router_repo(NotificationChannelRepository)
+cache_version_repo_dep = get_router_repo(CacheVersionRepository)
+outcome_repo_dep = get_router_repo(OutcomeRepository)
 
 
 @projects_router.get("/", response_model=list[ProjectSchema])
 async def get_projects(
+    request: Request,
     current_user_id: int = Depends(get_current_user_id),
     repo: ProjectRepository = Depends(repo_dep),
+    versions: CacheVersionRepository = Depends(cache_version_repo_dep),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
-    return await repo.get_all()
+    async def render():
+        projects = await repo.get_all()
+        return [
+            ProjectSchema.model_validate(project).model_dump(mode="json")
+            for project in projects
+        ], {}
+
+    # every project change publishes "projects" on the cache bus
+    etag = f'"projects-{await versions.get_version("projects")}"'
+    return await cached_json(request, cache, "projects", etag, render)
 
 
 @projects_router.post("/", response_model=ProjectSchema)
@@ -32,8 +80,38 @@ async def create_project(
     project: ProjectCreate,
     current_user_id: int = Depends(get_current_user_id),
     repo: ProjectRepository = Depends(repo_dep),
+    versions: CacheVersionRepository = Depends(cache_version_repo_dep),
+    cache_bus: CacheBus = Depends(get_cache_bus),
 ):
-    return await CreateProject(repo=repo).execute(body=project)
+    project_db = await CreateProject(repo=repo).execute(body=project)
+    await cache_bus.publish(versions, "projects")
+    return project_db
+
+
+# registered before /{project_id}, which would match "events"
+@projects_router.get("/events", response_model=list[EnvelopeSchema], tags=["envelopes"])
+async def get_v1_project_events(
+    request: Request,
+    project_id: int | None = Query(default=None),
+    filters: EventFilter = Depends(get_event_filter),
+    sort: EventSort = Query(default=EventSort.id),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of a page"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    current_user_id: int = Depends(get_current_user_id),
+    repo: EnvelopeRepository = Depends(get_router_repo(EnvelopeRepository)),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    return await page_events(
+        request,
+        repo,
+        cache,
+        replace(filters, project_id=project_id),
+        sort,
+        cursor,
+        limit,
+        schema=EnvelopeSchema,
+        with_items=False,
+    )
 
 
 @projects_router.get("/{project_id}", response_model=ProjectSchema)
@@ -48,16 +126,117 @@ async def get_project(
     return project
 
 
+@projects_router.get("/{project_id}/outcomes", response_model=ProjectOutcomes)
+async def get_project_outcomes(
+    project_id: int,
+    current_user_id: int = Depends(get_current_user_id),
+    outcomes: Outcomes = Depends(get_outcomes),
+    repo: OutcomeRepository = Depends(outcome_repo_dep),
+):
+    return ProjectOutcomes(
+        project_id=project_id, dropped=await outcomes.for_project(repo, project_id)
+    )
+
+
+@projects_router.get("/{project_id}/rules", response_model=list[ProjectRuleSchema])
+async def get_project_rules(
+    project_id: int,
+    current_user_id: int = Depends(get_current_user_id),
+    repo: ProjectRuleRepository = Depends(rule_repo_dep),
+):
+    return await repo.get_all_by_project(project_id)
+
+
+@projects_router.post("/{project_id}/rules", response_model=ProjectRuleSchema)
+async def create_project_rule(
+    project_id: int,
+    rule: ProjectRuleCreate,
+    current_user_id: int = Depends(get_current_user_id),
+    repo: ProjectRuleRepository = Depends(rule_repo_dep),
+    project_repo: ProjectRepository = Depends(repo_dep),
+    versions: CacheVersionRepository = Depends(cache_version_repo_dep),
+    cache_bus: CacheBus = Depends(get_cache_bus),
+):
+    if await project_repo.get_by_id(project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    rule_db = await repo.create(ProjectRule(project_id=project_id, **rule.model_dump()))
+    await cache_bus.publish(versions, "rules")
+    return rule_db
+
+
+@projects_router.delete("/{project_id}/rules/{rule_id}")
+async def delete_project_rule(
+    project_id: int,
+    rule_id: int,
+    current_user_id: int = Depends(get_current_user_id),
+    repo: ProjectRuleRepository = Depends(rule_repo_dep),
+    versions: CacheVersionRepository = Depends(cache_version_repo_dep),
+    cache_bus: CacheBus = Depends(get_cache_bus),
+):
+    rule = await repo.get_by_id(rule_id)
+    if rule is None or rule.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    await repo.delete(id=rule_id)
+    await cache_bus.publish(versions, "rules")
+    return {"message": "Rule deleted successfully"}
+
+
+@projects_router.get(
+    "/{project_id}/channels", response_model=list[NotificationChannelSchema]
+)
+async def get_project_channels(
+    project_id: int,
+    current_user_id: int = Depends(get_current_user_id),
+    repo: NotificationChannelRepository = Depends(channel_repo_dep),
+):
+    return await repo.get_all_by_project(project_id)
+
+
+@projects_router.post(
+    "/{project_id}/channels", response_model=NotificationChannelSchema
+)
+async def create_project_channel(
+    project_id: int,
+    channel: NotificationChannelCreate,
+    current_user_id: int = Depends(get_current_user_id),
+    repo: NotificationChannelRepository = Depends(channel_repo_dep),
+    project_repo: ProjectRepository = Depends(repo_dep),
+):
+    if await project_repo.get_by_id(project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    # the dispatcher reads channels per batch, no cache to invalidate
+    return await repo.create(
+        NotificationChannel(project_id=project_id, **channel.model_dump())
+    )
+
+
+@projects_router.delete("/{project_id}/channels/{channel_id}")
+async def delete_project_channel(
+    project_id: int,
+    channel_id: int,
+    current_user_id: int = Depends(get_current_user_id),
+    repo: NotificationChannelRepository = Depends(channel_repo_dep),
+):
+    channel = await repo.get_by_id(channel_id)
+    if channel is None or channel.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Channel not found")
+    await repo.delete(id=channel_id)
+    return {"message": "Channel deleted successfully"}
+
+
 @projects_router.put("/{project_id}", response_model=ProjectSchema)
 async def update_project(
     project_id: int,
     project: ProjectUpdate,
     current_user_id: int = Depends(get_current_user_id),
     repo: ProjectRepository = Depends(repo_dep),
+    versions: CacheVersionRepository = Depends(cache_version_repo_dep),
+    cache_bus: CacheBus = Depends(get_cache_bus),
 ):
     update_project = await repo.update(project_id, project)
     if update_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
+    await cache_bus.publish(versions, "projects")
     return update_project
 
 
@@ -66,14 +245,9 @@ async def delete_project(
     project_id: int,
     current_user_id: int = Depends(get_current_user_id),
     repo: ProjectRepository = Depends(repo_dep),
+    versions: CacheVersionRepository = Depends(cache_version_repo_dep),
+    cache_bus: CacheBus = Depends(get_cache_bus),
 ):
     await repo.delete(id=project_id)
+    await cache_bus.publish(versions, "projects")
     return {"message": "Project deleted successfully"}
-
-
-@projects_router.get("/events", response_model=List[EnvelopeSchema], tags=["envelopes"])
-async def get_v1_project_events(
-    current_user_id: int = Depends(get_current_user_id),
-    repo: EnvelopeRepository = Depends(get_router_repo(EnvelopeRepository)),
-):
-    return await repo.get_all()
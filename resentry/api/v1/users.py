@@ -1,12 +1,11 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 
-from resentry.api.deps import get_router_repo, get_current_user_id
+from resentry.api.deps import get_router_repo, get_current_user_id, get_hasher
 from resentry.core.hashing import Hasher
 from resentry.database.schemas.user import User as UserSchema, UserCreate, UserUpdate
 from resentry.repos.user import UserRepository
 from resentry.usecases.user import CreateUser
-from resentry.config import settings
 
 users_router = APIRouter()
 repo_dep = get_router_repo(UserRepository)
@@ -25,11 +24,9 @@ async def create_user(
     user: UserCreate,
     current_user_id: int = Depends(get_current_user_id),
     repo: UserRepository = Depends(repo_dep),
+    hasher: Hasher = Depends(get_hasher),
 ):
-    return await CreateUser(
-        repo=repo,
-        hasher=Hasher(salt=settings.SALT),
-    ).execute(body=user)
+    return await CreateUser(repo=repo, hasher=hasher).execute(body=user)
 
 
 @users_router.get("/{user_id}", response_model=UserSchema)
@@ -1,25 +1,36 @@
 """Command line interface for Resentry application"""
 
-import asyncio
-import sys
-from typing import Optional
 import argparse
+import asyncio
 import getpass
+import os
+import sys
+from datetime import UTC
 
-from resentry.main import create_app
 from resentry.config import settings
 from resentry.core.hashing import Hasher
 from resentry.database.database import create_db_and_tables
 from resentry.database.schemas.user import UserCreate
-from resentry.usecases.user import CreateUser
+from resentry.main import create_app, lifespan
 from resentry.repos.user import UserRepository
+from resentry.usecases.user import CreateUser
 
 
-def run_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
+def run_server(
+    host: str = "0.0.0.0", port: int = 8000, reload: bool = False, workers: int = 1
+):
     """Run the Resentry server"""
     import uvicorn
 
-    app = create_app(lifespan=None)
+    if workers > 1:
+        # worker processes import the app themselves and read the settings
+        # from the environment, rate limits are split between them
+        os.environ["RESENTRY_WORKERS"] = str(workers)
+        uvicorn.run("resentry.main:app", host=host, port=port, workers=workers)
+        return
+
+    # the lifespan runs the embedded dispatcher and the background polls
+    app = create_app(lifespan=lifespan)
 
     if reload:
         uvicorn.run(app, host=host, port=port, reload=True)
@@ -27,7 +38,7 @@ def run_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
         uvicorn.run(app, host=host, port=port, reload=False)
 
 
-async def add_user_async(username: str, password: Optional[str] = None):
+async def add_user_async(username: str, password: str | None = None):
     """Add a new user to the database asynchronously using usecase"""
     # Get password from user if not provided
     if password is None:
@@ -39,9 +50,7 @@ async def add_user_async(username: str, password: Optional[str] = None):
     # Create the hasher
     from resentry.database.database import create_async_session
 
-    hasher = Hasher(
-        settings.SALT.encode() if isinstance(settings.SALT, str) else settings.SALT
-    )
+    hasher = Hasher(rounds=settings.BCRYPT_ROUNDS)
 
     async with create_async_session() as session:
         # Create repository
@@ -72,11 +81,107 @@ async def add_user_async(username: str, password: Optional[str] = None):
             return False
 
 
-def add_user(username: str, password: Optional[str] = None):
+def add_user(username: str, password: str | None = None):
     """Add a new user to the database"""
     return asyncio.run(add_user_async(username, password))
 
 
+async def dispatch_async(replay_failed: bool = False):
+    """Send queued notifications until interrupted"""
+    from datetime import datetime
+
+    from resentry.database.database import create_async_session
+    from resentry.infra.telegram import create_http_client
+    from resentry.main import create_dispatcher
+    from resentry.repos.queue import QueuedEventRepository
+
+    await create_db_and_tables()
+    if replay_failed:
+        async with create_async_session() as session:
+            count = await QueuedEventRepository(session).requeue_failed(
+                datetime.now(UTC)
+            )
+            await session.commit()
+        print(f"Requeued {count} failed events.")
+    client = create_http_client(
+        pool_size=settings.DELIVERY_POOL_SIZE, timeout=settings.DELIVERY_TIMEOUT
+    )
+    dispatcher = create_dispatcher(client)
+    try:
+        await dispatcher.run()
+    finally:
+        await dispatcher.close()
+        await client.aclose()
+
+
+def dispatch(replay_failed: bool = False):
+    """Run the notification dispatcher as a standalone process"""
+    try:
+        asyncio.run(dispatch_async(replay_failed))
+    except KeyboardInterrupt:
+        pass
+
+
+async def import_async(
+    paths: list[str],
+    project_id: int,
+    workers: int | None = None,
+    batch_size: int = 1000,
+) -> bool:
+    """Parse archived envelopes in worker processes and bulk insert them"""
+    import time
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from pathlib import Path
+
+    from resentry.database.database import create_async_session
+    from resentry.repos.project import ProjectRepository
+    from resentry.usecases.imports import ImportEnvelopes, iter_chunks, parse_chunk
+
+    await create_db_and_tables()
+    loop = asyncio.get_running_loop()
+
+    async with create_async_session() as session:
+        if await ProjectRepository(session).get_by_id(project_id) is None:
+            print(f"Error: Project {project_id} does not exist.")
+            return False
+
+        importer = ImportEnvelopes(session=session, project_id=project_id)
+        reported = time.monotonic()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # keep a few chunks in flight so parsing overlaps the inserts
+            # without reading the whole archive into memory
+            window = (workers or os.cpu_count() or 1) * 2
+            pending: deque[asyncio.Future] = deque()
+            chunks = iter_chunks([Path(p) for p in paths], batch_size)
+            for kind, chunk in chunks:
+                pending.append(
+                    loop.run_in_executor(pool, parse_chunk, project_id, kind, chunk)
+                )
+                if len(pending) < window:
+                    continue
+                await importer.execute(await pending.popleft())
+                if time.monotonic() - reported >= 5:
+                    reported = time.monotonic()
+                    print(f"... {importer.stats}", flush=True)
+            while pending:
+                await importer.execute(await pending.popleft())
+            await importer.flush()
+
+    print(f"Imported {importer.stats}")
+    return True
+
+
+def import_envelopes(
+    paths: list[str],
+    project_id: int,
+    workers: int | None = None,
+    batch_size: int = 1000,
+) -> bool:
+    """Import archived envelopes into a project"""
+    return asyncio.run(import_async(paths, project_id, workers, batch_size))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Resentry CLI")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
@@ -94,6 +199,19 @@ def main():
     runserver_parser.add_argument(
         "--reload", action="store_true", help="Enable auto-reload"
     )
+    runserver_parser.add_argument(
+        "--workers", type=int, default=1, help="Number of worker processes"
+    )
+
+    # Dispatch command
+    dispatch_parser = subparsers.add_parser(
+        "dispatch", help="Run the notification dispatcher in this process"
+    )
+    dispatch_parser.add_argument(
+        "--replay-failed",
+        action="store_true",
+        help="Retry events that ran out of delivery attempts",
+    )
 
     # Add-user command
     adduser_parser = subparsers.add_parser("add-user", help="Add a new user")
@@ -104,11 +222,41 @@ def main():
         help="Password for the new user (optional, will prompt if not provided)",
     )
 
+    # Import command
+    import_parser = subparsers.add_parser(
+        "import", help="Bulk import envelope files or NDJSON exports"
+    )
+    import_parser.add_argument(
+        "paths", nargs="+", help="Envelope files, .ndjson/.jsonl files or directories"
+    )
+    import_parser.add_argument(
+        "--project-id", type=int, required=True, help="Project to import into"
+    )
+    import_parser.add_argument(
+        "--workers", type=int, default=None, help="Parser processes (default: CPUs)"
+    )
+    import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Envelopes per parse chunk and insert transaction",
+    )
+
     # Parse arguments
     args = parser.parse_args()
 
     if args.command == "runserver":
-        run_server(host=args.host, port=args.port, reload=args.reload)
+        run_server(
+            host=args.host, port=args.port, reload=args.reload, workers=args.workers
+        )
+    elif args.command == "import":
+        success = import_envelopes(
+            args.paths, args.project_id, args.workers, args.batch_size
+        )
+        if not success:
+            sys.exit(1)
+    elif args.command == "dispatch":
+        dispatch(replay_failed=args.replay_failed)
     elif args.command == "add-user":
         success = add_user(args.username, args.password)
         if not success:
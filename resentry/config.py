@@ -1,13 +1,78 @@
 import os
 
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
+    # PEM keys for RS*/PS*/ES*/EdDSA algorithms; an instance with only the
+    # public key verifies tokens but cannot issue them
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    TOKEN_CACHE_SIZE: int = 1024
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
     TELEGRAM_TOKEN: str
+    RATE_LIMIT_BURST: float = 2.0
+    DEDUPE_CACHE_SIZE: int = 10_000
+    NOTIFY_LEVELS: list[str] = ["error"]
+    # number of server processes sharing the database, per-process rate
+    # limits are divided by it
+    WORKERS: int = 1
+    # "embedded" runs the notification dispatcher inside the app (one
+    # process wins the leader lease), "external" expects a separate
+    # `python -m resentry.cli dispatch`
+    DISPATCHER: str = "embedded"
+    DISPATCH_POLL_INTERVAL: float = 1.0
+    DISPATCH_BATCH_SIZE: int = 100
+    # seconds a claimed event stays invisible to other dispatchers
+    DISPATCH_VISIBILITY_TIMEOUT: float = 60.0
+    DISPATCH_MAX_ATTEMPTS: int = 10
+    DISPATCH_RETRY_DELAY: float = 5.0
+    # queued events sent at the same time
+    DISPATCH_CONCURRENCY: int = 10
+    # outbound notifications (Telegram, webhooks, Slack, email)
+    DELIVERY_POOL_SIZE: int = 100
+    DELIVERY_PER_DESTINATION: int = 4
+    DELIVERY_TIMEOUT: float = 10.0
+    DELIVERY_RETRIES: int = 2
+    DELIVERY_RETRY_DELAY: float = 0.5
+    # failures in a row that open a destination's circuit, and for how long
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 30.0
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 1025
+    SMTP_FROM: str = "resentry@localhost"
+    LEASE_TTL: float = 15.0
+    CACHE_POLL_INTERVAL: float = 1.0
+    # seconds between writes of the dropped data counters to the database
+    OUTCOMES_FLUSH_INTERVAL: float = 5.0
+    # rendered list responses are reused for this many seconds while their
+    # ETag is unchanged, 0 disables the cache (ETags stay)
+    RESPONSE_CACHE_TTL: float = 2.0
+    RESPONSE_CACHE_SIZE: int = 512
+    # events a live stream subscriber may lag behind before it is dropped
+    STREAM_BUFFER_SIZE: int = 100
+    # seconds between keep-alive comments on an idle stream
+    STREAM_HEARTBEAT: float = 15.0
+    # events read per query when a stream resumes from Last-Event-ID
+    STREAM_REPLAY_BATCH: int = 500
+    # envelope ids below the newest seen one that the stream poller reads
+    # again, so envelopes committed out of id order by other workers still
+    # reach subscribers
+    STREAM_POLL_LAG: int = 1000
+    # bodies at least this large are decompressed and parsed off the event
+    # loop, in a "thread" or "process" pool ("inline" disables offloading)
+    OFFLOAD_MODE: str = "thread"
+    OFFLOAD_THRESHOLD: int = 256 * 1024
+    OFFLOAD_WORKERS: int | None = None
+    LOOP_LAG_INTERVAL: float = 0.5
+    BCRYPT_ROUNDS: int = 12
+    # threads hashing passwords, bcrypt never runs on the event loop
+    HASH_WORKERS: int = 2
+    LOGIN_MAX_FAILURES: int = 5
+    LOGIN_FAILURE_WINDOW: float = 300.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -23,10 +88,17 @@ class DevSettings(Settings):
     SALT: bytes = b"$2b$12$gj7lkAtmwGLm8W8Wg50h6."
 
 
-class ProdSettings(BaseSettings):
-    DATABASE_URL: str
-    SECRET_KEY: str
-    SALT: bytes
+def _env(name: str) -> AliasChoices:
+    # production env files predate the RESENTRY_ prefix, both names work
+    return AliasChoices(f"RESENTRY_{name}", name)
+
+
+class ProdSettings(Settings):
+    DATABASE_URL: str = Field(validation_alias=_env("DATABASE_URL"))
+    SECRET_KEY: str = Field(validation_alias=_env("SECRET_KEY"))
+    TELEGRAM_TOKEN: str = Field(validation_alias=_env("TELEGRAM_TOKEN"))
+    # unused since every hash carries its own salt, kept for old env files
+    SALT: bytes | None = Field(default=None, validation_alias=_env("SALT"))
 
 
 class TestSettings(Settings):
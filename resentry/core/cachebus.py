@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from resentry.database.session import on_commit
+from resentry.repos.lease import CacheVersionRepository
+
+
+@dataclass
+class CacheBus:
+    """Propagates cache invalidations between worker processes.
+
+    Writers bump a named version in the cache_versions table inside their
+    transaction, every worker polls the table and drops the local caches
+    subscribed to changed names.
+    """
+
+    poll_interval: float = 1.0
+    listeners: dict[str, list[Callable[[], None]]] = field(default_factory=dict)
+    versions: dict[str, int] = field(default_factory=dict)
+
+    def subscribe(self, name: str, callback: Callable[[], None]) -> None:
+        self.listeners.setdefault(name, []).append(callback)
+
+    def _notify(self, name: str) -> None:
+        for callback in self.listeners.get(name, []):
+            callback()
+
+    async def publish(self, repo: CacheVersionRepository, name: str) -> None:
+        """Bump `name` in the caller's transaction, local caches drop on commit."""
+        await repo.bump(name)
+        on_commit(repo.db, lambda: self._notify(name))
+
+    async def poll(self, session: AsyncSession) -> list[str]:
+        changed = []
+        for row in await CacheVersionRepository(session).get_all():
+            if self.versions.get(row.name) != row.version:
+                self.versions[row.name] = row.version
+                changed.append(row.name)
+                self._notify(row.name)
+        return changed
+
+    async def run(self, session_factory: Callable[[], AsyncSession]) -> None:
+        while True:
+            try:
+                async with session_factory() as session:
+                    await self.poll(session)
+            except Exception:
+                logging.exception("cache bus poll failed")
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,25 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RecentIds:
+    """Bounded LRU of recently ingested (project_id, event_id) pairs.
+
+    Lets retried envelopes be acknowledged without touching the database.
+    """
+
+    maxsize: int = 10_000
+    ids: OrderedDict[tuple[int, str], None] = field(default_factory=OrderedDict)
+
+    def __contains__(self, key: tuple[int, str]) -> bool:
+        if key in self.ids:
+            self.ids.move_to_end(key)
+            return True
+        return False
+
+    def add(self, key: tuple[int, str]) -> None:
+        self.ids[key] = None
+        self.ids.move_to_end(key)
+        while len(self.ids) > self.maxsize:
+            self.ids.popitem(last=False)
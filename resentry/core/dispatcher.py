@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import os
+import socket
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from resentry.core.events import EventWorker
+from resentry.database.models.queue import QueuedEvent
+from resentry.domain.project import ProjectDTO
+from resentry.domain.queue import Channel, Event, LogLevel
+from resentry.domain.user import UserDTO
+from resentry.infra.delivery import CircuitOpenError
+from resentry.repos.channel import NotificationChannelRepository
+from resentry.repos.lease import LeaseRepository
+from resentry.repos.project import ProjectRepository
+from resentry.repos.queue import QueuedEventRepository
+from resentry.repos.user import UserRepository
+from resentry.services.project import ProjectService
+from resentry.services.user import UserService
+
+
+def _owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+@dataclass
+class LeaderLease:
+    """Leader election over the database: the owner of a live lease leads."""
+
+    name: str
+    ttl: float = 15.0
+    owner: str = field(default_factory=_owner_id)
+
+    async def acquire(self, session: AsyncSession) -> bool:
+        now = datetime.now(UTC)
+        acquired = await LeaseRepository(session).acquire(
+            self.name, self.owner, now, now + timedelta(seconds=self.ttl)
+        )
+        await session.commit()
+        return acquired
+
+    async def release(self, session: AsyncSession) -> None:
+        await LeaseRepository(session).release(self.name, self.owner, datetime.now(UTC))
+        await session.commit()
+
+
+@dataclass
+class Dispatcher:
+    """Sends queued events to the registered senders.
+
+    Delivery is at least once: an event is claimed for `visibility_timeout`
+    seconds, deleted after every sender succeeded and retried with
+    exponential backoff otherwise. A retry skips the senders and channels
+    recorded as delivered, so only failed destinations see the event again.
+    With a lease only the process holding it
+    dispatches, so several ingest workers can share one queue. Up to
+    `concurrency` events of a batch are sent at the same time.
+    """
+
+    event_worker: EventWorker
+    session_factory: Callable[[], AsyncSession]
+    lease: LeaderLease | None = None
+    poll_interval: float = 1.0
+    batch_size: int = 100
+    visibility_timeout: float = 60.0
+    max_attempts: int = 10
+    retry_delay: float = 5.0
+    max_retry_delay: float = 600.0
+    concurrency: int = 10
+    replayed: bool = False
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = self.retry_delay * 2 ** max(attempts - 1, 0)
+        return timedelta(seconds=min(delay, self.max_retry_delay))
+
+    async def _load_events(
+        self, session: AsyncSession, queued: Sequence[QueuedEvent]
+    ) -> list[tuple[QueuedEvent, Event | None]]:
+        users: list[UserDTO] = await UserService(UserRepository(session)).get_all()
+        project_service = ProjectService(ProjectRepository(session))
+        channel_repo = NotificationChannelRepository(session)
+        projects: dict[int, ProjectDTO | None] = {}
+        channels: dict[int, list[Channel]] = {}
+
+        events = []
+        for row in queued:
+            if row.project_id not in projects:
+                projects[row.project_id] = await project_service.get_project_by_id(
+                    row.project_id
+                )
+                channels[row.project_id] = [
+                    Channel(
+                        id=channel.id,  # pyright: ignore[reportArgumentType]
+                        kind=channel.kind,
+                        target=channel.target,
+                        level=channel.level,
+                    )
+                    for channel in await channel_repo.get_all_by_project(
+                        row.project_id, enabled=True
+                    )
+                ]
+            if (project := projects[row.project_id]) is None:
+                # the project was deleted, nothing to send
+                events.append((row, None))
+                continue
+            events.append(
+                (
+                    row,
+                    Event(
+                        level=LogLevel(row.level),
+                        event_id=row.envelope_id,
+                        project=project,
+                        message=row.message,
+                        server_name=row.server_name,
+                        environment=row.environment,
+                        users=users,
+                        sent_at=row.sent_at,
+                        channels=channels[row.project_id],
+                    ),
+                )
+            )
+        return events
+
+    async def _replay(self, session: AsyncSession) -> None:
+        """Retry events a previous leader claimed but never acknowledged."""
+        released = await QueuedEventRepository(session).release_claims(
+            datetime.now(UTC)
+        )
+        if released:
+            logging.info("replaying %s unacknowledged events", released)
+        self.replayed = True
+
+    async def _send(self, row: QueuedEvent, event: Event | None) -> None:
+        error = None
+        delay = self._backoff(row.attempts)
+        delivered = set(row.delivered.split(",")) if row.delivered else set()
+        if event is not None:
+            try:
+                await self.event_worker.process_event(event, delivered)
+            except Exception as e:
+                logging.exception("failed to dispatch event %s", row.envelope_id)
+                error = repr(e)
+                if isinstance(e, CircuitOpenError):
+                    # no point in trying before the circuit lets a call through
+                    delay = max(delay, timedelta(seconds=e.retry_after))
+        delivered_keys = ",".join(sorted(delivered)) or None
+
+        async with self.session_factory() as session:
+            repo = QueuedEventRepository(session)
+            if error is None:
+                await repo.ack(row.id)
+            elif row.attempts >= self.max_attempts:
+                logging.error(
+                    "giving up on event %s after %s attempts",
+                    row.envelope_id,
+                    row.attempts,
+                )
+                await repo.fail(row.id, error, delivered_keys)
+            else:
+                await repo.retry(
+                    row.id,
+                    error,
+                    datetime.now(UTC) + delay,
+                    delivered_keys,
+                )
+            await session.commit()
+
+    async def dispatch_once(self) -> int:
+        async with self.session_factory() as session:
+            if self.lease is not None and not await self.lease.acquire(session):
+                self.replayed = False
+                return 0
+            if not self.replayed:
+                await self._replay(session)
+            now = datetime.now(UTC)
+            queued = await QueuedEventRepository(session).claim(
+                self.batch_size,
+                now,
+                now + timedelta(seconds=self.visibility_timeout),
+            )
+            events = await self._load_events(session, queued) if queued else []
+            await session.commit()
+
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def send(row: QueuedEvent, event: Event | None) -> None:
+            async with limit:
+                await self._send(row, event)
+
+        renew = (
+            asyncio.create_task(self._keep_lease(self.lease))
+            if self.lease is not None and events
+            else None
+        )
+        try:
+            await asyncio.gather(*(send(row, event) for row, event in events))
+        finally:
+            if renew is not None:
+                renew.cancel()
+        return len(events)
+
+    async def _keep_lease(self, lease: LeaderLease) -> None:
+        """Renew the lease while a batch is sent, sending can outlast its ttl."""
+        while True:
+            await asyncio.sleep(lease.ttl / 3)
+            try:
+                async with self.session_factory() as session:
+                    if not await lease.acquire(session):
+                        logging.warning("dispatcher lease lost during a batch")
+            except Exception:
+                logging.exception("renewing the dispatcher lease failed")
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except Exception:
+                logging.exception("dispatcher iteration failed")
+                processed = 0
+            if processed == 0:
+                await asyncio.sleep(self.poll_interval)
+
+    async def close(self) -> None:
+        if self.lease is not None:
+            async with self.session_factory() as session:
+                await self.lease.release(session)
@@ -1,24 +1,85 @@
+import asyncio
 import logging
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
-from typing import Callable, override
+from functools import partial
+from typing import override
 
-from resentry.domain.queue import Event
+from resentry.domain.queue import Channel, Event
+from resentry.infra.delivery import Delivery, DeliveryError
+from resentry.infra.smtp import SmtpService
 from resentry.infra.telegram import TelegramService
 
 
+def dropped(error: BaseException) -> bool:
+    """Failures a retry cannot fix, such as client errors.
+
+    An open circuit is not one of them, the event is sent once it closes.
+    """
+    return isinstance(error, DeliveryError) and not error.retryable
+
+
 @dataclass
 class EventWorker:
-    events: dict[str, list[Callable]] = field(default_factory=dict)
+    # (destination key, send) pairs per level
+    events: dict[str, list[tuple[str, Callable]]] = field(default_factory=dict)
+    # senders of the project notification channels by channel kind
+    channels: dict[str, "ChannelSender"] = field(default_factory=dict)
+
+    def _calls(self, event: Event) -> list[tuple[str, Callable[[], Awaitable[None]]]]:
+        calls = [
+            (key, partial(call, event))
+            for key, call in self.events.get(event.level, [])
+        ]
+        for channel in event.channels:
+            if not channel.wants(event.level):
+                continue
+            if (sender := self.channels.get(channel.kind)) is None:
+                logging.warning("no sender for %s channel %s", channel.kind, channel.id)
+                continue
+            calls.append(
+                (f"channel:{channel.id}", partial(sender.deliver, event, channel))
+            )
+        return calls
+
+    async def process_event(self, event: Event, delivered: set[str] | None = None):
+        """Send `event` to every destination whose key is not in `delivered`.
 
-    async def process_event(self, event: Event):
-        for call in self.events.get(event.level, []):
-            await call(event)
+        Senders run side by side, a slow one does not delay the others. The
+        keys of the destinations that got the event are added to
+        `delivered`; failures a retry cannot fix are logged and dropped, the
+        first other failure is raised so the event is retried for the
+        remaining destinations only.
+        """
+        if delivered is None:
+            delivered = set()
+        calls = [
+            (key, call) for key, call in self._calls(event) if key not in delivered
+        ]
+        results = await asyncio.gather(
+            *(call() for _, call in calls), return_exceptions=True
+        )
+        error = None
+        for (key, _), result in zip(calls, results):
+            if not isinstance(result, BaseException):
+                delivered.add(key)
+            elif dropped(result):
+                logging.error(
+                    "dropping event %s for %s: %s", event.event_id, key, result
+                )
+                delivered.add(key)
+            elif error is None:
+                error = result
+        if error is not None:
+            raise error
 
     def register(self, event_name: str, sender: "Sender"):
-        if event_name not in self.events.keys():
-            self.events[event_name] = [sender.action]
-        else:
-            self.events[event_name].append(sender.action)
+        self.events.setdefault(event_name, []).append(
+            (type(sender).__name__, sender.action)
+        )
+
+    def register_channel(self, kind: str, sender: "ChannelSender"):
+        self.channels[kind] = sender
 
 
 @dataclass
@@ -27,18 +88,51 @@ class Sender:
         pass
 
 
+@dataclass
+class ChannelSender:
+    """Sends an event to one configured channel of its project."""
+
+    async def deliver(self, event: Event, channel: Channel) -> None:
+        pass
+
+
+def _headline(event: Event) -> str:
+    message = (event.message or "").split("\n", 1)[0]
+    return f"[{event.project.name}] {event.level}: {message}".rstrip(": ")
+
+
+def event_payload(event: Event) -> dict:
+    """The JSON document posted to webhook channels."""
+    return {
+        "project": {
+            "id": event.project.id,
+            "name": event.project.name,
+            "lang": event.project.lang,
+        },
+        "event_id": event.event_id,
+        "level": str(event.level),
+        "message": event.message,
+        "server_name": event.server_name,
+        "environment": event.environment,
+        "sent_at": event.sent_at.isoformat() if event.sent_at else None,
+    }
+
+
 @dataclass
 class TelegramSender(Sender):
     telegram_service: TelegramService
+    delivery: Delivery | None = None
 
     def _format_message(self, event: Event) -> str:
+        incident = f"Incident ID: {event.event_id} Timestamp: {event.sent_at} UTC"
         return f"""**Project**: {event.project.name} ({event.project.lang})
-        **Server**: {event.payload.get("server_name")}
-        **Environment**: {event.payload.get("environment")}
+        **Server**: {event.server_name}
+        **Environment**: {event.environment}
 
         **Alert**: {event.level}
+        {event.message or ""}
 
-        Incident ID: {event.event_id} Timestamp: {event.sent_at} UTCEnvironment: {event.payload.get("environment")}
+        {incident}Environment: {event.environment}
         """
 
     @override
@@ -46,7 +140,79 @@ class TelegramSender(Sender):
         for user in event.users:
             if user.telegram_chat_id:
                 logging.info(f"sending to user {user.telegram_chat_id}")
-                await self.telegram_service.send_message(
+                send = partial(
+                    self.telegram_service.send_message,
                     chat_id=user.telegram_chat_id,
                     text=self._format_message(event),
                 )
+                if self.delivery is None:
+                    await send()
+                else:
+                    await self.delivery.call("telegram", send)
+
+
+@dataclass
+class WebhookSender(ChannelSender):
+    delivery: Delivery
+
+    @override
+    async def deliver(self, event: Event, channel: Channel) -> None:
+        await self.delivery.post(channel.target, json=event_payload(event))
+
+
+@dataclass
+class SlackSender(ChannelSender):
+    """Slack incoming webhooks and compatible ones (Mattermost, Rocket.Chat)."""
+
+    delivery: Delivery
+
+    def _format_message(self, event: Event) -> str:
+        lines = [f"*{_headline(event)}*"]
+        if event.message and "\n" in event.message:
+            lines.append(f"```{event.message}```")
+        details = [
+            f"{name}: {value}"
+            for name, value in (
+                ("Server", event.server_name),
+                ("Environment", event.environment),
+                ("Incident ID", event.event_id),
+                ("Timestamp", event.sent_at),
+            )
+            if value is not None
+        ]
+        lines.append(" | ".join(details))
+        return "\n".join(lines)
+
+    @override
+    async def deliver(self, event: Event, channel: Channel) -> None:
+        await self.delivery.post(
+            channel.target, json={"text": self._format_message(event)}
+        )
+
+
+@dataclass
+class EmailSender(ChannelSender):
+    delivery: Delivery
+    smtp: SmtpService
+
+    def _format_message(self, event: Event) -> str:
+        return (
+            f"Project: {event.project.name} ({event.project.lang})\n"
+            f"Server: {event.server_name}\n"
+            f"Environment: {event.environment}\n"
+            f"Alert: {event.level}\n\n"
+            f"{event.message or ''}\n\n"
+            f"Incident ID: {event.event_id}\n"
+            f"Timestamp: {event.sent_at} UTC\n"
+        )
+
+    @override
+    async def deliver(self, event: Event, channel: Channel) -> None:
+        await self.delivery.call(
+            self.smtp.destination,
+            lambda: self.smtp.send_message(
+                to=channel.target,
+                subject=_headline(event),
+                text=self._format_message(event),
+            ),
+        )
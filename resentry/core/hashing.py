@@ -1,17 +1,43 @@
+import asyncio
+from concurrent.futures import Executor
 from dataclasses import dataclass
+
 import bcrypt
 
 
 @dataclass
 class Hasher:
-    salt: bytes
+    """bcrypt password hashing with a salt generated per hash.
+
+    The salt is stored inside the bcrypt hash, so checkpw also verifies
+    hashes created with the old shared SALT setting. The async methods run
+    bcrypt in `executor` (a small bounded pool) instead of on the event loop.
+    """
 
-    def _generate_hash(self, plain_password: str) -> bytes:
-        return bcrypt.hashpw(plain_password.encode("utf-8"), self.salt)
+    rounds: int = 12
+    executor: Executor | None = None
 
     def generate_hash(self, plain_password: str) -> str:
-        return self._generate_hash(plain_password).decode("utf-8")
+        return bcrypt.hashpw(
+            plain_password.encode("utf-8"), bcrypt.gensalt(self.rounds)
+        ).decode("utf-8")
 
     def verify_password(self, plain_password: str, hashed: str) -> bool:
         """Verify a password against its hash"""
-        return self.generate_hash(plain_password) == hashed
+        try:
+            return bcrypt.checkpw(plain_password.encode("utf-8"), hashed.encode())
+        except ValueError:
+            # not a bcrypt hash
+            return False
+
+    async def hash(self, plain_password: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self.generate_hash, plain_password
+        )
+
+    async def verify(self, plain_password: str, hashed: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self.verify_password, plain_password, hashed
+        )
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+T = TypeVar("T")
+
+OFFLOAD_MODES = ("inline", "thread", "process")
+
+
+@dataclass
+class Offloader:
+    """Runs CPU heavy work on large inputs outside the event loop.
+
+    Inputs smaller than `threshold` bytes run inline, a pool hop costs more
+    than parsing them. "thread" helps with free-threading and C code that
+    releases the GIL (zlib, brotli), "process" sidesteps the GIL entirely at
+    the price of pickling the input and result.
+    """
+
+    threshold: int = 256 * 1024
+    mode: str = "thread"
+    max_workers: int | None = None
+    executor: Executor | None = None
+    inline: int = 0
+    offloaded: int = 0
+
+    def __post_init__(self):
+        if self.mode not in OFFLOAD_MODES:
+            raise ValueError(f"unknown offload mode {self.mode!r}")
+        if self.executor is None and self.mode == "thread":
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="resentry-offload"
+            )
+        elif self.executor is None and self.mode == "process":
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    async def run(self, size: int, func: Callable[..., T], *args) -> T:
+        if self.executor is None or size < self.threshold:
+            self.inline += 1
+            return func(*args)
+        self.offloaded += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+@dataclass
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a sleeping task.
+
+    Lag is the time a ready callback waits behind blocking work, i.e. the
+    head-of-line delay every request on this worker pays.
+    """
+
+    interval: float = 0.5
+    # lag above this is logged, 0 disables the warning
+    warn_after: float = 0.5
+    last: float = 0.0
+    max: float = 0.0
+    samples: int = 0
+    total: float = 0.0
+    _clock: Callable[[], float] = field(default=time.perf_counter, repr=False)
+
+    def record(self, lag: float) -> None:
+        lag = max(lag, 0.0)
+        self.last = lag
+        self.max = max(self.max, lag)
+        self.samples += 1
+        self.total += lag
+        if self.warn_after and lag >= self.warn_after:
+            logging.warning("event loop blocked for %.3fs", lag)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.samples if self.samples else 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "last": self.last,
+            "mean": self.mean,
+            "max": self.max,
+            "samples": self.samples,
+        }
+
+    async def run(self) -> None:
+        while True:
+            started = self._clock()
+            await asyncio.sleep(self.interval)
+            self.record(self._clock() - started - self.interval)
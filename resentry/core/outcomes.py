@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from resentry.repos.outcome import OutcomeRepository
+
+
+@dataclass
+class Outcomes:
+    """Counters of dropped data, keyed by project, reason and category.
+
+    Recording only touches memory, so rejected requests never open a
+    session. Every `flush_interval` seconds the pending counts are added
+    to the outcomes table, which sums them over all worker processes.
+    """
+
+    flush_interval: float = 5.0
+    pending: Counter[tuple[int, str, str]] = field(default_factory=Counter)
+
+    def record(
+        self,
+        project_id: int,
+        reason: str,
+        category: str = "envelope",
+        quantity: int = 1,
+    ) -> None:
+        self.pending[(project_id, reason, category)] += quantity
+
+    async def flush(self, session: AsyncSession) -> None:
+        if not self.pending:
+            return
+        counts, self.pending = self.pending, Counter()
+        try:
+            repo = OutcomeRepository(session)
+            for (project_id, reason, category), quantity in sorted(counts.items()):
+                await repo.increment(project_id, reason, category, quantity)
+            await session.commit()
+        except Exception:
+            # keep the counts for the next flush
+            self.pending.update(counts)
+            raise
+
+    async def for_project(
+        self, repo: OutcomeRepository, project_id: int
+    ) -> dict[str, dict[str, int]]:
+        """Stored counts of all workers plus this worker's unflushed ones."""
+        counts = Counter(self.pending)
+        for row in await repo.get_all_by_project(project_id):
+            counts[(row.project_id, row.reason, row.category)] += row.quantity
+        out: dict[str, dict[str, int]] = {}
+        for (pid, reason, category), quantity in counts.items():
+            if pid == project_id:
+                out.setdefault(reason, {})[category] = quantity
+        return out
+
+    async def run(self, session_factory: Callable[[], AsyncSession]) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                try:
+                    async with session_factory() as session:
+                        await self.flush(session)
+                except Exception:
+                    logging.exception("outcomes flush failed")
+        finally:
+            # counts of the last interval are not lost on shutdown
+            async with session_factory() as session:
+                await self.flush(session)
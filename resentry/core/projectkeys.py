@@ -0,0 +1,44 @@
+import hashlib
+import hmac
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from resentry.domain.project import ProjectDTO
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode()).digest()
+
+
+@dataclass
+class ProjectKeyIndex:
+    """In-memory map from public DSN keys to projects.
+
+    Entries are keyed by the SHA-256 of the key, so lookup timing says
+    nothing about how much of a guessed key matched, and the stored key is
+    checked with compare_digest. The whole index is dropped through the
+    cache bus when projects change.
+    """
+
+    projects: dict[bytes, ProjectDTO] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.projects is not None
+
+    def load(self, projects: Iterable[ProjectDTO]) -> None:
+        self.projects = {_digest(p.key): p for p in projects if p.key}
+
+    def invalidate(self) -> None:
+        self.projects = None
+
+    def get(self, key: str) -> ProjectDTO | None:
+        if not self.projects:
+            return None
+        digest = _digest(key)
+        project = self.projects.get(digest)
+        if project is None or project.key is None:
+            return None
+        if not hmac.compare_digest(project.key.encode(), key.encode()):
+            return None
+        return project
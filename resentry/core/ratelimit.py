@@ -0,0 +1,91 @@
+import math
+import time
+from dataclasses import dataclass, field
+
+from resentry.domain.project import ProjectDTO
+
+
+@dataclass
+class TokenBucket:
+    rate: float
+    capacity: float
+    tokens: float = -1.0
+    updated: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        if self.tokens < 0:
+            self.tokens = self.capacity
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self.updated, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available, 0 if they already are."""
+        self._refill(now)
+        # a single request bigger than the bucket passes once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+@dataclass
+class ProjectBuckets:
+    events: TokenBucket | None = None
+    bytes: TokenBucket | None = None
+
+
+@dataclass
+class RateLimiter:
+    """In-memory per-project token buckets for the ingest endpoint.
+
+    Limits come from the project row (events/sec and bytes/sec), the bucket
+    capacity allows bursts of `burst` seconds worth of traffic. Buckets are
+    per process, so with several workers each one enforces its share.
+    """
+
+    burst: float = 2.0
+    workers: int = 1
+    buckets: dict[int, ProjectBuckets] = field(default_factory=dict)
+
+    def _bucket(self, bucket: TokenBucket | None, rate: float | None):
+        if rate is None or rate <= 0:
+            return None
+        rate = rate / max(self.workers, 1)
+        if bucket is None or bucket.rate != rate:
+            return TokenBucket(rate=rate, capacity=max(rate * self.burst, 1.0))
+        return bucket
+
+    def _get(self, project: ProjectDTO) -> ProjectBuckets:
+        buckets = self.buckets.setdefault(project.id, ProjectBuckets())
+        buckets.events = self._bucket(buckets.events, project.rate_limit_events)
+        buckets.bytes = self._bucket(buckets.bytes, project.rate_limit_bytes)
+        return buckets
+
+    def acquire(self, project: ProjectDTO, size: int, events: int = 1) -> int:
+        """Take tokens for one request.
+
+        Returns 0 when the request is allowed, otherwise the number of
+        seconds the client should wait before retrying. Nothing is consumed
+        for rejected requests.
+        """
+        buckets = self._get(project)
+        now = time.monotonic()
+        wait = 0.0
+        if buckets.events is not None:
+            wait = max(wait, buckets.events.wait_time(events, now))
+        if buckets.bytes is not None:
+            wait = max(wait, buckets.bytes.wait_time(size, now))
+        if wait > 0:
+            return max(math.ceil(wait), 1)
+
+        if buckets.events is not None:
+            buckets.events.consume(events)
+        if buckets.bytes is not None:
+            buckets.bytes.consume(size)
+        return 0
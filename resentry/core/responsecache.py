@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+
+def events_cache_tag(project_id: int | None) -> str:
+    """Tag of the cached event lists of a project (None: of all projects)."""
+    return "events" if project_id is None else f"events:{project_id}"
+
+
+@dataclass
+class CachedResponse:
+    etag: str
+    body: bytes
+    headers: dict[str, str]
+    expires: float
+
+
+@dataclass
+class ResponseCache:
+    """Short-lived cache of rendered list responses.
+
+    Entries are keyed by (tag, url) and only served while their ETag still
+    matches the current one, so a stale entry is never returned even when
+    another worker changed the data. Writers drop their tag on commit to
+    free the memory early; `ttl` bounds the rest.
+    """
+
+    ttl: float = 2.0
+    maxsize: int = 512
+    entries: OrderedDict[tuple[str, str], CachedResponse] = field(
+        default_factory=OrderedDict
+    )
+    hits: int = 0
+    misses: int = 0
+
+    def get(self, tag: str, url: str, etag: str) -> CachedResponse | None:
+        key = (tag, url)
+        entry = self.entries.get(key)
+        if entry is None or entry.etag != etag or entry.expires < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(
+        self, tag: str, url: str, etag: str, body: bytes, headers: dict[str, str]
+    ) -> None:
+        if self.ttl <= 0:
+            return
+        key = (tag, url)
+        self.entries[key] = CachedResponse(
+            etag=etag, body=body, headers=headers, expires=time.monotonic() + self.ttl
+        )
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, tag: str) -> None:
+        for key in [key for key in self.entries if key[0] == tag]:
+            del self.entries[key]
@@ -0,0 +1,121 @@
+import random
+import re
+import typing
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from resentry.database.models.rule import ProjectRule
+from resentry.domain.queue import LogLevel
+from resentry.sentry import EnvelopeItem
+
+
+def item_message(payload: dict[str, typing.Any]) -> str:
+    """Best-effort human readable message of an event payload."""
+    message = payload.get("message")
+    if isinstance(message, dict):
+        message = message.get("formatted") or message.get("message")
+    if isinstance(message, str) and message:
+        return message
+
+    logentry = payload.get("logentry")
+    if isinstance(logentry, dict) and (
+        text := logentry.get("formatted") or logentry.get("message")
+    ):
+        return str(text)
+
+    exception = payload.get("exception")
+    values = exception.get("values") if isinstance(exception, dict) else exception
+    if isinstance(values, list) and values and isinstance(values[-1], dict):
+        last = values[-1]
+        return f"{last.get('type', '')}: {last.get('value', '')}"
+
+    return payload.get("transaction") or ""
+
+
+def item_level(item: EnvelopeItem) -> str | None:
+    payload = item.payload_json or {}
+    if level := LogLevel.normalize(payload.get("level")):
+        return level
+    # sentry treats events without an explicit level as errors
+    return "error" if item.type == "event" else None
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    action: str
+    sample_rate: float | None = None
+    level: str | None = None
+    item_type: str | None = None
+    environment: str | None = None
+    release: str | None = None
+    message: re.Pattern[str] | None = None
+
+    @classmethod
+    def from_model(cls, rule: ProjectRule) -> "CompiledRule":
+        return cls(
+            action=rule.action,
+            sample_rate=rule.sample_rate,
+            level=LogLevel.normalize(rule.level),
+            item_type=rule.item_type,
+            environment=rule.environment,
+            release=rule.release,
+            message=re.compile(rule.message) if rule.message else None,
+        )
+
+    def matches(self, item: EnvelopeItem) -> bool:
+        payload = item.payload_json or {}
+        if self.item_type is not None and item.type != self.item_type:
+            return False
+        if self.level is not None and item_level(item) != self.level:
+            return False
+        if self.environment is not None and payload.get("environment") != (
+            self.environment
+        ):
+            return False
+        if self.release is not None and payload.get("release") != self.release:
+            return False
+        return self.message is None or bool(self.message.search(item_message(payload)))
+
+
+@dataclass
+class RuleSet:
+    """Ordered project rules, the first matching rule decides."""
+
+    rules: list[CompiledRule] = field(default_factory=list)
+    random: Callable[[], float] = random.random
+
+    @classmethod
+    def compile(cls, rules: Iterable[ProjectRule]) -> "RuleSet":
+        return cls(rules=[CompiledRule.from_model(rule) for rule in rules])
+
+    def drop_reason(self, item: EnvelopeItem) -> str | None:
+        """Returns the outcome reason when `item` should be dropped."""
+        for rule in self.rules:
+            if not rule.matches(item):
+                continue
+            if rule.action == "drop":
+                return "filtered"
+            if self.random() >= typing.cast(float, rule.sample_rate):
+                return "sampled"
+            return None
+        return None
+
+
+@dataclass
+class RuleCache:
+    """Compiled rule sets by project id, filled on first use."""
+
+    rule_sets: dict[int, RuleSet] = field(default_factory=dict)
+
+    def get(self, project_id: int) -> RuleSet | None:
+        return self.rule_sets.get(project_id)
+
+    def set(self, project_id: int, rule_set: RuleSet) -> RuleSet:
+        self.rule_sets[project_id] = rule_set
+        return rule_set
+
+    def invalidate(self, project_id: int | None = None) -> None:
+        if project_id is None:
+            self.rule_sets.clear()
+        else:
+            self.rule_sets.pop(project_id, None)
@@ -0,0 +1,61 @@
+from urllib.parse import urlsplit
+
+from resentry.utils import jsoncodec
+
+
+def parse_auth_header(value: str) -> dict[str, str]:
+    """Fields of an `X-Sentry-Auth: Sentry sentry_key=..., sentry_version=7` header."""
+    scheme, _, params = value.strip().partition(" ")
+    if scheme.lower() != "sentry":
+        # some clients send the parameters without the scheme
+        params = value
+    fields = {}
+    for part in params.split(","):
+        name, sep, field_value = part.partition("=")
+        if sep:
+            fields[name.strip()] = field_value.strip()
+    return fields
+
+
+def parse_dsn(dsn: str) -> tuple[str, str] | None:
+    """Public key and project id of a DSN like https://<key>@host/<project_id>."""
+    try:
+        parts = urlsplit(dsn)
+    except ValueError:
+        return None
+    project_id = parts.path.rstrip("/").rpartition("/")[2]
+    if not parts.username or not project_id:
+        return None
+    return parts.username, project_id
+
+
+def envelope_dsn(body: bytes) -> str | None:
+    """DSN from the header line of an uncompressed envelope, used by tunnels."""
+    header_line = body.partition(b"\n")[0]
+    if not header_line.startswith(b"{"):
+        return None
+    try:
+        headers = jsoncodec.loads(header_line)
+    except (jsoncodec.JSONDecodeError, UnicodeDecodeError):
+        return None
+    dsn = headers.get("dsn") if isinstance(headers, dict) else None
+    return dsn if isinstance(dsn, str) else None
+
+
+def sentry_key(
+    headers: dict[str, str] | None = None,
+    query: dict[str, str] | None = None,
+    body: bytes | None = None,
+) -> str | None:
+    """Public key from the X-Sentry-Auth or Authorization header, the
+    `sentry_key` query parameter or the envelope DSN, in that order."""
+    headers = headers or {}
+    for name in ("x-sentry-auth", "authorization"):
+        value = headers.get(name)
+        if value and (key := parse_auth_header(value).get("sentry_key")):
+            return key
+    if query and (key := query.get("sentry_key")):
+        return key
+    if body and (dsn := envelope_dsn(body)) and (parsed := parse_dsn(dsn)):
+        return parsed[0]
+    return None
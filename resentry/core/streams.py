@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Container
+from dataclasses import dataclass, field
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from resentry.domain.envelope import EventFilter
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """A stored envelope as pushed to live subscribers, rendered once."""
+
+    project_id: int
+    envelope_id: int
+    data: bytes
+    # filter columns (level, environment, release, type) of every item
+    items: tuple[dict[str, str | None], ...] = ()
+
+    def matches(self, filters: EventFilter) -> bool:
+        conditions = [
+            (key, values)
+            for key, values in (
+                ("level", filters.levels),
+                ("environment", filters.environments),
+                ("release", filters.releases),
+                ("type", filters.item_types),
+            )
+            if values is not None
+        ]
+        if not conditions:
+            return True
+        # same semantics as the list endpoints: one item matching everything
+        return any(
+            all(item.get(key) in values for key, values in conditions)
+            for item in self.items
+        )
+
+
+@dataclass(eq=False)
+class Subscription:
+    project_id: int
+    filters: EventFilter
+    queue: asyncio.Queue[StreamEvent | None]
+    evicted: bool = False
+
+    async def get(self, timeout: float) -> StreamEvent | None:
+        """Next event, None on timeout or once evicted."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+# (session, project ids, after, skip) -> events with a larger envelope id
+# whose id is not in `skip`, and the largest id seen; `after` None only
+# reads the current largest id
+LoadEvents = Callable[
+    [AsyncSession, list[int], int | None, Container[int]],
+    Awaitable[tuple[list[StreamEvent], int]],
+]
+
+
+@dataclass
+class EventHub:
+    """In-process pub/sub of newly stored envelopes per project.
+
+    Ingest publishes after commit. Every subscriber has a bounded buffer; a
+    subscriber whose buffer is full when an event arrives is evicted instead
+    of slowing down ingest or growing memory, its stream ends and the client
+    reconnects with Last-Event-ID.
+    """
+
+    buffer_size: int = 100
+    poll_interval: float = 1.0
+    subscribers: dict[int, set[Subscription]] = field(default_factory=dict)
+    published: int = 0
+    evicted: int = 0
+    # envelope ids already delivered, so polled and local events don't repeat
+    recent: OrderedDict[int, None] = field(default_factory=OrderedDict)
+    recent_size: int = 10_000
+    watermark: int | None = None
+    # envelope ids below the watermark that are read again: with concurrent
+    # writers a lower id can commit after a higher one was already seen
+    lag: int = 1000
+    # watermark when polling started, older envelopes are never published
+    floor: int = 0
+
+    def has_subscribers(self, project_id: int) -> bool:
+        return bool(self.subscribers.get(project_id))
+
+    def subscribe(self, project_id: int, filters: EventFilter) -> Subscription:
+        subscription = Subscription(
+            project_id=project_id,
+            filters=filters,
+            queue=asyncio.Queue(maxsize=self.buffer_size),
+        )
+        self.subscribers.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self.subscribers.get(subscription.project_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscribers[subscription.project_id]
+
+    def _evict(self, subscription: Subscription) -> None:
+        subscription.evicted = True
+        self.evicted += 1
+        self.unsubscribe(subscription)
+        # make room for the wake-up, the dropped events are re-read on resume
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+        logging.info("evicted slow event stream of project %s", subscription.project_id)
+
+    def publish(self, event: StreamEvent) -> None:
+        if event.envelope_id in self.recent:
+            return
+        self.recent[event.envelope_id] = None
+        while len(self.recent) > self.recent_size:
+            self.recent.popitem(last=False)
+        self.published += 1
+        for subscription in list(self.subscribers.get(event.project_id, ())):
+            if not event.matches(subscription.filters):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._evict(subscription)
+
+    async def poll(self, session: AsyncSession, load: LoadEvents) -> None:
+        """Publish envelopes stored by other worker processes."""
+        if not self.subscribers:
+            # nobody listens, start from the then current id next time
+            self.watermark = None
+            return
+        after = (
+            None
+            if self.watermark is None
+            else max(self.watermark - self.lag, self.floor)
+        )
+        events, last_id = await load(
+            session, list(self.subscribers), after, self.recent
+        )
+        if self.watermark is None:
+            self.floor = last_id
+        self.watermark = max(last_id, self.watermark or 0)
+        for event in events:
+            self.publish(event)
+
+    async def run(
+        self, session_factory: Callable[[], AsyncSession], load: LoadEvents
+    ) -> None:
+        while True:
+            try:
+                async with session_factory() as session:
+                    await self.poll(session, load)
+            except Exception:
+                logging.exception("event stream poll failed")
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,52 @@
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+
+@dataclass
+class LoginThrottle:
+    """Limits failed logins per user name and per client address.
+
+    A key is blocked while it has `max_failures` failures within the last
+    `window` seconds. State is per process, like the ingest rate limits.
+    """
+
+    max_failures: int = 5
+    window: float = 300.0
+    # number of keys kept before the oldest are forgotten
+    max_keys: int = 10_000
+    failures: dict[str, deque[float]] = field(default_factory=dict)
+
+    def _recent(self, key: str, now: float) -> deque[float] | None:
+        if (times := self.failures.get(key)) is None:
+            return None
+        while times and times[0] <= now - self.window:
+            times.popleft()
+        if not times:
+            del self.failures[key]
+            return None
+        return times
+
+    def retry_after(self, keys: list[str], now: float | None = None) -> int | None:
+        """Seconds until one of `keys` may try again, None if none is blocked."""
+        now = time.monotonic() if now is None else now
+        wait = 0.0
+        for key in keys:
+            times = self._recent(key, now)
+            if times is not None and len(times) >= self.max_failures:
+                wait = max(wait, times[0] + self.window - now)
+        return math.ceil(wait) if wait > 0 else None
+
+    def failure(self, keys: list[str], now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        for key in keys:
+            if key not in self.failures and len(self.failures) >= self.max_keys:
+                # dicts keep insertion order, drop the oldest key
+                del self.failures[next(iter(self.failures))]
+            times = self.failures.setdefault(key, deque(maxlen=self.max_failures))
+            times.append(now)
+
+    def success(self, keys: list[str]) -> None:
+        for key in keys:
+            self.failures.pop(key, None)
@@ -0,0 +1,74 @@
+import functools
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from resentry.config import Settings, settings
+
+# algorithms signed with a private key and verified with a public one,
+# they need `pip install pyjwt[crypto]`
+ASYMMETRIC_PREFIXES = ("RS", "PS", "ES", "Ed")
+
+
+@dataclass(frozen=True)
+class JWTKeys:
+    algorithm: str
+    signing_key: str | None
+    verifying_key: str
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "JWTKeys":
+        if settings.ALGORITHM.startswith(ASYMMETRIC_PREFIXES):
+            if not settings.JWT_PUBLIC_KEY:
+                raise ValueError(f"{settings.ALGORITHM} needs JWT_PUBLIC_KEY")
+            # without the private key this instance can verify but not sign
+            return cls(
+                algorithm=settings.ALGORITHM,
+                signing_key=settings.JWT_PRIVATE_KEY,
+                verifying_key=settings.JWT_PUBLIC_KEY,
+            )
+        return cls(
+            algorithm=settings.ALGORITHM,
+            signing_key=settings.SECRET_KEY,
+            verifying_key=settings.SECRET_KEY,
+        )
+
+
+@functools.cache
+def jwt_keys() -> JWTKeys:
+    """Keys from the settings, read once per process."""
+    return JWTKeys.from_settings(settings)
+
+
+@dataclass
+class ClaimsCache:
+    """Bounded LRU of verified token claims, keyed by the token's SHA-256.
+
+    Entries are only served until the token's `exp`, so a cached token
+    expires exactly when jwt.decode would start rejecting it.
+    """
+
+    maxsize: int = 1024
+    entries: OrderedDict[bytes, dict[str, Any]] = field(default_factory=OrderedDict)
+
+    def get(self, token: str, now: float | None = None) -> dict[str, Any] | None:
+        digest = hashlib.sha256(token.encode()).digest()
+        if (claims := self.entries.get(digest)) is None:
+            return None
+        now = time.time() if now is None else now
+        if (exp := claims.get("exp")) is not None and exp <= now:
+            del self.entries[digest]
+            return None
+        self.entries.move_to_end(digest)
+        return claims
+
+    def set(self, token: str, claims: dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+        digest = hashlib.sha256(token.encode()).digest()
+        self.entries[digest] = claims
+        self.entries.move_to_end(digest)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
@@ -4,3 +4,7 @@ from .database import Base as Base
 from .models.user import User as User
 from .models.project import Project as Project
 from .models.envelope import Envelope as Envelope, EnvelopeItem as EnvelopeItem
+from .models.rule import ProjectRule as ProjectRule
+from .models.transaction import Transaction as Transaction, ItemCounter as ItemCounter
+from .models.queue import QueuedEvent as QueuedEvent
+from .models.lease import Lease as Lease, CacheVersion as CacheVersion
@@ -1,4 +1,5 @@
 from typing import AsyncGenerator, Generator
+from sqlalchemy import event
 from sqlmodel import SQLModel, Session, create_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
@@ -13,6 +14,18 @@ async_engine = create_async_engine(
     echo=False,  # Set to True for SQL debugging
 )
 
+
+if settings.DATABASE_URL.startswith("sqlite"):
+    # several worker processes write to the same file: WAL lets readers run
+    # alongside the writer and busy_timeout waits for the lock instead of failing
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+
 # Create the sync engine for sync operations (like tests)
 # Replace aiosqlite with regular sqlite for sync operations
 sync_db_url = settings.DATABASE_URL.replace("sqlite+aiosqlite:///", "sqlite:///")
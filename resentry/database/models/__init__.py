@@ -3,6 +3,26 @@
 from .user import User
 from .project import Project
 from .envelope import Envelope, EnvelopeItem
+from .rule import ProjectRule
+from .channel import NotificationChannel
+from .transaction import Transaction, ItemCounter
+from .queue import QueuedEvent
+from .lease import Lease, CacheVersion
+from .outcome import Outcome
 from .base import Entity
 
-__all__ = ["User", "Project", "Envelope", "EnvelopeItem", "Entity"]
+__all__ = [
+    "User",
+    "Project",
+    "Envelope",
+    "EnvelopeItem",
+    "ProjectRule",
+    "NotificationChannel",
+    "Transaction",
+    "ItemCounter",
+    "QueuedEvent",
+    "Lease",
+    "CacheVersion",
+    "Outcome",
+    "Entity",
+]
@@ -0,0 +1,19 @@
+from sqlmodel import Field
+
+from resentry.database.models.base import Entity
+
+
+class NotificationChannel(Entity, table=True):
+    """Where alerts of a project are sent besides the users' Telegram chats.
+
+    `kind` is "webhook", "slack" or "email", `target` the URL or the email
+    address. A channel without a level gets every alert.
+    """
+
+    __tablename__ = "notification_channels"  # type: ignore
+
+    project_id: int = Field(foreign_key="projects.id", index=True)
+    kind: str
+    target: str
+    level: str | None = Field(default=None)
+    enabled: bool = Field(default=True)
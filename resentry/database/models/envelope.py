@@ -1,18 +1,27 @@
-from sqlmodel import Field, Relationship
-from sqlalchemy.ext.asyncio import AsyncAttrs
-from typing import Optional
 from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlmodel import Field, Index, Relationship
+
 from resentry.database.models.base import Entity
 
 
 class Envelope(Entity, AsyncAttrs, table=True):
     __tablename__ = "envelopes"  # type: ignore
+    __table_args__ = (
+        Index(
+            "ix_envelopes_project_id_event_id", "project_id", "event_id", unique=True
+        ),
+        Index("ix_envelopes_project_id_sent_at", "project_id", "sent_at"),
+        # id ordered pages and the per-project last id
+        Index("ix_envelopes_project_id_id", "project_id", "id"),
+    )
 
     project_id: int = Field(foreign_key="projects.id")
     payload: bytes = Field(sa_column_kwargs={"nullable": False})
-    event_id: str = Field(default=None)
-    sent_at: Optional[datetime] = Field(default=None)
-    dsn: Optional[str] = Field(default=None)
+    event_id: str | None = Field(default=None)
+    sent_at: datetime | None = Field(default=None)
+    dsn: str | None = Field(default=None)
 
     items: list["EnvelopeItem"] = Relationship(back_populates="event")
 
@@ -23,7 +32,12 @@ class Envelope(Entity, AsyncAttrs, table=True):
 class EnvelopeItem(Entity, table=True):
     __tablename__ = "envelope_items"  # type: ignore
 
-    event_id: int = Field(foreign_key="envelopes.id")
+    event_id: int = Field(foreign_key="envelopes.id", index=True)
     event: Envelope | None = Relationship(back_populates="items")
     item_id: str = Field(index=True)
+    type: str | None = Field(default=None, index=True)
     payload: bytes = Field(sa_column_kwargs={"nullable": False})
+    # copied from the payload at ingest so lists can filter on indexes
+    level: str | None = Field(default=None, index=True)
+    environment: str | None = Field(default=None, index=True)
+    release: str | None = Field(default=None, index=True)
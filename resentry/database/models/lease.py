@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlmodel import Field
+
+from resentry.database.models.base import Entity
+
+
+class Lease(Entity, table=True):
+    """Named lease used to elect a single leader among worker processes."""
+
+    __tablename__ = "leases"  # type: ignore
+
+    name: str = Field(unique=True)
+    owner: str
+    expires_at: datetime
+
+
+class CacheVersion(Entity, table=True):
+    """Version counters that workers poll to invalidate their local caches."""
+
+    __tablename__ = "cache_versions"  # type: ignore
+
+    name: str = Field(unique=True)
+    version: int = Field(default=0)
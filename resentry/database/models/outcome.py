@@ -0,0 +1,15 @@
+from sqlmodel import Field, UniqueConstraint
+
+from resentry.database.models.base import Entity
+
+
+class Outcome(Entity, table=True):
+    """Dropped data per project, summed over all worker processes."""
+
+    __tablename__ = "outcomes"  # type: ignore
+    __table_args__ = (UniqueConstraint("project_id", "reason", "category"),)
+
+    project_id: int = Field(foreign_key="projects.id")
+    reason: str
+    category: str
+    quantity: int = Field(default=0)
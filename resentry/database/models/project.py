@@ -8,3 +8,5 @@ class Project(Entity, table=True):
     name: str = Field(index=True)
     lang: str = Field(index=True)
     key: str = Field(max_length=32, nullable=True, default=None)
+    rate_limit_events: float | None = Field(default=None)
+    rate_limit_bytes: float | None = Field(default=None)
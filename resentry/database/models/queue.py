@@ -0,0 +1,37 @@
+from datetime import UTC, datetime
+
+from sqlmodel import Field
+
+from resentry.database.models.base import Entity
+
+
+class QueuedEvent(Entity, table=True):
+    """Outbox row for an event waiting to be sent as a notification.
+
+    Rows are written in the same transaction as the envelope and deleted once
+    every sender succeeded, so a pending alert survives restarts. Only the
+    fields an alert needs are copied out of the event payload.
+    """
+
+    __tablename__ = "event_queue"  # type: ignore
+
+    project_id: int = Field(foreign_key="projects.id")
+    envelope_id: int = Field(foreign_key="envelopes.id")
+    level: str
+    message: str | None = Field(default=None)
+    server_name: str | None = Field(default=None)
+    environment: str | None = Field(default=None)
+    sent_at: datetime | None = Field(default=None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    # "pending" rows are delivered, "failed" ones ran out of attempts
+    status: str = Field(default="pending")
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), index=True
+    )
+    # set while a dispatcher is sending the event, expired claims are retried
+    locked_until: datetime | None = Field(default=None)
+    last_error: str | None = Field(default=None)
+    # comma separated keys of the senders and channels that already got the
+    # event, a retry only goes to the others
+    delivered: str | None = Field(default=None)
@@ -0,0 +1,16 @@
+from sqlmodel import Field
+
+from resentry.database.models.base import Entity
+
+
+class ProjectRule(Entity, table=True):
+    __tablename__ = "project_rules"  # type: ignore
+
+    project_id: int = Field(foreign_key="projects.id", index=True)
+    action: str = Field(default="drop")
+    sample_rate: float | None = Field(default=None)
+    level: str | None = Field(default=None)
+    item_type: str | None = Field(default=None)
+    environment: str | None = Field(default=None)
+    release: str | None = Field(default=None)
+    message: str | None = Field(default=None)
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlmodel import Field, Index, UniqueConstraint
+
+from resentry.database.models.base import Entity
+
+
+class Transaction(Entity, table=True):
+    __tablename__ = "transactions"  # type: ignore
+    __table_args__ = (
+        # transaction-only envelopes have no envelope row, retries are
+        # caught here
+        Index(
+            "ix_transactions_project_id_event_id",
+            "project_id",
+            "event_id",
+            unique=True,
+        ),
+    )
+
+    project_id: int = Field(foreign_key="projects.id", index=True)
+    event_id: str | None = Field(default=None)
+    trace_id: str | None = Field(default=None)
+    name: str | None = Field(default=None)
+    op: str | None = Field(default=None)
+    status: str | None = Field(default=None)
+    start_timestamp: datetime | None = Field(default=None)
+    duration_ms: float | None = Field(default=None)
+    environment: str | None = Field(default=None)
+    release: str | None = Field(default=None)
+
+
+class ItemCounter(Entity, table=True):
+    __tablename__ = "item_counters"  # type: ignore
+    __table_args__ = (UniqueConstraint("project_id", "category", "bucket"),)
+
+    project_id: int = Field(foreign_key="projects.id")
+    category: str
+    bucket: datetime
+    quantity: int = Field(default=0)
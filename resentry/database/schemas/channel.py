@@ -0,0 +1,51 @@
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+
+from resentry.config import settings
+from resentry.domain.queue import LogLevel
+
+
+class NotificationChannelBase(BaseModel):
+    kind: Literal["webhook", "slack", "email"]
+    target: str
+    level: LogLevel | None = None
+    enabled: bool = True
+
+    @field_validator("level", mode="before")
+    @classmethod
+    def validate_level(cls, value: object) -> LogLevel | None:
+        if value is None:
+            return None
+        if (level := LogLevel.parse(value)) is None:
+            raise ValueError(f"unknown level {value!r}")
+        return level
+
+    @model_validator(mode="after")
+    def validate_target(self):
+        if self.kind == "email":
+            if "@" not in self.target:
+                raise ValueError("email channels require an email address")
+        elif not self.target.startswith(("http://", "https://")):
+            raise ValueError(f"{self.kind} channels require an http(s) URL")
+        return self
+
+
+class NotificationChannelCreate(NotificationChannelBase):
+    @field_validator("level")
+    @classmethod
+    def validate_notify_level(cls, level: LogLevel | None) -> LogLevel | None:
+        # other levels are never queued, the channel would never fire;
+        # stored channels stay readable when NOTIFY_LEVELS is narrowed later
+        if level is not None and level not in settings.NOTIFY_LEVELS:
+            raise ValueError(
+                f"level {level} is not in NOTIFY_LEVELS {settings.NOTIFY_LEVELS}"
+            )
+        return level
+
+
+class NotificationChannel(NotificationChannelBase):
+    id: int
+    project_id: int
+
+    model_config = ConfigDict(from_attributes=True)  # pyright: ignore[reportUnannotatedClassAttribute]
@@ -4,6 +4,8 @@ from pydantic import BaseModel, ConfigDict
 class ProjectBase(BaseModel):
     name: str
     lang: str
+    rate_limit_events: float | None = None
+    rate_limit_bytes: float | None = None
 
 
 class ProjectCreate(ProjectBase):
@@ -19,3 +21,8 @@ class Project(ProjectBase):
     key: str
 
     model_config = ConfigDict(from_attributes=True)  # pyright: ignore[reportUnannotatedClassAttribute]
+
+
+class ProjectOutcomes(BaseModel):
+    project_id: int
+    dropped: dict[str, dict[str, int]]
@@ -0,0 +1,41 @@
+import re
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+
+class ProjectRuleBase(BaseModel):
+    action: Literal["drop", "sample"] = "drop"
+    sample_rate: float | None = Field(default=None, ge=0.0, le=1.0)
+    level: str | None = None
+    item_type: str | None = None
+    environment: str | None = None
+    release: str | None = None
+    message: str | None = None
+
+    @field_validator("message")
+    @classmethod
+    def validate_message(cls, value: str | None) -> str | None:
+        if value is not None:
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"invalid message regex: {e}")
+        return value
+
+    @model_validator(mode="after")
+    def validate_sample_rate(self):
+        if self.action == "sample" and self.sample_rate is None:
+            raise ValueError("sample rules require sample_rate")
+        return self
+
+
+class ProjectRuleCreate(ProjectRuleBase):
+    pass
+
+
+class ProjectRule(ProjectRuleBase):
+    id: int
+    project_id: int
+
+    model_config = ConfigDict(from_attributes=True)  # pyright: ignore[reportUnannotatedClassAttribute]
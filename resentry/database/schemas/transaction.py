@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Transaction(BaseModel):
+    id: int
+    project_id: int
+    event_id: str | None = None
+    trace_id: str | None = None
+    name: str | None = None
+    op: str | None = None
+    status: str | None = None
+    start_timestamp: datetime | None = None
+    duration_ms: float | None = None
+    environment: str | None = None
+    release: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)  # pyright: ignore[reportUnannotatedClassAttribute]
+
+
+class ItemCounter(BaseModel):
+    category: str
+    bucket: datetime
+    quantity: int
+
+    model_config = ConfigDict(from_attributes=True)  # pyright: ignore[reportUnannotatedClassAttribute]
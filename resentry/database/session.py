@@ -0,0 +1,88 @@
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+_ON_COMMIT = "on_commit"
+_WRITES = "writes"
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run `callback` once the session's current transaction commits.
+
+    Callbacks are dropped on rollback, so in-memory state (caches, dedupe
+    sets) only ever reflects committed rows.
+    """
+    session.info.setdefault(_ON_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session: Session, flush_context) -> None:
+    session.info[_WRITES] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[_WRITES] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_hooks(session: Session) -> None:
+    session.info.pop(_WRITES, None)
+    for callback in session.info.pop(_ON_COMMIT, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_commit_hooks(session: Session) -> None:
+    session.info.pop(_WRITES, None)
+    session.info.pop(_ON_COMMIT, None)
+
+
+class LazySession:
+    """AsyncSession opened on first use and shared by all repos of a request.
+
+    Requests rejected before touching the database never open a session,
+    and requests that only read skip the commit.
+    """
+
+    def __init__(self, factory: Callable[[], AsyncSession]):
+        self._factory = factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    @property
+    def has_writes(self) -> bool:
+        if self._session is None:
+            return False
+        session = self._session
+        return bool(
+            session.info.get(_WRITES) or session.new or session.dirty or session.deleted
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    async def commit(self) -> None:
+        if self.has_writes:
+            await self.session.commit()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
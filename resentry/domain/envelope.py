@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from enum import StrEnum
 
 
 @dataclass
@@ -17,5 +17,29 @@ class EnvelopeDTO:
     project_id: int
     payload: bytes
     event_id: str
-    sent_at: Optional[datetime]
-    dsn: Optional[str]
+    sent_at: datetime | None
+    dsn: str | None
+
+
+class EventSort(StrEnum):
+    id = "id"
+    id_desc = "-id"
+    sent_at = "sent_at"
+    sent_at_desc = "-sent_at"
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """Filters of the event list endpoints, None means no restriction.
+
+    Item level filters (levels, environments, releases, item_types) match
+    envelopes with at least one matching item.
+    """
+
+    project_id: int | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+    levels: frozenset[str] | None = None
+    environments: frozenset[str] | None = None
+    releases: frozenset[str] | None = None
+    item_types: frozenset[str] | None = None
@@ -7,3 +7,5 @@ class ProjectDTO:
     name: str
     lang: str
     key: str | None = None
+    rate_limit_events: float | None = None
+    rate_limit_bytes: float | None = None
@@ -1,7 +1,6 @@
 from dataclasses import dataclass, field
 from enum import StrEnum
 from datetime import datetime
-import typing
 
 from resentry.domain.project import ProjectDTO
 from resentry.domain.user import UserDTO
@@ -17,12 +16,48 @@ class LogLevel(StrEnum):
     debug = "debug"
     notset = "notset"
 
+    @classmethod
+    def parse(cls, value: object) -> "LogLevel | None":
+        """Level of an SDK payload ("WARNING", "warn", ...), None if unknown."""
+        if not isinstance(value, str):
+            return None
+        value = value.strip().lower()
+        try:
+            return cls(value)
+        except ValueError:
+            # aliases like "warn" are only member names
+            return cls.__members__.get(value)
+
+    @classmethod
+    def normalize(cls, value: object) -> str | None:
+        """Stored/compared form of a level, unknown levels are kept as is."""
+        if value in (None, ""):
+            return None
+        level = cls.parse(value)
+        return level.value if level is not None else str(value)
+
+
+@dataclass
+class Channel:
+    """A notification channel of a project, see NotificationChannel."""
+
+    id: int
+    kind: str
+    target: str
+    level: str | None = None
+
+    def wants(self, level: str) -> bool:
+        return self.level is None or self.level == level
+
 
 @dataclass
 class Event:
     level: LogLevel
     event_id: int
     project: ProjectDTO
-    payload: dict[str, typing.Any]
+    message: str | None = None
+    server_name: str | None = None
+    environment: str | None = None
     users: list[UserDTO] = field(default_factory=list)
     sent_at: datetime | None = None
+    channels: list[Channel] = field(default_factory=list)
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+
+class DeliveryError(Exception):
+    """A notification could not be delivered to its destination."""
+
+    def __init__(self, message: str, retryable: bool = True, status: int | None = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status = status
+
+
+class CircuitOpenError(DeliveryError):
+    """The destination failed too often recently, nothing was sent."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        # seconds until the circuit lets a trial call through
+        self.retry_after = retry_after
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, DeliveryError):
+        return error.retryable
+    # timeouts, refused connections, SMTP errors
+    return isinstance(error, (httpx.TransportError, OSError))
+
+
+def _unhealthy(error: Exception) -> bool:
+    """Failures that say the destination itself is down.
+
+    Transport errors, timeouts and 5xx answers count toward the circuit
+    breaker; a 4xx or 429 only concerns the one target or sender.
+    """
+    if isinstance(error, DeliveryError):
+        return error.retryable and error.status != 429
+    return _retryable(error)
+
+
+def destination(url: str) -> str:
+    """Limits and circuit breakers apply per scheme, host and port."""
+    parsed = httpx.URL(url)
+    return f"{parsed.scheme}://{parsed.netloc.decode()}"
+
+
+@dataclass
+class CircuitBreaker:
+    """Stops sending to a destination after `failure_threshold` failures.
+
+    Once open, calls are refused for `reset_timeout` seconds, then a single
+    trial call is let through: success closes the circuit, failure opens it
+    for another `reset_timeout`.
+    """
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    failures: int = 0
+    opened_at: float | None = None
+    trial: bool = False
+
+    @property
+    def open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.trial or time.monotonic() - self.opened_at < self.reset_timeout:
+            return False
+        self.trial = True
+        return True
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is let through."""
+        if self.opened_at is None:
+            return 0.0
+        return max(self.opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.trial or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.trial = False
+
+
+@dataclass
+class Delivery:
+    """Shared outbound delivery for every notification sender.
+
+    All HTTP senders use the one pooled `client`. Per destination at most
+    `per_destination` calls run at once, each attempt is cut off after
+    `timeout` seconds, retryable failures are retried `retries` times with
+    jittered exponential backoff and repeated failures open the
+    destination's circuit breaker. A slow or dead destination therefore
+    only holds up its own notifications.
+    """
+
+    client: httpx.AsyncClient
+    per_destination: int = 4
+    timeout: float = 10.0
+    retries: int = 2
+    retry_delay: float = 0.5
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    limits: dict[str, asyncio.Semaphore] = field(default_factory=dict)
+    breakers: dict[str, CircuitBreaker] = field(default_factory=dict)
+
+    def breaker(self, destination: str) -> CircuitBreaker:
+        if (breaker := self.breakers.get(destination)) is None:
+            breaker = self.breakers[destination] = CircuitBreaker(
+                failure_threshold=self.failure_threshold,
+                reset_timeout=self.reset_timeout,
+            )
+        return breaker
+
+    def _limit(self, destination: str) -> asyncio.Semaphore:
+        if (limit := self.limits.get(destination)) is None:
+            limit = self.limits[destination] = asyncio.Semaphore(self.per_destination)
+        return limit
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter, retries of many alerts don't hit the destination together
+        return random.uniform(0, self.retry_delay * 2 ** (attempt - 1))
+
+    async def call(self, destination: str, send: Callable[[], Awaitable[T]]) -> T:
+        """Run `send` against `destination` with limits, retries and breaker."""
+        breaker = self.breaker(destination)
+        if not breaker.allow():
+            raise CircuitOpenError(
+                f"circuit open for {destination}", retry_after=breaker.retry_after()
+            )
+        async with self._limit(destination):
+            attempt = 0
+            while True:
+                try:
+                    async with asyncio.timeout(self.timeout):
+                        result = await send()
+                except Exception as e:
+                    attempt += 1
+                    if attempt > self.retries or not _retryable(e):
+                        if not _unhealthy(e):
+                            # the destination answered, only this call is wrong
+                            breaker.success()
+                            raise
+                        was_open = breaker.open
+                        breaker.failure()
+                        if breaker.open and not was_open:
+                            logging.warning("circuit opened for %s", destination)
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                breaker.success()
+                return result
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """POST to `url`, 5xx and 429 answers are retried, other errors not."""
+
+        async def send() -> httpx.Response:
+            response = await self.client.post(url, **kwargs)
+            status = response.status_code
+            if status == 429 or status >= 500:
+                raise DeliveryError(f"{url} answered {status}", status=status)
+            if response.is_error:
+                raise DeliveryError(
+                    f"{url} answered {status}", retryable=False, status=status
+                )
+            return response
+
+        return await self.call(destination(url), send)
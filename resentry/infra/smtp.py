@@ -0,0 +1,37 @@
+import asyncio
+import smtplib
+from dataclasses import dataclass
+from email.message import EmailMessage
+
+from resentry.infra.delivery import DeliveryError
+
+
+@dataclass
+class SmtpService:
+    """Plain SMTP without auth, meant for a local relay or a mail catcher."""
+
+    host: str = "localhost"
+    port: int = 1025
+    sender: str = "resentry@localhost"
+    timeout: float = 10.0
+
+    @property
+    def destination(self) -> str:
+        return f"smtp://{self.host}:{self.port}"
+
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            try:
+                smtp.send_message(message)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused) as e:
+                # a bad address is not fixed by sending again
+                raise DeliveryError(f"{message['To']}: {e}", retryable=False)
+
+    async def send_message(self, to: str, subject: str, text: str) -> None:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content(text)
+        # smtplib blocks, keep it off the event loop
+        await asyncio.to_thread(self._send, message)
@@ -2,13 +2,21 @@ from dataclasses import dataclass
 import typing
 import httpx
 
+from resentry.infra.delivery import DeliveryError
 
-class TelegramServiceException(Exception):
+
+class TelegramServiceException(DeliveryError):
     pass
 
 
-def create_http_client():
-    return httpx.AsyncClient()
+def create_http_client(pool_size: int = 100, timeout: float = 10.0):
+    """The one client every notification sender shares."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+        timeout=timeout,
+    )
 
 
 @dataclass
@@ -34,4 +42,9 @@ class TelegramService:
             method="post", api_method="sendMessage", data=data
         )
         if response.status_code != 200:
-            raise TelegramServiceException("sendMessage failed")
+            # an unknown chat or a revoked bot stays broken on retry
+            raise TelegramServiceException(
+                f"sendMessage failed with {response.status_code}",
+                retryable=response.status_code == 429 or response.status_code >= 500,
+                status=response.status_code,
+            )
@@ -1,6 +1,6 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from asyncio import Queue
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,18 +9,65 @@ from resentry.config import settings
 from resentry.api.v1.router import api_router
 from resentry.api.v1.router import sentry_router
 from resentry.api.health import health_router
-from resentry.core.events import EventWorker, TelegramSender
+from resentry.api.responses import CodecJSONResponse
+from resentry.core.cachebus import CacheBus
+from resentry.core.dedupe import RecentIds
+from resentry.core.dispatcher import Dispatcher, LeaderLease
+from resentry.core.events import (
+    EmailSender,
+    EventWorker,
+    SlackSender,
+    TelegramSender,
+    WebhookSender,
+)
+from resentry.core.hashing import Hasher
+from resentry.core.offload import LoopLagMonitor, Offloader
+from resentry.core.outcomes import Outcomes
+from resentry.core.projectkeys import ProjectKeyIndex
+from resentry.core.ratelimit import RateLimiter
+from resentry.core.responsecache import ResponseCache
+from resentry.core.rules import RuleCache
+from resentry.core.streams import EventHub
+from resentry.core.throttle import LoginThrottle
+from resentry.core.tokens import ClaimsCache
+from resentry.database import database
 from resentry.domain.queue import LogLevel
+from resentry.infra.delivery import Delivery
+from resentry.infra.smtp import SmtpService
 from resentry.infra.telegram import TelegramService, create_http_client
+from resentry.usecases.envelope import load_stream_events
 import logging
 
 
+def _closing_pools(lifespan):
+    """Wrap `lifespan` (or None) so the app's pools are shut down on exit.
+
+    The tests create the app without a lifespan, the executors of
+    create_app still need closing there.
+    """
+
+    @asynccontextmanager
+    async def wrapper(app: FastAPI):
+        try:
+            if lifespan is None:
+                yield
+            else:
+                async with lifespan(app):
+                    yield
+        finally:
+            app.state.offloader.close()
+            app.state.hasher.executor.shutdown(wait=False)
+
+    return wrapper
+
+
 def create_app(lifespan) -> FastAPI:
     app = FastAPI(
-        lifespan=lifespan,
+        lifespan=_closing_pools(lifespan),
         title="Resentry API",
         description="A FastAPI application for Sentry envelope storage and processing",
         version="0.1.0",
+        default_response_class=CodecJSONResponse,
     )
 
     # Add CORS middleware
@@ -32,6 +79,44 @@ def create_app(lifespan) -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.state.rate_limiter = RateLimiter(
+        burst=settings.RATE_LIMIT_BURST, workers=settings.WORKERS
+    )
+    app.state.outcomes = Outcomes(flush_interval=settings.OUTCOMES_FLUSH_INTERVAL)
+    app.state.rules = RuleCache()
+    app.state.recent_ids = RecentIds(maxsize=settings.DEDUPE_CACHE_SIZE)
+    app.state.cache_bus = CacheBus(poll_interval=settings.CACHE_POLL_INTERVAL)
+    app.state.project_keys = ProjectKeyIndex()
+    app.state.cache_bus.subscribe("rules", app.state.rules.invalidate)
+    app.state.cache_bus.subscribe("projects", app.state.project_keys.invalidate)
+    app.state.response_cache = ResponseCache(
+        ttl=settings.RESPONSE_CACHE_TTL, maxsize=settings.RESPONSE_CACHE_SIZE
+    )
+    app.state.cache_bus.subscribe(
+        "projects", lambda: app.state.response_cache.invalidate("projects")
+    )
+    app.state.event_hub = EventHub(
+        buffer_size=settings.STREAM_BUFFER_SIZE,
+        poll_interval=settings.CACHE_POLL_INTERVAL,
+        lag=settings.STREAM_POLL_LAG,
+    )
+    app.state.offloader = Offloader(
+        threshold=settings.OFFLOAD_THRESHOLD,
+        mode=settings.OFFLOAD_MODE,
+        max_workers=settings.OFFLOAD_WORKERS,
+    )
+    app.state.loop_lag = LoopLagMonitor(interval=settings.LOOP_LAG_INTERVAL)
+    app.state.hasher = Hasher(
+        rounds=settings.BCRYPT_ROUNDS,
+        executor=ThreadPoolExecutor(
+            max_workers=settings.HASH_WORKERS, thread_name_prefix="resentry-bcrypt"
+        ),
+    )
+    app.state.claims_cache = ClaimsCache(maxsize=settings.TOKEN_CACHE_SIZE)
+    app.state.login_throttle = LoginThrottle(
+        max_failures=settings.LOGIN_MAX_FAILURES, window=settings.LOGIN_FAILURE_WINDOW
+    )
+
     # Include API routers
     app.include_router(health_router, prefix="/health", tags=["health"])
     app.include_router(api_router, prefix="/api/v1", tags=["api"])
@@ -40,42 +125,94 @@ def create_app(lifespan) -> FastAPI:
     return app
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    queue = Queue()
-
-    client = create_http_client()
+def create_dispatcher(client) -> Dispatcher:
     event_worker = EventWorker()
+    delivery = Delivery(
+        client=client,
+        per_destination=settings.DELIVERY_PER_DESTINATION,
+        timeout=settings.DELIVERY_TIMEOUT,
+        retries=settings.DELIVERY_RETRIES,
+        retry_delay=settings.DELIVERY_RETRY_DELAY,
+        failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+    )
 
     telegram_service = TelegramService(token=settings.TELEGRAM_TOKEN, client=client)
-    telegram_sender = TelegramSender(telegram_service=telegram_service)
+    telegram_sender = TelegramSender(
+        telegram_service=telegram_service, delivery=delivery
+    )
+
+    for level in settings.NOTIFY_LEVELS:
+        event_worker.register(LogLevel(level), telegram_sender)
+    logging.info("registered events %s", event_worker.events)
+
+    # per project channels, configured through /projects/{id}/channels
+    event_worker.register_channel("webhook", WebhookSender(delivery=delivery))
+    event_worker.register_channel("slack", SlackSender(delivery=delivery))
+    event_worker.register_channel(
+        "email",
+        EmailSender(
+            delivery=delivery,
+            smtp=SmtpService(
+                host=settings.SMTP_HOST,
+                port=settings.SMTP_PORT,
+                sender=settings.SMTP_FROM,
+                timeout=settings.DELIVERY_TIMEOUT,
+            ),
+        ),
+    )
 
-    event_worker.register(LogLevel.error, telegram_sender)
-    logging.info("lifespan registed events  %s", event_worker.events)
+    return Dispatcher(
+        event_worker=event_worker,
+        session_factory=lambda: database.create_async_session(),
+        lease=LeaderLease(name="dispatcher", ttl=settings.LEASE_TTL),
+        poll_interval=settings.DISPATCH_POLL_INTERVAL,
+        batch_size=settings.DISPATCH_BATCH_SIZE,
+        visibility_timeout=settings.DISPATCH_VISIBILITY_TIMEOUT,
+        max_attempts=settings.DISPATCH_MAX_ATTEMPTS,
+        retry_delay=settings.DISPATCH_RETRY_DELAY,
+        concurrency=settings.DISPATCH_CONCURRENCY,
+    )
 
-    async def worker():
-        while True:
-            item = await queue.get()
-            if item is not None:
-                logging.info("got new item %s", item)
-                await event_worker.process_event(item)
-            # finally:
-            #    queue.task_done()
-            await asyncio.sleep(0.1)
 
-    worker_task = asyncio.create_task(worker())
-    app.state.queue = queue
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    client = create_http_client(
+        pool_size=settings.DELIVERY_POOL_SIZE, timeout=settings.DELIVERY_TIMEOUT
+    )
+    tasks = [
+        asyncio.create_task(
+            app.state.cache_bus.run(lambda: database.create_async_session())
+        ),
+        asyncio.create_task(app.state.loop_lag.run()),
+        asyncio.create_task(
+            app.state.outcomes.run(lambda: database.create_async_session())
+        ),
+    ]
+    if settings.WORKERS > 1:
+        # streams only see ingest of their own process, pick up the others
+        tasks.append(
+            asyncio.create_task(
+                app.state.event_hub.run(
+                    lambda: database.create_async_session(), load_stream_events
+                )
+            )
+        )
+
+    dispatcher = None
+    if settings.DISPATCHER == "embedded":
+        dispatcher = create_dispatcher(client)
+        tasks.append(asyncio.create_task(dispatcher.run()))
 
     yield
 
-    worker_task.cancel()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if dispatcher is not None:
+        await dispatcher.close()
     await client.aclose()
 
-    try:
-        await worker_task
-    except asyncio.CancelledError:
-        pass
-
 
 app = create_app(lifespan=lifespan)
 
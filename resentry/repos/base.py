@@ -1,8 +1,11 @@
-from typing import Sequence, ClassVar
+from collections.abc import Sequence
+from typing import Any, ClassVar
 
+from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from pydantic import BaseModel
 
 from resentry.database.models.base import Entity
 
@@ -15,6 +18,24 @@ class BaseRepo:
             raise Exception()
         self.db = db
 
+    def _insert(self):
+        """Dialect specific insert() supporting ON CONFLICT clauses."""
+        dialect = self.db.get_bind().dialect.name
+        return postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    async def bulk_insert(self, rows: list[dict[str, Any]]) -> list[int]:
+        """Insert many rows in one statement, returns their ids in row order."""
+        if not rows:
+            return []
+        result = await self.db.exec(
+            insert(self.entity_type).returning(
+                self.entity_type.id,  # pyright: ignore[reportArgumentType]
+                sort_by_parameter_order=True,
+            ),
+            params=rows,
+        )
+        return list(result.scalars().all())
+
     async def get_by_id(self, id: int) -> Entity | None:
         result = await self.db.exec(
             select(self.entity_type).where(self.entity_type.id == id)
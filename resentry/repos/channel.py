@@ -0,0 +1,21 @@
+from collections.abc import Sequence
+
+from sqlmodel import col, select
+
+from resentry.database.models.channel import NotificationChannel
+from resentry.repos.base import BaseRepo
+
+
+class NotificationChannelRepository(BaseRepo):
+    entity_type = NotificationChannel
+
+    async def get_all_by_project(
+        self, project_id: int, enabled: bool | None = None
+    ) -> Sequence[NotificationChannel]:
+        query = select(NotificationChannel).where(
+            NotificationChannel.project_id == project_id
+        )
+        if enabled is not None:
+            query = query.where(NotificationChannel.enabled == enabled)
+        result = await self.db.exec(query.order_by(col(NotificationChannel.id)))
+        return result.all()
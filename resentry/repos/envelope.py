@@ -1,22 +1,211 @@
-from typing import Sequence
-from sqlmodel import select
+import typing
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
+from sqlmodel import and_, col, exists, func, or_, select
 
-from resentry.repos.base import BaseRepo
 from resentry.database.models.envelope import Envelope, EnvelopeItem
+from resentry.domain.envelope import EventFilter, EventSort
+from resentry.repos.base import BaseRepo
+
+
+def encode_cursor(envelope: Envelope, sort: EventSort) -> str:
+    """Position after `envelope` in the given sort order."""
+    if sort in (EventSort.sent_at, EventSort.sent_at_desc):
+        return f"{typing.cast(datetime, envelope.sent_at).isoformat()},{envelope.id}"
+    return str(envelope.id)
+
+
+def decode_cursor(cursor: str, sort: EventSort) -> tuple[datetime | None, int]:
+    """Inverse of encode_cursor, ValueError on malformed input."""
+    if sort in (EventSort.sent_at, EventSort.sent_at_desc):
+        sent_at, _, id = cursor.rpartition(",")
+        return datetime.fromisoformat(sent_at), int(id)
+    return None, int(cursor)
 
 
 class EnvelopeRepository(BaseRepo):
     entity_type = Envelope
 
-    async def get_all_by_project(self, project_id: int) -> Sequence[Envelope]:
+    async def find(
+        self,
+        filters: EventFilter,
+        sort: EventSort = EventSort.id,
+        cursor: str | None = None,
+        limit: int = 100,
+        with_items: bool = True,
+    ) -> Sequence[Envelope]:
+        """A page of envelopes matching `filters`, keyset paginated by `cursor`.
+
+        Sorting by sent_at skips envelopes without a sent_at; ties are broken
+        by id so pages never overlap.
+        """
+        by_sent_at = sort in (EventSort.sent_at, EventSort.sent_at_desc)
+        descending = sort in (EventSort.id_desc, EventSort.sent_at_desc)
+        envelope_id = col(Envelope.id)
+        sent_at = col(Envelope.sent_at)
+
+        query = select(Envelope)
+        if with_items:
+            query = query.options(selectinload(Envelope.items))  # pyright: ignore[reportArgumentType]
+        if filters.project_id is not None:
+            query = query.where(col(Envelope.project_id) == filters.project_id)
+        if filters.since is not None:
+            query = query.where(sent_at >= filters.since)
+        if filters.until is not None:
+            query = query.where(sent_at < filters.until)
+
+        item_conditions = [
+            col(column).in_(values)
+            for column, values in (
+                (EnvelopeItem.level, filters.levels),
+                (EnvelopeItem.environment, filters.environments),
+                (EnvelopeItem.release, filters.releases),
+                (EnvelopeItem.type, filters.item_types),
+            )
+            if values is not None
+        ]
+        if item_conditions:
+            query = query.where(
+                exists().where(
+                    col(EnvelopeItem.event_id) == envelope_id, *item_conditions
+                )
+            )
+
+        if cursor is not None:
+            cursor_sent_at, cursor_id = decode_cursor(cursor, sort)
+            if by_sent_at:
+                if descending:
+                    query = query.where(
+                        or_(
+                            sent_at < cursor_sent_at,
+                            and_(sent_at == cursor_sent_at, envelope_id < cursor_id),
+                        )
+                    )
+                else:
+                    query = query.where(
+                        or_(
+                            sent_at > cursor_sent_at,
+                            and_(sent_at == cursor_sent_at, envelope_id > cursor_id),
+                        )
+                    )
+            else:
+                query = query.where(
+                    envelope_id < cursor_id if descending else envelope_id > cursor_id
+                )
+
+        order = [sent_at, envelope_id] if by_sent_at else [envelope_id]
+        if by_sent_at:
+            query = query.where(sent_at.is_not(None))
+        query = query.order_by(
+            *(column.desc() if descending else column for column in order)
+        ).limit(limit)
+        result = await self.db.exec(query)
+        return result.all()
+
+    async def ids_after(self, project_ids: list[int], after: int) -> Sequence[int]:
+        """Ids of the envelopes of the projects above `after`, ascending."""
+        result = await self.db.exec(
+            select(Envelope.id)
+            .where(col(Envelope.project_id).in_(project_ids), col(Envelope.id) > after)
+            .order_by(col(Envelope.id))
+        )
+        return result.all()  # pyright: ignore[reportReturnType]
+
+    async def get_many(self, ids: list[int]) -> Sequence[Envelope]:
+        """Envelopes by id with their items, ascending."""
         result = await self.db.exec(
             select(Envelope)
             .options(selectinload(Envelope.items))  # pyright: ignore[reportArgumentType]
-            .where(Envelope.project_id == project_id)
+            .where(col(Envelope.id).in_(ids))
+            .order_by(col(Envelope.id))
         )
         return result.all()
 
+    async def last_id(self, project_id: int | None = None) -> int:
+        """Largest envelope id (of a project), 0 if there is none."""
+        query = select(func.max(Envelope.id))
+        if project_id is not None:
+            query = query.where(col(Envelope.project_id) == project_id)
+        result = await self.db.exec(query)
+        return result.first() or 0
+
+    async def exists_by_event_id(self, project_id: int, event_id: str) -> bool:
+        result = await self.db.exec(
+            select(Envelope.id).where(
+                Envelope.project_id == project_id, Envelope.event_id == event_id
+            )
+        )
+        return result.first() is not None
+
+    async def create_unique(self, envelope: Envelope) -> Envelope | None:
+        """Insert an envelope, None if (project_id, event_id) already exists.
+
+        The whole transaction is rolled back on conflict.
+        """
+        try:
+            return await self.create(envelope)  # pyright: ignore[reportReturnType]
+        except IntegrityError:
+            await self.db.rollback()
+            return None
+
 
 class EnvelopeItemRepository(BaseRepo):
     entity_type = EnvelopeItem
+
+    async def stream_events(
+        self,
+        project_id: int,
+        filters: EventFilter | None = None,
+        after: int = 0,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Row[Any]]:
+        """Event items of a project in id order, read through a server-side cursor.
+
+        Rows carry the item id, payload and level and the envelope's id,
+        event_id and sent_at; the envelope body itself is never loaded.
+        The sent_at range and the level, environment and release filters
+        apply to each item, item types do not (only events are exported).
+        """
+        stmt = (
+            select(
+                EnvelopeItem.id,
+                EnvelopeItem.payload,
+                EnvelopeItem.level,
+                Envelope.id.label("envelope_id"),  # pyright: ignore[reportOptionalMemberAccess]
+                Envelope.event_id,
+                Envelope.sent_at,
+            )
+            .join(Envelope, col(EnvelopeItem.event_id) == col(Envelope.id))
+            .where(
+                col(Envelope.project_id) == project_id,
+                col(EnvelopeItem.id) > after,
+                # items stored before types were recorded are events
+                or_(
+                    col(EnvelopeItem.type) == "event",
+                    col(EnvelopeItem.type).is_(None),
+                ),
+            )
+            .order_by(col(EnvelopeItem.id))
+            .execution_options(yield_per=batch_size)
+        )
+        filters = filters or EventFilter()
+        if filters.since is not None:
+            stmt = stmt.where(col(Envelope.sent_at) >= filters.since)
+        if filters.until is not None:
+            stmt = stmt.where(col(Envelope.sent_at) < filters.until)
+        for column, values in (
+            (EnvelopeItem.level, filters.levels),
+            (EnvelopeItem.environment, filters.environments),
+            (EnvelopeItem.release, filters.releases),
+        ):
+            if values is not None:
+                stmt = stmt.where(col(column).in_(values))
+
+        result = await self.db.stream(stmt)
+        async for row in result:
+            yield row
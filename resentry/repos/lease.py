@@ -0,0 +1,70 @@
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlmodel import col, func, or_, select, update
+
+from resentry.database.models.lease import CacheVersion, Lease
+from resentry.repos.base import BaseRepo
+
+
+class LeaseRepository(BaseRepo):
+    entity_type = Lease
+
+    async def acquire(
+        self, name: str, owner: str, now: datetime, expires_at: datetime
+    ) -> bool:
+        """Take or renew the lease, False while another owner holds it."""
+        await self.db.exec(
+            self._insert()(Lease)
+            .values(name=name, owner=owner, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        result = await self.db.exec(
+            update(Lease)
+            .where(
+                col(Lease.name) == name,
+                or_(col(Lease.owner) == owner, col(Lease.expires_at) < now),
+            )
+            .values(owner=owner, expires_at=expires_at)
+        )
+        return result.rowcount == 1
+
+    async def release(self, name: str, owner: str, now: datetime) -> None:
+        await self.db.exec(
+            update(Lease)
+            .where(col(Lease.name) == name, col(Lease.owner) == owner)
+            .values(expires_at=now)
+        )
+
+
+class CacheVersionRepository(BaseRepo):
+    entity_type = CacheVersion
+
+    async def bump(self, name: str) -> None:
+        stmt = self._insert()(CacheVersion).values(name=name, version=1)
+        await self.db.exec(
+            stmt.on_conflict_do_update(
+                index_elements=["name"],
+                set_={"version": CacheVersion.version + 1},
+            )
+        )
+
+    async def get_version(self, name: str) -> int:
+        """Current version of `name`, 0 if it was never published."""
+        result = await self.db.exec(
+            select(CacheVersion.version).where(CacheVersion.name == name)
+        )
+        return result.first() or 0
+
+    async def get_total(self, prefix: str) -> int:
+        """Sum of the versions of all names starting with `prefix`."""
+        result = await self.db.exec(
+            select(func.sum(CacheVersion.version)).where(
+                col(CacheVersion.name).startswith(prefix)
+            )
+        )
+        return result.first() or 0
+
+    async def get_all(self) -> Sequence[CacheVersion]:
+        result = await self.db.exec(select(CacheVersion))
+        return result.all()
@@ -0,0 +1,28 @@
+from collections.abc import Sequence
+
+from sqlmodel import select
+
+from resentry.database.models.outcome import Outcome
+from resentry.repos.base import BaseRepo
+
+
+class OutcomeRepository(BaseRepo):
+    entity_type = Outcome
+
+    async def increment(
+        self, project_id: int, reason: str, category: str, quantity: int = 1
+    ) -> None:
+        stmt = self._insert()(Outcome).values(
+            project_id=project_id, reason=reason, category=category, quantity=quantity
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["project_id", "reason", "category"],
+            set_={"quantity": Outcome.quantity + stmt.excluded.quantity},
+        )
+        await self.db.exec(stmt)
+
+    async def get_all_by_project(self, project_id: int) -> Sequence[Outcome]:
+        result = await self.db.exec(
+            select(Outcome).where(Outcome.project_id == project_id)
+        )
+        return result.all()
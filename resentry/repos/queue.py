@@ -0,0 +1,97 @@
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlmodel import col, delete, or_, select, update
+
+from resentry.database.models.queue import QueuedEvent
+from resentry.repos.base import BaseRepo
+
+PENDING = "pending"
+FAILED = "failed"
+
+
+class QueuedEventRepository(BaseRepo):
+    entity_type = QueuedEvent
+
+    async def claim(
+        self, limit: int, now: datetime, locked_until: datetime
+    ) -> Sequence[QueuedEvent]:
+        """Lock the oldest due events until `locked_until` and return them."""
+        due = (
+            select(QueuedEvent.id)
+            .where(
+                col(QueuedEvent.status) == PENDING,
+                col(QueuedEvent.next_attempt_at) <= now,
+                or_(
+                    col(QueuedEvent.locked_until).is_(None),
+                    col(QueuedEvent.locked_until) < now,
+                ),
+            )
+            .order_by(col(QueuedEvent.id))
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.exec(
+            update(QueuedEvent)
+            .where(col(QueuedEvent.id).in_(due.scalar_subquery()))
+            .values(locked_until=locked_until, attempts=QueuedEvent.attempts + 1)
+            .returning(QueuedEvent)
+            .execution_options(synchronize_session=False)
+        )
+        # RETURNING order is unspecified
+        return sorted(result.scalars().all(), key=lambda event: event.id)
+
+    async def ack(self, id: int) -> None:
+        await self.db.exec(delete(QueuedEvent).where(col(QueuedEvent.id) == id))
+
+    async def retry(
+        self,
+        id: int,
+        error: str,
+        next_attempt_at: datetime,
+        delivered: str | None = None,
+    ) -> None:
+        await self.db.exec(
+            update(QueuedEvent)
+            .where(col(QueuedEvent.id) == id)
+            .values(
+                locked_until=None,
+                next_attempt_at=next_attempt_at,
+                last_error=error,
+                delivered=delivered,
+            )
+        )
+
+    async def fail(self, id: int, error: str, delivered: str | None = None) -> None:
+        await self.db.exec(
+            update(QueuedEvent)
+            .where(col(QueuedEvent.id) == id)
+            .values(
+                status=FAILED, locked_until=None, last_error=error, delivered=delivered
+            )
+        )
+
+    async def release_claims(self, now: datetime) -> int:
+        """Make events claimed by a dispatcher that is gone due again.
+
+        Only expired claims are released, a live claim may belong to a
+        dispatcher that is still sending.
+        """
+        result = await self.db.exec(
+            update(QueuedEvent)
+            .where(
+                col(QueuedEvent.status) == PENDING,
+                col(QueuedEvent.locked_until) < now,
+            )
+            .values(locked_until=None)
+        )
+        return result.rowcount
+
+    async def requeue_failed(self, now: datetime) -> int:
+        """Give failed events a fresh set of attempts."""
+        result = await self.db.exec(
+            update(QueuedEvent)
+            .where(col(QueuedEvent.status) == FAILED)
+            .values(status=PENDING, attempts=0, next_attempt_at=now)
+        )
+        return result.rowcount
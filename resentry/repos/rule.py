@@ -0,0 +1,18 @@
+from collections.abc import Sequence
+
+from sqlmodel import select
+
+from resentry.database.models.rule import ProjectRule
+from resentry.repos.base import BaseRepo
+
+
+class ProjectRuleRepository(BaseRepo):
+    entity_type = ProjectRule
+
+    async def get_all_by_project(self, project_id: int) -> Sequence[ProjectRule]:
+        result = await self.db.exec(
+            select(ProjectRule)
+            .where(ProjectRule.project_id == project_id)
+            .order_by(ProjectRule.id)  # pyright: ignore[reportArgumentType]
+        )
+        return result.all()
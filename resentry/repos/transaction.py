@@ -0,0 +1,66 @@
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, select
+
+from resentry.database.models.transaction import ItemCounter, Transaction
+from resentry.repos.base import BaseRepo
+
+
+class TransactionRepository(BaseRepo):
+    entity_type = Transaction
+
+    async def get_all_by_project(
+        self, project_id: int, limit: int = 100
+    ) -> Sequence[Transaction]:
+        result = await self.db.exec(
+            select(Transaction)
+            .where(Transaction.project_id == project_id)
+            .order_by(col(Transaction.id).desc())
+            .limit(limit)
+        )
+        return result.all()
+
+    async def exists_by_event_id(self, project_id: int, event_id: str) -> bool:
+        result = await self.db.exec(
+            select(Transaction.id).where(
+                Transaction.project_id == project_id, Transaction.event_id == event_id
+            )
+        )
+        return result.first() is not None
+
+    async def create_unique(self, transaction: Transaction) -> Transaction | None:
+        """Insert a transaction, None if (project_id, event_id) already exists.
+
+        The whole transaction is rolled back on conflict.
+        """
+        try:
+            return await self.create(transaction)  # pyright: ignore[reportReturnType]
+        except IntegrityError:
+            await self.db.rollback()
+            return None
+
+
+class ItemCounterRepository(BaseRepo):
+    entity_type = ItemCounter
+
+    async def increment(
+        self, project_id: int, category: str, bucket: datetime, quantity: int = 1
+    ) -> None:
+        stmt = self._insert()(ItemCounter).values(
+            project_id=project_id, category=category, bucket=bucket, quantity=quantity
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["project_id", "category", "bucket"],
+            set_={"quantity": ItemCounter.quantity + stmt.excluded.quantity},
+        )
+        await self.db.exec(stmt)
+
+    async def get_all_by_project(self, project_id: int) -> Sequence[ItemCounter]:
+        result = await self.db.exec(
+            select(ItemCounter)
+            .where(ItemCounter.project_id == project_id)
+            .order_by(col(ItemCounter.bucket), col(ItemCounter.category))
+        )
+        return result.all()
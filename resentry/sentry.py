@@ -1,8 +1,8 @@
 import io
-import json
 import typing
 from typing import TypedDict
 
+from resentry.utils.jsoncodec import JSONDecodeError
 from resentry.utils.helpers import (
     parse_json,
     gzip_decompress,
@@ -27,6 +27,20 @@ class ItemHeader(TypedDict, total=False):
     filename: str | None
 
 
+# Item types whose payload is JSON even when the SDK omits content_type
+JSON_ITEM_TYPES = frozenset(
+    {
+        "event",
+        "transaction",
+        "session",
+        "sessions",
+        "client_report",
+        "user_report",
+        "check_in",
+    }
+)
+
+
 class EnvelopeItem:
     """Represents a single item within the envelope."""
 
@@ -43,13 +57,18 @@ class EnvelopeItem:
         return self.payload
 
     def get_payload_json(self) -> dict[str, typing.Any] | None:
-        """Returns the payload as JSON if it's JSON-compatible."""
-        if self.content_type.startswith("application/json"):
+        """Returns the payload as JSON if it's a JSON object."""
+        if (
+            self.content_type.startswith("application/json")
+            or self.type in JSON_ITEM_TYPES
+        ):
             try:
-                data = self.payload.decode("utf-8", "replace")
-                return json.loads(data)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                pass
+                payload = parse_json(self.payload)
+            except (JSONDecodeError, UnicodeDecodeError):
+                return None
+            # lists and scalars carry nothing the item handlers read
+            if isinstance(payload, dict):
+                return payload
         return None
 
     def __repr__(self) -> str:
@@ -134,18 +153,19 @@ def unpack_sentry_envelope(envelope_data: bytes) -> Envelope:
             item_headers = parse_json(
                 item_header_line
             )  # Using sync version for in-memory operations
-        except json.JSONDecodeError:
+        except JSONDecodeError:
             # If we can't parse the header, we've likely reached the end or have malformed data
             break
 
         # Get the length of the payload
-        length = item_headers.get("length", 0)
+        # Without a length the payload is terminated by a newline
+        length = item_headers.get("length")
         # Convert length to int if it's a string
         if isinstance(length, str):
             try:
                 length = int(length)
             except ValueError:
-                length = 0
+                length = None
 
         # Ensure length is a non-negative integer
         if length is not None and isinstance(length, int) and length >= 0:
@@ -10,14 +10,25 @@ from resentry.domain.project import ProjectDTO
 class ProjectService:
     repo: ProjectRepository
 
+    def _to_dto(self, project: Project) -> ProjectDTO:
+        return ProjectDTO(
+            id=project.id,
+            name=project.name,
+            lang=project.lang,
+            key=project.key,
+            rate_limit_events=project.rate_limit_events,
+            rate_limit_bytes=project.rate_limit_bytes,
+        )
+
     async def get_project_by_id(self, project_id: int) -> ProjectDTO | None:
         if project := typing.cast(
             Project | None, await self.repo.get_by_id(project_id)
         ):
-            return ProjectDTO(
-                id=project.id,
-                name=project.name,
-                lang=project.lang,
-                key=project.key,
-            )
+            return self._to_dto(project)
         return None
+
+    async def get_all(self) -> list[ProjectDTO]:
+        return [
+            self._to_dto(typing.cast(Project, project))
+            for project in await self.repo.get_all()
+        ]
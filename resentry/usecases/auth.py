@@ -1,34 +1,35 @@
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
 
+import jwt
+
+from resentry.config import settings
+from resentry.core.hashing import Hasher
+from resentry.core.tokens import JWTKeys, jwt_keys
+from resentry.database.models.user import User
 from resentry.database.schemas.auth import (
     LoginSchema,
     RefreshTokenSchema,
-    TokenSchema,
     TokenPayload,
+    TokenSchema,
 )
-from resentry.database.models.user import User
 from resentry.repos.user import UserRepository
-from resentry.core.hashing import Hasher
-from resentry.config import settings
-
-
-import jwt
 
 
 @dataclass
 class JTW:
-    _secret: str = settings.SECRET_KEY
-    algorithm: str = settings.ALGORITHM
+    keys: JWTKeys = field(default_factory=jwt_keys)
 
     def _encode(self, payload: dict[str, str | datetime]) -> str:
-        return jwt.encode(payload, self._secret, algorithm=self.algorithm)
+        if self.keys.signing_key is None:
+            raise ValueError("JWT_PRIVATE_KEY is required to issue tokens")
+        return jwt.encode(payload, self.keys.signing_key, algorithm=self.keys.algorithm)
 
     def get_refresh_token(self, user_id: int) -> str:
         return self._encode(
             {
                 "sub": str(user_id),
-                "exp": datetime.now(tz=timezone.utc)
+                "exp": datetime.now(tz=UTC)
                 + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
             }
         )
@@ -37,7 +38,7 @@ class JTW:
         return self._encode(
             {
                 "sub": str(user_id),
-                "exp": datetime.now(tz=timezone.utc)
+                "exp": datetime.now(tz=UTC)
                 + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
             }
         )
@@ -46,7 +47,9 @@ class JTW:
         # jwt.exceptions.ExpiredSignatureError: Signature has expired
         # jwt.exceptions.InvalidSignatureError: Signature verification failed
         return TokenPayload(
-            **jwt.decode(encoded, self._secret, algorithms=self.algorithm)
+            **jwt.decode(
+                encoded, self.keys.verifying_key, algorithms=[self.keys.algorithm]
+            )
         )
 
 
@@ -55,12 +58,12 @@ class Login:
     repo: UserRepository
     hasher: Hasher
 
-    def validate_password(self, user: User, password: str) -> bool:
-        return self.hasher.verify_password(password, user.password)
+    async def validate_password(self, user: User, password: str) -> bool:
+        return await self.hasher.verify(password, user.password)
 
     async def execute(self, body: LoginSchema) -> TokenSchema | None:
         user_db = await self.repo.get_by_name(body.login)
-        if not user_db or not self.validate_password(user_db, body.password):
+        if not user_db or not await self.validate_password(user_db, body.password):
             return None
         token_gen = JTW()
         return TokenSchema(
@@ -1,49 +1,325 @@
-from dataclasses import dataclass
 import datetime
 import typing
+from dataclasses import dataclass, field
 
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from resentry.core.dedupe import RecentIds
+from resentry.core.offload import Offloader
+from resentry.core.outcomes import Outcomes
+from resentry.core.responsecache import ResponseCache, events_cache_tag
+from resentry.core.rules import RuleSet
+from resentry.core.streams import EventHub, StreamEvent
+from resentry.database.models.envelope import Envelope as EnvelopeModel
 from resentry.database.models.envelope import EnvelopeItem
+from resentry.database.models.transaction import Transaction
+from resentry.database.schemas.envelope import EnvelopeResponse
+from resentry.database.session import on_commit
+from resentry.domain.queue import LogLevel
 from resentry.repos.envelope import EnvelopeItemRepository, EnvelopeRepository
-from resentry.database.models.envelope import Envelope as EnvelopeModel
+from resentry.repos.lease import CacheVersionRepository
+from resentry.repos.transaction import ItemCounterRepository, TransactionRepository
+from resentry.sentry import (
+    Envelope,
+    unpack_sentry_envelope_from_request,
+)
+from resentry.sentry import (
+    EnvelopeItem as SentryEnvelopeItem,
+)
+from resentry.utils import jsoncodec
+from resentry.utils.helpers import parse_timestamp
+
+# Performance data goes to the compact transactions table
+PERFORMANCE_ITEM_TYPES = frozenset({"transaction", "span"})
+# Session and client report items are only counted
+COUNTER_ITEM_TYPES = frozenset({"session", "sessions", "client_report"})
+SESSION_STATUSES = ("exited", "errored", "crashed", "abnormal")
+
+
+class EnvelopeDropped(Exception):
+    """Every item of the envelope was rejected before it was stored."""
+
+
+class EnvelopeDuplicate(Exception):
+    """An envelope with the same event_id was already stored for the project."""
+
+
+@dataclass
+class StoreResult:
+    envelope: EnvelopeModel | None = None
+    # parsed items stored with the envelope, handed on to scheduling
+    items: list[SentryEnvelopeItem] = field(default_factory=list)
+    transactions: int = 0
+    counters: int = 0
+
+
+def _item_counts(item: SentryEnvelopeItem) -> dict[str, int]:
+    payload = item.payload_json or {}
+    counts: dict[str, int] = {}
+    if item.type == "session":
+        status = payload.get("status") or "ok"
+        counts[f"session.{status}"] = 1
+    elif item.type == "sessions":
+        aggregates = payload.get("aggregates")
+        for aggregate in aggregates if isinstance(aggregates, list) else []:
+            if not isinstance(aggregate, dict):
+                continue
+            for status in SESSION_STATUSES:
+                if quantity := aggregate.get(status):
+                    key = f"session.{status}"
+                    counts[key] = counts.get(key, 0) + int(quantity)
+    elif item.type == "client_report":
+        discarded_events = payload.get("discarded_events")
+        for discarded in discarded_events if isinstance(discarded_events, list) else []:
+            if not isinstance(discarded, dict):
+                continue
+            key = f"client_report.{discarded.get('reason')}.{discarded.get('category')}"
+            counts[key] = counts.get(key, 0) + int(discarded.get("quantity", 0))
+    return counts
+
+
+def item_attributes(
+    item_type: str | None, payload: dict[str, typing.Any] | None
+) -> dict[str, str | None]:
+    """Filterable envelope item columns, taken from the item payload."""
+    if not isinstance(payload, dict):
+        payload = {}
+
+    def text(key: str) -> str | None:
+        value = payload.get(key)
+        return str(value) if value not in (None, "") else None
+
+    level = LogLevel.normalize(text("level"))
+    if level is None and item_type in (None, "event"):
+        # sentry treats events without an explicit level as errors
+        level = "error"
+    return {
+        "level": level,
+        "environment": text("environment"),
+        "release": text("release"),
+    }
+
+
+def stream_event(envelope: EnvelopeModel, items: list[EnvelopeItem]) -> StreamEvent:
+    """Render a stored envelope for live subscribers, in the list format."""
+    content = EnvelopeResponse.model_validate(
+        {
+            "id": envelope.id,
+            "project_id": envelope.project_id,
+            "event_id": envelope.event_id,
+            "sent_at": envelope.sent_at,
+            "dsn": envelope.dsn,
+            "items": [item.model_dump() for item in items],
+        }
+    )
+    return StreamEvent(
+        project_id=envelope.project_id,
+        envelope_id=typing.cast(int, envelope.id),
+        data=jsoncodec.dumps(content.model_dump(mode="json")),
+        items=tuple(
+            {
+                "level": item.level,
+                "environment": item.environment,
+                "release": item.release,
+                "type": item.type,
+            }
+            for item in items
+        ),
+    )
+
+
+async def load_stream_events(
+    session: AsyncSession,
+    project_ids: list[int],
+    after: int | None,
+    skip: typing.Container[int] = (),
+    limit: int = 500,
+) -> tuple[list[StreamEvent], int]:
+    """EventHub loader: envelopes stored after `after` by any process.
 
+    Only ids are read for envelopes in `skip` (already published), the
+    rest is loaded with items, at most `limit` of them per call.
+    """
+    repo = EnvelopeRepository(session)
+    if after is None:
+        return [], await repo.last_id()
+    ids = await repo.ids_after(project_ids, after)
+    new_ids = [id for id in ids if id not in skip][:limit]
+    envelopes = await repo.get_many(new_ids) if new_ids else []
+    events = [stream_event(envelope, envelope.items) for envelope in envelopes]
+    # stop at the last loaded id when the limit cut the batch short
+    last_id = new_ids[-1] if len(new_ids) == limit else (ids[-1] if ids else after)
+    return events, last_id
 
-from resentry.sentry import unpack_sentry_envelope_from_request
+
+def build_transaction(project_id: int, item: SentryEnvelopeItem) -> Transaction:
+    payload = item.payload_json or {}
+    contexts = payload.get("contexts")
+    trace = contexts.get("trace") if isinstance(contexts, dict) else None
+    if not isinstance(trace, dict):
+        trace = {}
+    start = parse_timestamp(payload.get("start_timestamp"))
+    end = parse_timestamp(payload.get("timestamp"))
+    duration_ms = (end - start).total_seconds() * 1000 if start and end else None
+    return Transaction(
+        project_id=project_id,
+        event_id=payload.get("event_id") or payload.get("span_id"),
+        trace_id=trace.get("trace_id") or payload.get("trace_id"),
+        name=payload.get("transaction") or payload.get("description"),
+        op=trace.get("op") or payload.get("op"),
+        status=trace.get("status") or payload.get("status"),
+        start_timestamp=start,
+        duration_ms=duration_ms,
+        environment=payload.get("environment"),
+        release=payload.get("release"),
+    )
 
 
 @dataclass(frozen=True)
 class StoreEnvelope:
     repo: EnvelopeRepository
     repo_items: EnvelopeItemRepository
+    repo_transactions: TransactionRepository
+    repo_counters: ItemCounterRepository
     body: bytes
     content_encoding: str | None
     project_id: int
+    rules: RuleSet | None = None
+    outcomes: Outcomes | None = None
+    recent_ids: RecentIds | None = None
+    offloader: Offloader | None = None
+    response_cache: ResponseCache | None = None
+    event_hub: EventHub | None = None
+    # bumped with every stored envelope, event list ETags are built from it
+    repo_versions: CacheVersionRepository | None = None
 
-    async def execute(self) -> EnvelopeModel | None:  # type: ignore[override]
-        try:
-            envelope = unpack_sentry_envelope_from_request(
-                self.body, self.content_encoding
+    async def _unpack(self) -> Envelope:
+        if self.offloader is None:
+            return unpack_sentry_envelope_from_request(self.body, self.content_encoding)
+        # large bodies are decompressed and parsed in the offload pool
+        return await self.offloader.run(
+            len(self.body),
+            unpack_sentry_envelope_from_request,
+            self.body,
+            self.content_encoding,
+        )
+
+    async def _check_duplicate(self, event_id: str) -> None:
+        key = (self.project_id, event_id)
+        if self.recent_ids is not None and key in self.recent_ids:
+            raise EnvelopeDuplicate(event_id)
+        if await self.repo.exists_by_event_id(
+            self.project_id, event_id
+        ) or await self.repo_transactions.exists_by_event_id(self.project_id, event_id):
+            if self.recent_ids is not None:
+                self.recent_ids.add(key)
+            raise EnvelopeDuplicate(event_id)
+
+    def _filter_items(self, envelope: Envelope) -> list[SentryEnvelopeItem]:
+        if self.rules is None or not self.rules.rules:
+            return envelope.items
+
+        kept = []
+        for item in envelope.items:
+            if reason := self.rules.drop_reason(item):
+                if self.outcomes is not None:
+                    self.outcomes.record(self.project_id, reason, item.type)
+                continue
+            kept.append(item)
+        return kept
+
+    async def _store_counters(self, items: list[SentryEnvelopeItem]) -> int:
+        counts: dict[str, int] = {}
+        for item in items:
+            for category, quantity in _item_counts(item).items():
+                counts[category] = counts.get(category, 0) + quantity
+
+        bucket = datetime.datetime.now(datetime.UTC).replace(
+            minute=0, second=0, microsecond=0
+        )
+        for category, quantity in counts.items():
+            await self.repo_counters.increment(
+                self.project_id, category, bucket, quantity
             )
-        except ValueError:
-            return None
+        return len(counts)
 
+    async def _store_envelope(
+        self, envelope: Envelope, items: list[SentryEnvelopeItem]
+    ) -> tuple[EnvelopeModel, list[EnvelopeItem]]:
         # Create envelope record in database
-        sent_at_str = envelope.headers.get("sent_at")
-        sent_at = datetime.datetime.fromisoformat(sent_at_str) if sent_at_str else None
+        # malformed values from an SDK are dropped, not a reason to fail
+        sent_at = parse_timestamp(envelope.headers.get("sent_at"))
 
         envelope_db = EnvelopeModel(
             project_id=self.project_id,
             payload=self.body,
-            event_id=envelope.event_id,
+            event_id=envelope.event_id or None,
             sent_at=sent_at,
             dsn=envelope.headers.get("dsn"),
         )
-        envelope_db = typing.cast(EnvelopeModel, await self.repo.create(envelope_db))
-        for item_id, item in enumerate(envelope.items):
+        if await self.repo.create_unique(envelope_db) is None:
+            # lost a race against a concurrent retry of the same event
+            raise EnvelopeDuplicate(envelope.event_id)
+        item_rows = []
+        for item_id, item in enumerate(items):
             item_db = EnvelopeItem(
                 event_id=typing.cast(int, envelope_db.id),
                 item_id=str(item_id),
+                type=item.type,
                 payload=item.get_payload_bytes(),
+                **item_attributes(item.type, item.payload_json),
             )
             await self.repo_items.create(item_db)
+            item_rows.append(item_db)
+        return envelope_db, item_rows
+
+    async def execute(self) -> StoreResult | None:  # type: ignore[override]
+        try:
+            envelope = await self._unpack()
+        except ValueError:
+            return None
 
-        return envelope_db
+        if envelope.event_id:
+            await self._check_duplicate(envelope.event_id)
+
+        items = self._filter_items(envelope)
+        if envelope.items and not items:
+            raise EnvelopeDropped(envelope.event_id)
+
+        result = StoreResult()
+        event_items = []
+        counter_items = []
+        for item in items:
+            if item.type in PERFORMANCE_ITEM_TYPES:
+                transaction = build_transaction(self.project_id, item)
+                if await self.repo_transactions.create_unique(transaction) is None:
+                    # a retry that raced the first attempt or outlived recent_ids
+                    raise EnvelopeDuplicate(envelope.event_id)
+                result.transactions += 1
+            elif item.type in COUNTER_ITEM_TYPES:
+                counter_items.append(item)
+            else:
+                event_items.append(item)
+
+        if counter_items:
+            result.counters = await self._store_counters(counter_items)
+        if event_items or not items:
+            result.envelope, item_rows = await self._store_envelope(
+                envelope, event_items
+            )
+            result.items = event_items
+            if (hub := self.event_hub) is not None and hub.has_subscribers(
+                self.project_id
+            ):
+                event = stream_event(result.envelope, item_rows)
+                on_commit(self.repo.db, lambda: hub.publish(event))
+        if envelope.event_id and (recent_ids := self.recent_ids) is not None:
+            # only remember ids that made it into the database
+            key = (self.project_id, envelope.event_id)
+            on_commit(self.repo.db, lambda: recent_ids.add(key))
+        if result.envelope is not None and self.repo_versions is not None:
+            await self.repo_versions.bump(events_cache_tag(self.project_id))
+        if result.envelope is not None and (cache := self.response_cache) is not None:
+            tags = (events_cache_tag(self.project_id), events_cache_tag(None))
+            on_commit(self.repo.db, lambda: [cache.invalidate(tag) for tag in tags])
+        return result
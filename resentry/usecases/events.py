@@ -1,37 +1,45 @@
 from dataclasses import dataclass
-from asyncio import Queue
-import json
-import typing
 
+from resentry.core.rules import item_message
 from resentry.domain.project import ProjectDTO
-from resentry.domain.user import UserDTO
-from resentry.domain.queue import Event, LogLevel
+from resentry.domain.queue import LogLevel
 from resentry.database.models.envelope import Envelope
+from resentry.database.models.queue import QueuedEvent
+from resentry.repos.queue import QueuedEventRepository
+from resentry.sentry import EnvelopeItem
+
+# Only error events are sent to the notification queue
+ALERT_ITEM_TYPES = frozenset({"event"})
+# Alerts show the first line or so of the message
+MESSAGE_LENGTH = 500
 
 
 @dataclass
 class ScheduleEnvelope:
-    queue: Queue
+    repo: QueuedEventRepository
     project: ProjectDTO
-    users: list[UserDTO]
-
-    def _get_level(self, payload: dict[str, typing.Any]) -> LogLevel:
-        if level := payload.get("level", None):
-            return LogLevel(level)
-        raise ValueError("Cant get log level")
-
-    def _get_payload(self, payload: bytes) -> dict[str, typing.Any]:
-        return json.loads(payload.decode("utf-8", "replace"))
+    levels: frozenset[str] | None = None
 
-    async def execute(self, envelope: Envelope):
-        for envelope_item in await envelope.async_items():
-            payload = self._get_payload(envelope_item.payload)
-            event = Event(
-                event_id=envelope_item.event_id,
-                project=self.project,
-                level=self._get_level(payload),
-                payload=payload,
-                users=self.users,
-                sent_at=envelope.sent_at,
+    async def execute(self, envelope: Envelope, items: list[EnvelopeItem]):
+        """Queue alerts for the parsed items stored with `envelope`."""
+        for item in items:
+            if item.type not in ALERT_ITEM_TYPES:
+                continue
+            if not isinstance(payload := item.payload_json, dict):
+                continue
+            # sentry treats events without an explicit level as errors, so do
+            # levels only some SDKs send (the JS SDK's "log")
+            level = LogLevel.parse(payload.get("level")) or LogLevel.error
+            if self.levels is not None and level not in self.levels:
+                continue
+            await self.repo.create(
+                QueuedEvent(
+                    project_id=self.project.id,
+                    envelope_id=envelope.id,
+                    level=level,
+                    message=item_message(payload)[:MESSAGE_LENGTH] or None,
+                    server_name=payload.get("server_name"),
+                    environment=payload.get("environment"),
+                    sent_at=envelope.sent_at,
+                )
             )
-            await self.queue.put(event)
@@ -0,0 +1,321 @@
+"""Bulk import of archived envelopes, used by `python -m resentry.cli import`.
+
+Files are parsed in worker processes into plain rows, the parent process
+writes them in large transactions with multi-row INSERTs. Two formats are
+read: raw envelope files (one envelope per file, optionally gzip or
+brotli compressed) and NDJSON as written by the events export.
+"""
+
+import datetime
+import time
+import typing
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from resentry.core.responsecache import events_cache_tag
+from resentry.database.models.envelope import Envelope
+from resentry.database.models.transaction import Transaction
+from resentry.repos.envelope import EnvelopeItemRepository, EnvelopeRepository
+from resentry.repos.lease import CacheVersionRepository
+from resentry.repos.transaction import TransactionRepository
+from resentry.sentry import unpack_sentry_envelope
+from resentry.usecases.envelope import (
+    COUNTER_ITEM_TYPES,
+    PERFORMANCE_ITEM_TYPES,
+    build_transaction,
+    item_attributes,
+)
+from resentry.utils import jsoncodec
+from resentry.utils.jsoncodec import JSONDecodeError
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+@dataclass
+class ParsedEnvelope:
+    """An envelope reduced to the rows that will be inserted."""
+
+    body: bytes
+    event_id: str | None = None
+    sent_at: datetime.datetime | None = None
+    dsn: str | None = None
+    # envelope item rows without the envelope id
+    items: list[dict[str, typing.Any]] = field(default_factory=list)
+    transactions: list[dict[str, typing.Any]] = field(default_factory=list)
+    skipped_items: int = 0
+    # envelope id of an export line, lines of one envelope are merged
+    source_id: int | None = None
+
+    def merge(self, other: "ParsedEnvelope") -> None:
+        """Append the items of `other`, a later line of the same envelope."""
+        _, items = other.body.split(b"\n", 1)
+        self.body += items
+        self.items.extend(other.items)
+
+
+def _aware(value: datetime.datetime | None) -> datetime.datetime | None:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.UTC)
+    return value
+
+
+def _sent_at(value: typing.Any) -> datetime.datetime | None:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return _aware(datetime.datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+
+def parse_envelope_bytes(project_id: int, data: bytes) -> ParsedEnvelope | None:
+    try:
+        envelope = unpack_sentry_envelope(data)
+    except (ValueError, OSError):
+        return None
+    parsed = ParsedEnvelope(
+        body=data,
+        event_id=envelope.event_id or None,
+        sent_at=_sent_at(envelope.headers.get("sent_at")),
+        dsn=envelope.headers.get("dsn"),
+    )
+    for item in envelope.items:
+        if item.type in PERFORMANCE_ITEM_TYPES:
+            transaction = build_transaction(project_id, item).model_dump(exclude={"id"})
+            transaction["start_timestamp"] = _aware(transaction["start_timestamp"])
+            parsed.transactions.append(transaction)
+        elif item.type in COUNTER_ITEM_TYPES:
+            # hourly counters of the original ingest time cannot be rebuilt
+            parsed.skipped_items += 1
+        else:
+            parsed.items.append(
+                {
+                    "type": item.type,
+                    "payload": item.get_payload_bytes(),
+                    **item_attributes(item.type, item.payload_json),
+                }
+            )
+    return parsed
+
+
+def parse_export_line(line: bytes) -> ParsedEnvelope | None:
+    """One line of the NDJSON events export, turned back into an envelope."""
+    try:
+        row = jsoncodec.loads(line)
+    except (JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(row, dict) or not isinstance(row.get("payload"), dict):
+        return None
+    payload = jsoncodec.dumps(row["payload"])
+    headers = {"event_id": row.get("event_id"), "sent_at": row.get("sent_at")}
+    item_header = {"type": "event", "length": len(payload)}
+    body = b"\n".join(
+        (jsoncodec.dumps(headers), jsoncodec.dumps(item_header), payload, b"")
+    )
+    source_id = row.get("envelope_id")
+    return ParsedEnvelope(
+        body=body,
+        event_id=row.get("event_id"),
+        sent_at=_sent_at(row.get("sent_at")),
+        source_id=source_id if isinstance(source_id, int) else None,
+        items=[
+            {
+                "type": "event",
+                "payload": payload,
+                **item_attributes("event", row["payload"]),
+            }
+        ],
+    )
+
+
+def parse_chunk(
+    project_id: int, kind: str, chunk: list[bytes]
+) -> list[ParsedEnvelope | None]:
+    """Runs in a worker process: `chunk` holds raw envelopes or NDJSON lines."""
+    if kind == "ndjson":
+        return [parse_export_line(line) for line in chunk if line.strip()]
+    return [parse_envelope_bytes(project_id, data) for data in chunk]
+
+
+def iter_chunks(
+    paths: list[Path], chunk_size: int
+) -> typing.Iterator[tuple[str, list[bytes]]]:
+    """Split the input into (kind, chunk) work units, files are read lazily."""
+    files: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.is_file()))
+        else:
+            files.append(path)
+
+    envelopes: list[bytes] = []
+    for path in files:
+        if path.suffix in NDJSON_SUFFIXES:
+            lines: list[bytes] = []
+            with path.open("rb") as f:
+                for line in f:
+                    lines.append(line)
+                    if len(lines) >= chunk_size:
+                        yield "ndjson", lines
+                        lines = []
+            if lines:
+                yield "ndjson", lines
+        else:
+            envelopes.append(path.read_bytes())
+            if len(envelopes) >= chunk_size:
+                yield "envelope", envelopes
+                envelopes = []
+    if envelopes:
+        yield "envelope", envelopes
+
+
+@dataclass
+class ImportStats:
+    envelopes: int = 0
+    items: int = 0
+    transactions: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    skipped_items: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.envelopes / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.envelopes} envelopes, {self.items} items, "
+            f"{self.transactions} transactions ({self.rate:.0f} envelopes/s); "
+            f"{self.duplicates} duplicates, {self.invalid} invalid, "
+            f"{self.skipped_items} session/client report items skipped"
+        )
+
+
+@dataclass
+class ImportEnvelopes:
+    """Writes parsed envelopes of one project with multi-row INSERTs.
+
+    Envelopes whose event_id is already stored, or repeated in the batch,
+    are skipped like duplicate ingests are. Export lines of one envelope
+    are merged back into it; as they may span batches the last one is held
+    until the next `execute` or `flush`.
+    """
+
+    session: AsyncSession
+    project_id: int
+    stats: ImportStats = field(default_factory=ImportStats)
+    held: ParsedEnvelope | None = None
+
+    def _merge_lines(
+        self, batch: list[ParsedEnvelope | None]
+    ) -> list[ParsedEnvelope | None]:
+        merged: list[ParsedEnvelope | None] = []
+        last = self.held
+        self.held = None
+        if last is not None:
+            merged.append(last)
+        for parsed in batch:
+            if (
+                parsed is not None
+                and last is not None
+                and parsed.source_id is not None
+                and parsed.source_id == last.source_id
+            ):
+                last.merge(parsed)
+                continue
+            merged.append(parsed)
+            if parsed is not None:
+                last = parsed
+        if merged and merged[-1] is not None and merged[-1].source_id is not None:
+            self.held = merged.pop()
+        return merged
+
+    async def flush(self) -> None:
+        """Write the envelope held back from the last batch."""
+        if self.held is not None:
+            held, self.held = self.held, None
+            await self._write([held])
+
+    async def _existing_ids(self, event_ids: list[str]) -> set[str]:
+        """Event ids already stored as envelopes or transactions."""
+        if not event_ids:
+            return set()
+        existing: set[str] = set()
+        for model in (Envelope, Transaction):
+            result = await self.session.exec(
+                select(model.event_id).where(
+                    col(model.project_id) == self.project_id,
+                    col(model.event_id).in_(event_ids),
+                )
+            )
+            existing.update(event_id for event_id in result.all() if event_id)
+        return existing
+
+    async def execute(self, batch: list[ParsedEnvelope | None]) -> None:
+        await self._write(self._merge_lines(batch))
+
+    async def _write(self, batch: list[ParsedEnvelope | None]) -> None:
+        existing = await self._existing_ids(
+            [p.event_id for p in batch if p is not None and p.event_id]
+            + [
+                t["event_id"]
+                for p in batch
+                if p is not None
+                for t in p.transactions
+                if t["event_id"]
+            ]
+        )
+        envelopes: list[ParsedEnvelope] = []
+        transactions: list[dict[str, typing.Any]] = []
+        for parsed in batch:
+            if parsed is None:
+                self.stats.invalid += 1
+                continue
+            transaction_ids = {t["event_id"] for t in parsed.transactions} - {None}
+            if (parsed.event_id and parsed.event_id in existing) or (
+                transaction_ids & existing
+            ):
+                self.stats.duplicates += 1
+                continue
+            if parsed.event_id:
+                existing.add(parsed.event_id)
+            existing.update(transaction_ids)
+            self.stats.skipped_items += parsed.skipped_items
+            transactions.extend(parsed.transactions)
+            # like ingest, envelopes left without items are not stored
+            if parsed.items:
+                envelopes.append(parsed)
+
+        envelope_ids = await EnvelopeRepository(self.session).bulk_insert(
+            [
+                {
+                    "project_id": self.project_id,
+                    "payload": parsed.body,
+                    "event_id": parsed.event_id,
+                    "sent_at": parsed.sent_at,
+                    "dsn": parsed.dsn,
+                }
+                for parsed in envelopes
+            ]
+        )
+        items = [
+            {"event_id": envelope_id, "item_id": str(index), **item}
+            for envelope_id, parsed in zip(envelope_ids, envelopes)
+            for index, item in enumerate(parsed.items)
+        ]
+        await EnvelopeItemRepository(self.session).bulk_insert(items)
+        await TransactionRepository(self.session).bulk_insert(transactions)
+        if envelope_ids:
+            await CacheVersionRepository(self.session).bump(
+                events_cache_tag(self.project_id)
+            )
+        await self.session.commit()
+
+        self.stats.envelopes += len(envelopes)
+        self.stats.items += len(items)
+        self.stats.transactions += len(transactions)
@@ -12,10 +12,10 @@ class CreateUser:
     repo: UserRepository
     hasher: Hasher
 
-    def _get_password_hash(self, password: str):
-        return self.hasher.generate_hash(password)
+    async def _get_password_hash(self, password: str):
+        return await self.hasher.hash(password)
 
     async def execute(self, body: UserCreate) -> User:
         user_db = User(**body.model_dump())
-        user_db.password = self._get_password_hash(user_db.password)
+        user_db.password = await self._get_password_hash(user_db.password)
         return typing.cast("User", await self.repo.create(user_db))
@@ -1,29 +1,29 @@
 """General helper functions for resentry."""
 
-import json
-from datetime import datetime
+import gzip
+from datetime import UTC, datetime
 from typing import Any
 
-import gzip
 import brotli
 
+from resentry.utils import jsoncodec
+
 
-def json_loads(data: str) -> Any:
+def json_loads(data: bytes | str) -> Any:
     """Synchronous JSON parsing function."""
-    return json.loads(data)
+    return jsoncodec.loads(data)
 
 
 def parse_json(
     data: bytes | str,
 ) -> Any:  # Using Any since JSON parsing results can be different types
     """
-    Safely parse JSON from bytes, handling UTF-8 encoding synchronously.
+    Parse JSON from bytes or str with the configured codec.
+
+    Bytes are handed to the codec as is, orjson parses them without an
+    intermediate str.
     """
-    if isinstance(data, bytes):
-        data_str = decode_utf8(data)
-        return json_loads(data_str)
-    else:
-        return json_loads(data)
+    return jsoncodec.loads(data)
 
 
 def gzip_decompress(data: bytes) -> bytes:
@@ -43,6 +43,31 @@ def decode_utf8(data: bytes) -> str:
     return data.decode("utf-8", "replace")
 
 
+def parse_timestamp(value: Any) -> datetime | None:
+    """
+    Parse a Sentry timestamp, either seconds since the epoch or an RFC 3339 string.
+
+    Always returns an aware datetime, strings without an offset are UTC.
+    Returns None for missing, malformed or out of range values.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value, tz=UTC)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=UTC)
+        return parsed
+    return None
+
+
 def format_timestamp(dt: datetime | None = None) -> str:
     """
     Format a datetime object as an ISO string.
@@ -0,0 +1,110 @@
+"""JSON codec shared by envelope parsing, alert scheduling and API responses.
+
+orjson is used when it is installed (`pip install resentry[speedups]`), it
+parses straight from bytes and serializes to bytes. Without it the stdlib
+json module is used with the same interface and the same behaviour: invalid
+UTF-8 is replaced rather than rejected, NaN, Infinity and out of range
+floats are rejected, integers beyond 64 bits are parsed as floats.
+"""
+
+import json
+import math
+from typing import Any, Protocol
+
+# orjson.JSONDecodeError subclasses it, so callers catch this one only
+JSONDecodeError = json.JSONDecodeError
+
+
+class JSONCodec(Protocol):
+    name: str
+
+    def loads(self, data: bytes | str) -> Any: ...
+
+    def dumps(self, obj: Any) -> bytes: ...
+
+
+def _reject_constant(name: str) -> Any:
+    raise JSONDecodeError(f"invalid constant {name}", name, 0)
+
+
+def _parse_float(text: str) -> float:
+    if math.isinf(value := float(text)):
+        raise JSONDecodeError("number out of range", text, 0)
+    return value
+
+
+def _parse_int(text: str) -> int | float:
+    value = int(text)
+    # orjson's range, larger numbers become floats
+    if -(2**63) <= value < 2**64:
+        return value
+    return float(value)
+
+
+class StdlibCodec:
+    name = "json"
+
+    def loads(self, data: bytes | str) -> Any:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8", "replace")
+        return json.loads(
+            data,
+            parse_constant=_reject_constant,
+            parse_float=_parse_float,
+            parse_int=_parse_int,
+        )
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data: bytes | str) -> Any:
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            if not isinstance(data, bytes):
+                raise
+            try:
+                data.decode("utf-8")
+            except UnicodeDecodeError:
+                # as the stdlib codec, invalid UTF-8 is replaced
+                return self._orjson.loads(data.decode("utf-8", "replace"))
+            raise
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, option=self._options)
+
+
+def default_codec() -> JSONCodec:
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return StdlibCodec()
+
+
+codec: JSONCodec = default_codec()
+
+
+def set_codec(new_codec: JSONCodec) -> None:
+    """Replace the process wide codec, e.g. to force the stdlib one."""
+    global codec
+    codec = new_codec
+
+
+def loads(data: bytes | str) -> Any:
+    return codec.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    return codec.dumps(obj)
@@ -8,7 +8,7 @@ import asyncio
 
 from resentry.main import create_app
 from resentry.config import settings
-from resentry.database.database import get_sync_db, get_async_db
+from resentry.database.database import get_sync_db
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import SQLModel
@@ -47,11 +47,6 @@ def client():
         autocommit=False, autoflush=False, bind=sync_engine, class_=Session
     )
 
-    # Create async session maker for async operations
-    async def override_get_async_db():
-        async with AsyncSession(async_engine) as session:
-            yield session
-
     # Dependency override to use the test database
     def override_get_sync_db():
         db = TestingSessionLocal()
@@ -63,12 +58,8 @@ def client():
     # Create app instance
     app = create_app(lifespan=None)
 
-    # Initialize queue for the test app
-    app.state.queue = asyncio.Queue()
-
     # Apply the overrides
     app.dependency_overrides[get_sync_db] = override_get_sync_db
-    app.dependency_overrides[get_async_db] = override_get_async_db
 
     # Override the async session creator to use in-memory engine
     with (
@@ -0,0 +1,96 @@
+import httpx
+from fastapi.testclient import TestClient
+
+from client.api_client import ResentryAPIClient, load_checkpoints, save_tokens
+from client.async_api_client import AsyncResentryAPIClient
+from client.config import Config
+from client.models import TokenSchema
+
+
+def test_async_client_fan_out_single_refresh(
+    client: TestClient, create_test_user, create_test_token, tmp_path
+):
+    token = create_test_token()
+    project_ids = [
+        client.post(
+            "/api/v1/projects/",
+            json={"name": f"Project {i}", "lang": "python"},
+            headers={"Authorization": f"Bearer {token}"},
+        ).json()["id"]
+        for i in range(5)
+    ]
+    config = Config(
+        api_url="http://testserver",
+        login="Test User",
+        password="secret_password",
+        tokens=str(tmp_path / "tokens.json"),
+    )
+    api = AsyncResentryAPIClient(
+        config, max_concurrency=3, transport=httpx.ASGITransport(app=client.app)
+    )
+    refreshes = []
+    refresh = api.refresh_token_call
+
+    async def counting_refresh(refresh_token):
+        refreshes.append(refresh_token)
+        return await refresh(refresh_token)
+
+    api.refresh_token_call = counting_refresh
+
+    async def sweep():
+        async with api:
+            # every concurrent request gets a 401 with the expired token
+            api._client.update_header("Authorization", "Bearer expired")
+            projects = await api.get_many_projects(project_ids)
+            events = await api.get_projects_events()
+            pages = [
+                e async for e in api.iter_project_events(project_ids[0], page_size=1)
+            ]
+        return projects, events, pages
+
+    projects, events, pages = client.portal.call(sweep)  # pyright: ignore[reportOptionalMemberAccess]
+
+    assert list(projects) == project_ids
+    assert projects[project_ids[2]].name == "Project 2"
+    assert set(events) == set(project_ids)
+    assert pages == []
+    assert len(refreshes) == 1
+    assert (tmp_path / "tokens.json").exists()
+
+
+def test_client_sync_project_events(
+    client: TestClient, create_test_project, create_test_token, tmp_path
+):
+    project = create_test_project.json()
+    headers = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+
+    def store(count: int, start: int = 0):
+        for i in range(start, start + count):
+            body = b'{"event_id": "ev%d"}\n{"type": "event"}\n{"message": "m"}\n' % i
+            response = client.post(
+                f"/api/{project['id']}/envelope/", content=body, headers=headers
+            )
+            assert response.status_code == 200
+
+    tokens = tmp_path / "tokens.json"
+    save_tokens(
+        str(tokens),
+        TokenSchema(access_token=create_test_token(), refresh_token="unused"),
+    )
+    config = Config(tokens=str(tokens), checkpoints=str(tmp_path / "sync.json"))
+    api = ResentryAPIClient(config)
+    api._client._client = client
+    api._add_auth_header()
+
+    store(5)
+    assert [
+        e.event_id for e in api.iter_project_events(project["id"], page_size=2)
+    ] == [f"ev{i}" for i in range(5)]
+    synced = list(api.sync_project_events(project["id"], page_size=2))
+    assert len(synced) == 5
+
+    store(2, start=5)
+    synced = list(api.sync_project_events(project["id"], page_size=2))
+    assert [e.event_id for e in synced] == ["ev5", "ev6"]
+    assert list(api.sync_project_events(project["id"], page_size=2)) == []
+    assert load_checkpoints(config.checkpoints) == {str(project["id"]): synced[-1].id}
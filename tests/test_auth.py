@@ -1,5 +1,8 @@
+import bcrypt
 from fastapi.testclient import TestClient
 
+from resentry.core.hashing import Hasher
+from resentry.core.tokens import ClaimsCache
 from resentry.database.schemas.auth import (
     TokenSchema,
 )
@@ -42,3 +45,43 @@ def test_create_user(client: TestClient, create_test_user):
         headers={"Authorization": f"Bearer {new_tokens.access_token}"},
     )
     assert response.status_code == 200
+
+
+def test_login_throttled_after_failures(client: TestClient, create_test_user):
+    client.app.state.login_throttle.max_failures = 2  # pyright: ignore[reportAttributeAccessIssue]
+    wrong = {"login": "Test User", "password": "wrong"}
+
+    for _ in range(2):
+        response = client.post("/api/v1/auth/login", json=wrong)
+        assert response.status_code == 401
+
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"login": "Test User", "password": "secret_password"},
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_verify_legacy_shared_salt_hash():
+    legacy_salt = b"$2b$04$gj7lkAtmwGLm8W8Wg50h6."
+    legacy = bcrypt.hashpw(b"secret", legacy_salt).decode()
+    hasher = Hasher(rounds=4)
+
+    assert hasher.verify_password("secret", legacy)
+    assert not hasher.verify_password("other", legacy)
+    assert hasher.generate_hash("secret") != hasher.generate_hash("secret")
+
+
+def test_claims_cache_respects_exp():
+    cache = ClaimsCache(maxsize=2)
+    cache.set("a", {"sub": "1", "exp": 100})
+    cache.set("b", {"sub": "2", "exp": 200})
+
+    assert cache.get("a", now=50) == {"sub": "1", "exp": 100}
+    assert cache.get("a", now=150) is None
+
+    cache.set("c", {"sub": "3", "exp": 300})
+    cache.set("d", {"sub": "4", "exp": 300})
+    assert cache.get("b", now=0) is None
+    assert cache.get("d", now=0) is not None
@@ -0,0 +1,45 @@
+import json
+
+from benchmarks.stats import Result, compare, percentile, write_results
+
+
+def test_result_from_timings():
+    result = Result.from_timings("parse", [0.004, 0.001, 0.002, 0.003], total=2.0)
+    assert (result.count, result.ops_per_s) == (4, 2.0)
+    assert (result.p50_us, result.max_us) == (3000.0, 4000.0)
+    assert percentile([], 0.5) == 0.0
+    assert Result.from_timings("empty", []).ops_per_s == 0.0
+
+
+def _results(path, **ops_per_s):
+    results = [
+        Result.from_timings(name, [1.0] * int(rate), total=1.0)
+        for name, rate in ops_per_s.items()
+    ]
+    write_results(path, "micro", results, count=10)
+    return path
+
+
+def test_compare_flags_throughput_regressions(tmp_path, capsys):
+    old = _results(tmp_path / "old.json", parse=100, decode=100, store=100)
+    saved = json.loads(old.read_text())
+    assert saved["suite"] == "micro" and saved["params"] == {"count": 10}
+
+    # a 4% drop is within the default 5% threshold, a new benchmark never fails
+    new = _results(tmp_path / "new.json", parse=96, decode=150, gzip=10)
+    assert compare(old, new) is True
+    out = capsys.readouterr().out
+    assert "(-4.0%)" in out and "(+50.0%)" in out
+    assert "gzip" in out and "new" in out
+    assert "REGRESSION" not in out
+
+    assert compare(old, new, threshold=0.01) is False
+    assert "parse" in (line := capsys.readouterr().out.splitlines()[0])
+    assert line.endswith("REGRESSION")
+
+
+def test_compare_treats_zero_baselines_as_new(tmp_path, capsys):
+    old = _results(tmp_path / "old.json", parse=0)
+    new = _results(tmp_path / "new.json", parse=0)
+    assert compare(old, new) is True
+    assert capsys.readouterr().out.split() == ["parse", "new"]
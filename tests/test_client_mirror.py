@@ -0,0 +1,63 @@
+from click.testing import CliRunner
+from fastapi.testclient import TestClient
+
+from client.api_client import ResentryAPIClient, save_tokens
+from client.cli import cli
+from client.config import Config
+from client.mirror import EventMirror
+from client.models import TokenSchema
+
+
+def test_event_mirror_refresh_and_query(
+    client: TestClient, create_test_project, create_test_token, tmp_path
+):
+    project = create_test_project.json()
+    headers = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+
+    def store(start: int, count: int):
+        for i in range(start, start + count):
+            body = (
+                b'{"event_id": "ev%d"}\n{"type": "event"}\n{"message": "boom %d"}\n'
+                % (i, i)
+            )
+            response = client.post(
+                f"/api/{project['id']}/envelope/", content=body, headers=headers
+            )
+            assert response.status_code == 200
+
+    tokens = tmp_path / "tokens.json"
+    save_tokens(
+        str(tokens),
+        TokenSchema(access_token=create_test_token(), refresh_token="unused"),
+    )
+    api = ResentryAPIClient(Config(tokens=str(tokens)))
+    api._client._client = client
+    api._add_auth_header()
+    path = str(tmp_path / "mirror.db")
+    mirror = EventMirror(path, batch_size=2)
+
+    store(0, 3)
+    assert mirror.refresh(api) == 3
+    store(3, 2)
+    assert mirror.refresh(api) == 2
+    assert mirror.refresh(api) == 0
+
+    assert [p.name for p in mirror.projects()] == ["Test Project"]
+    events = mirror.events(project["id"])
+    assert [e.event_id for e in events] == [f"ev{i}" for i in range(5)]
+    assert "boom 0" in events[0].items[0].payload  # pyright: ignore[reportOptionalSubscript]
+    assert [e.event_id for e in mirror.events(project["id"], limit=2)] == ["ev3", "ev4"]
+    assert [e.event_id for e in mirror.events(project["id"], event_id="ev2")] == ["ev2"]
+    assert [e.event_id for e in mirror.events(project["id"], search="boom 4")] == [
+        "ev4"
+    ]
+    mirror.close()
+
+    # answered from the mirror, no API client (and no login) needed
+    result = CliRunner().invoke(
+        cli,
+        ["--mirror", path, "events", "list", str(project["id"]), "--search", "boom 1"],
+    )
+    assert result.exit_code == 0
+    assert "Event ID: ev1" in result.output
+    assert "Event ID: ev2" not in result.output
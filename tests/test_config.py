@@ -0,0 +1,20 @@
+import pytest
+
+from resentry.config import ProdSettings
+
+
+@pytest.mark.parametrize("prefix", ["", "RESENTRY_"])
+def test_prod_settings_read_plain_and_prefixed_names(monkeypatch, prefix: str):
+    for name in ("DATABASE_URL", "SECRET_KEY", "TELEGRAM_TOKEN"):
+        monkeypatch.delenv(f"RESENTRY_{name}", raising=False)
+    monkeypatch.setenv(f"{prefix}DATABASE_URL", "sqlite+aiosqlite:///prod.db")
+    monkeypatch.setenv(f"{prefix}SECRET_KEY", "prod-secret")
+    monkeypatch.setenv(f"{prefix}TELEGRAM_TOKEN", "prod-token")
+    monkeypatch.setenv("RESENTRY_WORKERS", "4")
+
+    settings = ProdSettings(_env_file=None)  # pyright: ignore[reportCallIssue]
+    assert settings.DATABASE_URL == "sqlite+aiosqlite:///prod.db"
+    assert settings.SECRET_KEY == "prod-secret"
+    assert settings.TELEGRAM_TOKEN == "prod-token"
+    assert settings.SALT is None
+    assert settings.WORKERS == 4
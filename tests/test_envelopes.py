@@ -1,4 +1,28 @@
+import asyncio
+import json
+import time
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
 from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from resentry.core.dispatcher import Dispatcher, LeaderLease
+from resentry.core.events import EventWorker, Sender
+from resentry.core.outcomes import Outcomes
+from resentry.core.streams import EventHub, StreamEvent
+from resentry.database import database
+from resentry.database.models.envelope import Envelope
+from resentry.database.models.queue import QueuedEvent
+from resentry.domain.envelope import EventFilter
+from resentry.domain.queue import Event, LogLevel
+from resentry.main import create_app
+from resentry.repos.queue import QueuedEventRepository
+from resentry.sentry import EnvelopeItem as SentryEnvelopeItem
+from resentry.sentry import unpack_sentry_envelope
+from resentry.usecases.envelope import build_transaction, load_stream_events
+from resentry.usecases.imports import ImportEnvelopes, parse_chunk
 
 
 def test_store_envelope(client: TestClient, create_test_token):
@@ -54,3 +78,1008 @@ def test_get_project_events(client: TestClient, create_test_token):
     assert response.status_code == 200
     # This endpoint returns the list of envelopes
     assert isinstance(response.json(), list)
+
+
+def test_get_project_events_conditional(
+    client: TestClient, create_test_project, create_test_token
+):
+    project = create_test_project.json()
+    url = f"/api/projects/{project['id']}/events"
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+    ingest = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+    cache = client.app.state.response_cache  # pyright: ignore[reportAttributeAccessIssue]
+
+    def store(event_id: str):
+        body = b'{"event_id": "%s"}\n{"type": "event"}\n{}\n' % event_id.encode()
+        response = client.post(
+            f"/api/{project['id']}/envelope/", content=body, headers=ingest
+        )
+        assert response.status_code == 200
+
+    store("a")
+    first = client.get(url, headers=auth)
+    etag = first.headers["ETag"]
+    assert [e["event_id"] for e in first.json()] == ["a"]
+
+    response = client.get(url, headers=auth | {"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    again = client.get(url, headers=auth)
+    assert again.content == first.content
+    assert cache.hits == 1
+
+    # ingest moves the ETag and drops the cached page
+    store("b")
+    assert not cache.entries
+    response = client.get(url, headers=auth | {"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [e["event_id"] for e in response.json()] == ["a", "b"]
+
+    # every page and filter has its own tag, parameter order does not matter
+    etag = response.headers["ETag"]
+    for params in ({"limit": 1}, {"level": "warning"}, {"limit": 1, "after": 1}):
+        response = client.get(
+            url, params=params, headers=auth | {"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+    etag = client.get(f"{url}?limit=1&after=1", headers=auth).headers["ETag"]
+    response = client.get(
+        f"{url}?after=1&limit=1", headers=auth | {"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    # the list of all projects moves with any project's ingest
+    etag = client.get("/api/v1/projects/events", headers=auth).headers["ETag"]
+    store("c")
+    response = client.get(
+        "/api/v1/projects/events", headers=auth | {"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    projects = client.get("/api/v1/projects/", headers=auth)
+    response = client.get(
+        "/api/v1/projects/", headers=auth | {"If-None-Match": projects.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    client.post("/api/v1/projects/", json={"name": "Other", "lang": "go"}, headers=auth)
+    response = client.get(
+        "/api/v1/projects/", headers=auth | {"If-None-Match": projects.headers["ETag"]}
+    )
+    assert [p["name"] for p in response.json()] == ["Test Project", "Other"]
+
+
+def test_get_project_events_filtered(
+    client: TestClient, create_test_project, create_test_token
+):
+    project = create_test_project.json()
+    headers = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+    events = [
+        ("e1", "2024-01-03T00:00:00Z", {"level": "warning", "environment": "prod"}),
+        ("e2", "2024-01-01T00:00:00Z", {"environment": "prod", "release": "1.0"}),
+        ("e3", "2024-01-02T00:00:00Z", {"level": "info", "environment": "dev"}),
+        ("e4", "2024-01-04T00:00:00Z", {"environment": "prod", "release": "2.0"}),
+    ]
+    for event_id, sent_at, payload in events:
+        body = b"\n".join(
+            [
+                json.dumps({"event_id": event_id, "sent_at": sent_at}).encode(),
+                b'{"type": "event"}',
+                json.dumps(payload).encode(),
+            ]
+        )
+        response = client.post(
+            f"/api/{project['id']}/envelope/", content=body, headers=headers
+        )
+        assert response.status_code == 200
+
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+
+    def event_ids(path: str = f"/api/projects/{project['id']}/events", **params):
+        response = client.get(path, params=params, headers=auth)
+        assert response.status_code == 200
+        return [e["event_id"] for e in response.json()], response.headers.get(
+            "X-Next-Cursor"
+        )
+
+    assert event_ids(level="error") == (["e2", "e4"], None)
+    assert event_ids(environment="prod", level=["warning", "info"]) == (["e1"], None)
+    assert event_ids(release="2.0") == (["e4"], None)
+    assert event_ids(type="attachment") == ([], None)
+    assert event_ids(since="2024-01-02T00:00:00", until="2024-01-04T00:00:00") == (
+        ["e1", "e3"],
+        None,
+    )
+
+    # keyset pagination in every sort order
+    for sort, expected in (
+        ("id", ["e1", "e2", "e3", "e4"]),
+        ("-id", ["e4", "e3", "e2", "e1"]),
+        ("sent_at", ["e2", "e3", "e1", "e4"]),
+        ("-sent_at", ["e4", "e1", "e3", "e2"]),
+    ):
+        seen, cursor = event_ids(sort=sort, limit=3)
+        assert cursor is not None
+        rest, cursor = event_ids(sort=sort, limit=3, cursor=cursor)
+        assert (seen + rest, cursor) == (expected, None)
+
+    assert event_ids("/api/v1/projects/events", project_id=project["id"], limit=2)[
+        0
+    ] == ["e1", "e2"]
+    response = client.get(
+        f"/api/projects/{project['id']}/events",
+        params={"sort": "sent_at", "cursor": "bogus"},
+        headers=auth,
+    )
+    assert response.status_code == 400
+    response = client.get(
+        f"/api/projects/{project['id']}/events", params={"limit": 5000}, headers=auth
+    )
+    assert response.status_code == 422
+
+
+def test_stream_project_events(
+    client: TestClient, create_test_project, create_test_token
+):
+    project = create_test_project.json()
+    hub = client.app.state.event_hub  # pyright: ignore[reportAttributeAccessIssue]
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    ingest = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+
+    def store(event_id: str, level: str):
+        item = json.dumps({"level": level}).encode()
+        body = b'{"event_id": "%s"}\n{"type": "event"}\n%s\n' % (
+            event_id.encode(),
+            item,
+        )
+        response = client.post(
+            f"/api/{project['id']}/envelope/", content=body, headers=ingest
+        )
+        return response.json()["envelope_id"]
+
+    def wait_for(condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    replayed = store("a", "error")
+    store("b", "warning")
+
+    async def stream():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.get(
+                f"/api/projects/{project['id']}/events/stream",
+                params={"level": "error"},
+                headers={
+                    "Authorization": f"Bearer {create_test_token()}",
+                    "Last-Event-ID": "0",
+                },
+            )
+
+    future = client.portal.start_task_soon(stream)  # pyright: ignore[reportOptionalMemberAccess]
+    wait_for(lambda: hub.has_subscribers(project["id"]))
+    live = store("c", "error")
+    store("d", "warning")
+    (subscription,) = hub.subscribers[project["id"]]
+    wait_for(subscription.queue.empty)
+
+    # a subscriber that falls a full buffer behind is dropped
+    def flood():
+        for i in range(hub.buffer_size + 1):
+            hub.publish(
+                StreamEvent(
+                    project_id=project["id"],
+                    envelope_id=10_000 + i,
+                    data=b"{}",
+                    items=({"level": "error"},),
+                )
+            )
+
+    call(flood)
+    response = future.result(timeout=5)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    ids = [
+        int(line.removeprefix("id: "))
+        for block in events
+        for line in block.splitlines()
+        if line.startswith("id: ")
+    ]
+    assert ids == [replayed, live]
+    assert events[-1].startswith("event: evicted")
+    assert not hub.has_subscribers(project["id"])
+    assert hub.evicted == 1
+
+
+def test_event_hub_polls_other_workers(client: TestClient, create_test_project):
+    project = create_test_project.json()
+    hub = EventHub()
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    ingest = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+
+    def store(event_id: str):
+        body = b'{"event_id": "%s"}\n{"type": "event"}\n{}\n' % event_id.encode()
+        response = client.post(
+            f"/api/{project['id']}/envelope/", content=body, headers=ingest
+        )
+        return response.json()["envelope_id"]
+
+    async def poll():
+        async with database.create_async_session() as session:
+            await hub.poll(session, load_stream_events)
+
+    store("a")
+    subscription = call(hub.subscribe, project["id"], EventFilter())
+    call(poll)  # starts at the current envelope, "a" is not replayed
+    envelope_id = store("b")
+    call(poll)
+    call(poll)
+    assert subscription.queue.qsize() == 1
+    assert subscription.queue.get_nowait().envelope_id == envelope_id
+
+    # another worker commits a lower id after a higher one was already seen
+    async def insert(id: int):
+        async with database.create_async_session() as session:
+            session.add(
+                Envelope(
+                    id=id, project_id=project["id"], payload=b"{}", event_id=str(id)
+                )
+            )
+            await session.commit()
+
+    call(insert, envelope_id + 20)
+    call(poll)
+    call(insert, envelope_id + 10)
+    call(poll)
+    call(poll)
+    assert [
+        subscription.queue.get_nowait().envelope_id
+        for _ in range(subscription.queue.qsize())
+    ] == [envelope_id + 20, envelope_id + 10]
+
+
+def test_store_envelope_rate_limited(client: TestClient, create_test_token):
+    token = create_test_token()
+    project_response = client.post(
+        "/api/v1/projects/",
+        json={"name": "Noisy Project", "lang": "python", "rate_limit_events": 1},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    project_data = project_response.json()
+    project_id = project_data["id"]
+    assert project_data["rate_limit_events"] == 1
+
+    headers = {
+        "x-sentry-auth": f"Sentry sentry_key={project_data['key']}, sentry_version=7"
+    }
+    # burst capacity allows two envelopes, the third one is over the limit
+    statuses = [
+        client.post(
+            f"/api/{project_id}/envelope/",
+            content=b'{"event_id": "%d"}\n{"type": "event"}\n{"message": "test event"}'
+            % i,
+            headers=headers,
+        )
+        for i in range(3)
+    ]
+    assert [r.status_code for r in statuses] == [200, 200, 429]
+    assert int(statuses[-1].headers["retry-after"]) >= 1
+    assert statuses[-1].headers["x-sentry-rate-limits"].endswith("::project")
+
+    response = client.get(
+        f"/api/v1/projects/{project_id}/outcomes",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["dropped"] == {"ratelimited": {"envelope": 1}}
+
+
+def test_outcomes_sum_all_workers(
+    client: TestClient, create_test_project, create_test_token
+):
+    project = create_test_project.json()
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+    outcomes = client.app.state.outcomes  # pyright: ignore[reportAttributeAccessIssue]
+    other_worker = Outcomes()
+    outcomes.record(project["id"], "ratelimited")
+    other_worker.record(project["id"], "ratelimited", quantity=2)
+    other_worker.record(project["id"], "filtered", "event")
+
+    async def flush(worker: Outcomes):
+        async with database.create_async_session() as session:
+            await worker.flush(session)
+
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    call(flush, other_worker)
+    assert not other_worker.pending
+    # this worker's counts are not flushed yet and still reported
+    response = client.get(f"/api/v1/projects/{project['id']}/outcomes", headers=auth)
+    expected = {"ratelimited": {"envelope": 3}, "filtered": {"event": 1}}
+    assert response.json()["dropped"] == expected
+    call(flush, outcomes)
+    other_worker.record(project["id"], "ratelimited")
+    call(flush, other_worker)
+    response = client.get(f"/api/v1/projects/{project['id']}/outcomes", headers=auth)
+    expected["ratelimited"]["envelope"] = 4
+    assert response.json()["dropped"] == expected
+
+
+def test_store_envelope_filtered_by_rule(client: TestClient, create_test_token):
+    token = create_test_token()
+    auth = {"Authorization": f"Bearer {token}"}
+    project_data = client.post(
+        "/api/v1/projects/",
+        json={"name": "Test Project", "lang": "python"},
+        headers=auth,
+    ).json()
+    project_id = project_data["id"]
+    response = client.post(
+        f"/api/v1/projects/{project_id}/rules",
+        json={"action": "drop", "level": "info", "message": "^healthcheck"},
+        headers=auth,
+    )
+    assert response.status_code == 200
+
+    headers = {
+        "x-sentry-auth": f"Sentry sentry_key={project_data['key']}, sentry_version=7"
+    }
+    noise = (
+        b'{"event_id": "abc123"}\n{"type": "event"}\n'
+        b'{"level": "info", "message": "healthcheck ok"}\n'
+    )
+    response = client.post(
+        f"/api/{project_id}/envelope/", content=noise, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["envelope_id"] is None
+
+    error = (
+        b'{"event_id": "abc124"}\n{"type": "event"}\n'
+        b'{"level": "error", "message": "healthcheck failed"}\n'
+    )
+    response = client.post(
+        f"/api/{project_id}/envelope/", content=error, headers=headers
+    )
+    assert response.json()["envelope_id"] is not None
+
+    outcomes = client.get(
+        f"/api/v1/projects/{project_id}/outcomes", headers=auth
+    ).json()
+    assert outcomes["dropped"] == {"filtered": {"event": 1}}
+
+
+def test_levels_are_matched_case_insensitively(client: TestClient, create_test_token):
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+    project = client.post(
+        "/api/v1/projects/",
+        json={"name": "Test Project", "lang": "python"},
+        headers=auth,
+    ).json()
+    response = client.post(
+        f"/api/v1/projects/{project['id']}/rules",
+        json={"action": "drop", "level": "Warning", "environment": "ci"},
+        headers=auth,
+    )
+    assert response.status_code == 200
+
+    url = f"/api/{project['id']}/envelope/"
+    headers = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+    for event_id, level, environment in [
+        ("a1", "WARNING", "ci"),
+        ("a2", "warn", "ci"),
+        ("a3", "WARNING", "prod"),
+        ("a4", "Custom", "prod"),
+    ]:
+        body = (
+            b'{"event_id": "%s"}\n{"type": "event"}\n'
+            b'{"level": "%s", "environment": "%s"}\n'
+            % (
+                event_id.encode(),
+                level.encode(),
+                environment.encode(),
+            )
+        )
+        response = client.post(url, content=body, headers=headers)
+        assert response.status_code == 200
+        assert (response.json()["envelope_id"] is None) == (environment == "ci")
+
+    events_url = f"/api/projects/{project['id']}/events"
+    for level in ("warning", "WARN"):
+        events = client.get(events_url, params={"level": level}, headers=auth).json()
+        assert [event["event_id"] for event in events] == ["a3"]
+    events = client.get(events_url, params={"level": "Custom"}, headers=auth).json()
+    assert [event["event_id"] for event in events] == ["a4"]
+    export = client.get(f"{events_url}/export", headers=auth)
+    assert [json.loads(line)["level"] for line in export.text.splitlines()] == [
+        "warning",
+        "Custom",
+    ]
+
+
+def test_store_envelope_routes_items_by_type(
+    client: TestClient, create_test_token, create_test_user
+):
+    token = create_test_token()
+    auth = {"Authorization": f"Bearer {token}"}
+    project_data = client.post(
+        "/api/v1/projects/",
+        json={"name": "Test Project", "lang": "python"},
+        headers=auth,
+    ).json()
+    project_id = project_data["id"]
+    headers = {
+        "x-sentry-auth": f"Sentry sentry_key={project_data['key']}, sentry_version=7"
+    }
+
+    performance = (
+        b'{"event_id": "tx1"}\n'
+        b'{"type": "transaction"}\n'
+        b'{"event_id": "tx1", "transaction": "/index", "start_timestamp": 1700000000.0,'
+        b' "timestamp": 1700000000.25, "contexts": {"trace": {"op": "http.server"}}}\n'
+        b'{"type": "sessions"}\n'
+        b'{"aggregates": [{"started": "2023-01-01T00:00:00Z",'
+        b' "exited": 3, "crashed": 1}]}\n'
+    )
+    response = client.post(
+        f"/api/{project_id}/envelope/", content=performance, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["envelope_id"] is None
+
+    transactions = client.get(
+        f"/api/projects/{project_id}/transactions", headers=auth
+    ).json()
+    assert len(transactions) == 1
+    assert transactions[0]["name"] == "/index"
+    assert transactions[0]["op"] == "http.server"
+    assert transactions[0]["duration_ms"] == 250.0
+
+    counters = client.get(f"/api/projects/{project_id}/counters", headers=auth).json()
+    assert {c["category"]: c["quantity"] for c in counters} == {
+        "session.exited": 3,
+        "session.crashed": 1,
+    }
+
+    # events without a level are errors and get scheduled for notification
+    error = (
+        b'{"event_id": "ev1"}\n'
+        b'{"type": "event"}\n{"message": "boom"}\n'
+        b'{"type": "client_report"}\n'
+        b'{"discarded_events": [{"reason": "queue_overflow",'
+        b' "category": "error", "quantity": 2}]}\n'
+    )
+    response = client.post(
+        f"/api/{project_id}/envelope/", content=error, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["envelope_id"] is not None
+    queued = client.portal.call(_queued_events)  # pyright: ignore[reportOptionalMemberAccess]
+    assert [event.level for event in queued] == ["error"]
+
+
+def test_store_envelope_unknown_level(client: TestClient, create_test_project):
+    project = create_test_project.json()
+    headers = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+    for event_id, level in (("ev1", "log"), ("ev2", "WARNING"), ("ev3", "Error")):
+        body = b'{"event_id": "%s"}\n{"type": "event"}\n{"level": "%s"}\n' % (
+            event_id.encode(),
+            level.encode(),
+        )
+        response = client.post(
+            f"/api/{project['id']}/envelope/", content=body, headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["envelope_id"] is not None
+
+    # "log" is not a known level and alerts like an error, "WARNING" is not
+    # in NOTIFY_LEVELS
+    queued = client.portal.call(_queued_events)  # pyright: ignore[reportOptionalMemberAccess]
+    assert [event.level for event in queued] == ["error", "error"]
+    assert LogLevel.parse("warn") == LogLevel.warning
+
+
+def test_store_envelope_non_object_payloads(client: TestClient, create_test_token):
+    token = create_test_token()
+    project = client.post(
+        "/api/v1/projects/",
+        json={"name": "Test Project", "lang": "python"},
+        headers={"Authorization": f"Bearer {token}"},
+    ).json()
+    client.post(
+        f"/api/v1/projects/{project['id']}/rules",
+        json={"action": "drop", "environment": "staging"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    headers = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+    bodies = [
+        b'{"event_id": "ev1", "sent_at": "yesterday"}\n{"type": "event"}\n[1, 2]\n',
+        b'{"event_id": "ev2"}\n{"type": "transaction"}\n"boom"\n',
+        b'{}\n{"type": "sessions"}\n{"aggregates": [1, {"exited": 2}]}\n',
+        b'{}\n{"type": "client_report"}\n{"discarded_events": {"a": 1}}\n',
+        (
+            b'{"event_id": "ev3"}\n{"type": "transaction"}\n'
+            b'{"event_id": "ev3", "contexts": {"trace": "x"}}\n'
+        ),
+    ]
+    for body in bodies:
+        response = client.post(
+            f"/api/{project['id']}/envelope/", content=body, headers=headers
+        )
+        assert response.status_code == 200
+
+    events = client.get(
+        f"/api/projects/{project['id']}/events",
+        headers={"Authorization": f"Bearer {token}"},
+    ).json()
+    # the malformed sent_at is dropped, the event is kept
+    assert [(e["event_id"], e["sent_at"]) for e in events] == [("ev1", None)]
+
+
+def test_build_transaction_mixed_timestamps():
+    item = SentryEnvelopeItem(
+        headers={"type": "transaction"},
+        payload=json.dumps(
+            {"start_timestamp": 1704067200, "timestamp": "2024-01-01T00:00:01.5"}
+        ).encode(),
+    )
+    transaction = build_transaction(1, item)
+    assert transaction.duration_ms == 1500.0
+
+    item.payload_json = {"start_timestamp": 1e20, "timestamp": float("nan")}
+    transaction = build_transaction(1, item)
+    assert transaction.start_timestamp is None
+    assert transaction.duration_ms is None
+
+
+async def _queued_events():
+    async with database.create_async_session() as session:
+        result = await session.exec(select(QueuedEvent))
+        return result.all()
+
+
+def test_store_envelope_duplicate_event_id(client: TestClient, create_test_token):
+    token = create_test_token()
+    auth = {"Authorization": f"Bearer {token}"}
+    project_data = client.post(
+        "/api/v1/projects/",
+        json={"name": "Test Project", "lang": "python"},
+        headers=auth,
+    ).json()
+    project_id = project_data["id"]
+    headers = {
+        "x-sentry-auth": f"Sentry sentry_key={project_data['key']}, sentry_version=7"
+    }
+    envelope_payload = (
+        b'{"event_id": "retried"}\n{"type": "event"}\n{"message": "boom"}\n'
+    )
+
+    first = client.post(
+        f"/api/{project_id}/envelope/", content=envelope_payload, headers=headers
+    )
+    assert first.json()["envelope_id"] is not None
+
+    # answered from the in-memory filter and, after a restart, from the unique index
+    client.app.state.recent_ids.ids.clear()  # pyright: ignore[reportAttributeAccessIssue]
+    for _ in range(2):
+        retry = client.post(
+            f"/api/{project_id}/envelope/", content=envelope_payload, headers=headers
+        )
+        assert retry.status_code == 200
+        assert retry.json()["envelope_id"] is None
+
+    events = client.get(f"/api/projects/{project_id}/events", headers=auth).json()
+    assert len(events) == 1
+
+    # transaction-only envelopes store no envelope row
+    transaction = (
+        b'{"event_id": "tx1"}\n{"type": "transaction"}\n'
+        b'{"event_id": "tx1", "transaction": "/index"}\n'
+    )
+    for _ in range(2):
+        client.app.state.recent_ids.ids.clear()  # pyright: ignore[reportAttributeAccessIssue]
+        response = client.post(
+            f"/api/{project_id}/envelope/", content=transaction, headers=headers
+        )
+        assert response.status_code == 200
+    transactions = client.get(
+        f"/api/projects/{project_id}/transactions", headers=auth
+    ).json()
+    assert len(transactions) == 1
+
+    outcomes = client.get(f"/api/v1/projects/{project_id}/outcomes", headers=auth)
+    assert outcomes.json()["dropped"] == {"duplicate": {"envelope": 3}}
+
+
+def test_leader_lease_single_owner(client: TestClient):
+    first = LeaderLease(name="dispatcher", owner="worker-1")
+    second = LeaderLease(name="dispatcher", owner="worker-2")
+
+    async def acquire(lease: LeaderLease) -> bool:
+        async with database.create_async_session() as session:
+            return await lease.acquire(session)
+
+    async def release(lease: LeaderLease) -> None:
+        async with database.create_async_session() as session:
+            await lease.release(session)
+
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    assert call(acquire, first) is True
+    assert call(acquire, second) is False
+    assert call(acquire, first) is True
+    call(release, first)
+    assert call(acquire, second) is True
+
+
+def test_dispatcher_retries_until_sent(client: TestClient, create_test_project):
+    project = create_test_project.json()
+    client.post(
+        f"/api/{project['id']}/envelope/",
+        content=b'{"event_id": "ev1"}\n{"type": "event"}\n{"message": "boom"}\n',
+        headers={
+            "x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"
+        },
+    )
+
+    sent = []
+
+    class FlakySender(Sender):
+        async def action(self, event: Event) -> None:
+            if not sent:
+                sent.append(None)
+                raise RuntimeError("telegram is down")
+            sent.append(event.event_id)
+
+    worker = EventWorker()
+    worker.register(LogLevel.error, FlakySender())
+    dispatcher = Dispatcher(
+        event_worker=worker,
+        session_factory=lambda: database.create_async_session(),
+        retry_delay=0,
+    )
+
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    assert call(dispatcher.dispatch_once) == 1
+    (queued,) = call(_queued_events)
+    assert queued.attempts == 1
+    assert "telegram is down" in queued.last_error
+
+    assert call(dispatcher.dispatch_once) == 1
+    assert sent[1] is not None
+    assert call(_queued_events) == []
+
+
+def test_queued_events_keep_only_alert_fields(client: TestClient, create_test_project):
+    project = create_test_project.json()
+    body = (
+        b'{"event_id": "ev1"}\n{"type": "event"}\n'
+        b'{"exception": {"values": [{"type": "ValueError", "value": "%s"}]},'
+        b' "server_name": "web-1", "environment": "prod", "extra": {"big": "%s"}}\n'
+    ) % (b"x" * 600, b"y" * 1000)
+    client.post(
+        f"/api/{project['id']}/envelope/",
+        content=body,
+        headers={
+            "x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"
+        },
+    )
+
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    (queued,) = call(_queued_events)
+    assert queued.message == ("ValueError: " + "x" * 600)[:500]
+    assert (queued.server_name, queued.environment) == ("web-1", "prod")
+    assert not hasattr(queued, "payload")
+
+    sent: list[Event] = []
+
+    class RecordingSender(Sender):
+        async def action(self, event: Event) -> None:
+            sent.append(event)
+
+    worker = EventWorker()
+    worker.register(LogLevel.error, RecordingSender())
+    dispatcher = Dispatcher(
+        event_worker=worker,
+        session_factory=lambda: database.create_async_session(),
+    )
+    assert call(dispatcher.dispatch_once) == 1
+    (event,) = sent
+    assert event.message == queued.message
+    assert (event.server_name, event.environment) == ("web-1", "prod")
+
+
+def test_claim_locks_due_events_once(client: TestClient, create_test_project):
+    project = create_test_project.json()
+    for i in range(4):
+        client.post(
+            f"/api/{project['id']}/envelope/",
+            content=b'{"event_id": "ev%d"}\n{"type": "event"}\n{}\n' % i,
+            headers={
+                "x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"
+            },
+        )
+    now = datetime.now(UTC)
+    later = now + timedelta(minutes=1)
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    ids = [event.id for event in call(_queued_events)]
+
+    async def prepare():
+        async with database.create_async_session() as session:
+            repo = QueuedEventRepository(session)
+            await repo.retry(ids[1], "later", next_attempt_at=later)
+            await repo.fail(ids[2], "gave up")
+            await session.commit()
+
+    async def claim(at: datetime):
+        async with database.create_async_session() as session:
+            claimed = await QueuedEventRepository(session).claim(
+                limit=1, now=at, locked_until=at + timedelta(seconds=30)
+            )
+            await session.commit()
+            return claimed
+
+    call(prepare)
+    first = call(claim, now)
+    assert [event.id for event in first] == [ids[0]]
+    assert first[0].attempts == 1
+    assert [event.id for event in call(claim, now)] == [ids[3]]
+    # both claims are live, the retried event is not due yet
+    assert call(claim, now) == []
+    # the claims expired and the retry is due, the oldest comes first
+    assert [event.id for event in call(claim, later)] == [ids[0]]
+    assert [event.id for event in call(claim, later)] == [ids[1]]
+
+
+def test_dispatcher_keeps_lease_and_claims_during_slow_batch(
+    client: TestClient, create_test_project
+):
+    project = create_test_project.json()
+    client.post(
+        f"/api/{project['id']}/envelope/",
+        content=b'{"event_id": "ev1"}\n{"type": "event"}\n{"message": "boom"}\n',
+        headers={
+            "x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"
+        },
+    )
+    rival = LeaderLease(name="dispatcher", ttl=0.5, owner="rival")
+    rival_results = []
+
+    async def rival_dispatcher():
+        async with database.create_async_session() as session:
+            rival_results.append(await rival.acquire(session))
+            # what a restarted dispatcher does first
+            released = await QueuedEventRepository(session).release_claims(
+                datetime.now(UTC)
+            )
+            await session.commit()
+            rival_results.append(released)
+
+    class SlowSender(Sender):
+        async def action(self, event: Event) -> None:
+            # outlasts the lease ttl several times
+            await asyncio.sleep(1.5)
+            await rival_dispatcher()
+
+    worker = EventWorker()
+    worker.register(LogLevel.error, SlowSender())
+    dispatcher = Dispatcher(
+        event_worker=worker,
+        session_factory=lambda: database.create_async_session(),
+        lease=LeaderLease(name="dispatcher", ttl=0.5, owner="leader"),
+    )
+
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    assert call(dispatcher.dispatch_once) == 1
+    # the lease was renewed and the live claim was not released
+    assert rival_results == [False, 0]
+    assert call(_queued_events) == []
+
+
+def test_store_envelope_offloads_large_bodies(client: TestClient, create_test_project):
+    project = create_test_project.json()
+    headers = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+    offloader = client.app.state.offloader  # pyright: ignore[reportAttributeAccessIssue]
+    offloader.threshold = 100
+
+    small = b'{"event_id": "ev1"}\n{"type": "event"}\n{"message": "a"}\n'
+    large = b'{"event_id": "ev2"}\n{"type": "event"}\n{"message": "%s"}\n' % (
+        b"x" * 1000
+    )
+    for body in (small, large):
+        response = client.post(
+            f"/api/{project['id']}/envelope/", content=body, headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["envelope_id"] is not None
+
+    metrics = client.get("/health/metrics").json()
+    assert metrics["offload_mode"] == "thread"
+    assert metrics["inline"] == 1
+    assert metrics["offloaded"] == 1
+
+
+def test_app_shutdown_closes_pools():
+    app = create_app(lifespan=None)
+    with TestClient(app):
+        pass
+    for executor in (app.state.offloader.executor, app.state.hasher.executor):
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+
+
+def test_store_envelope_auth_forms(client: TestClient, create_test_project):
+    project = create_test_project.json()
+    url = f"/api/{project['id']}/envelope/"
+    body = b'{}\n{"type": "event"}\n{"message": "boom"}\n'
+
+    response = client.post(f"{url}?sentry_key={project['key']}", content=body)
+    assert response.status_code == 200
+
+    tunneled = (
+        b'{"dsn": "https://%s@sentry.example.com/%d"}\n{"type": "event"}\n{}\n'
+        % (project["key"].encode(), project["id"])
+    )
+    response = client.post(url, content=tunneled)
+    assert response.status_code == 200
+
+    headers = {"authorization": f"Sentry sentry_version=7, sentry_key={project['key']}"}
+    response = client.post(url, content=body, headers=headers)
+    assert response.status_code == 200
+
+    response = client.post(f"{url}?sentry_key={'0' * 32}", content=body)
+    assert response.status_code == 403
+    response = client.post("/api/999/envelope/", content=body, headers=headers)
+    assert response.status_code == 403
+    response = client.post(url, content=body)
+    assert response.status_code == 401
+
+
+def test_export_project_events(
+    client: TestClient, create_test_project, create_test_token
+):
+    project = create_test_project.json()
+    headers = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+    for event_id, level in (("ev1", "error"), ("ev2", "info"), ("ev3", "error")):
+        client.post(
+            f"/api/{project['id']}/envelope/",
+            content=b'{"event_id": "%s"}\n{"type": "event"}\n{"level": "%s"}\n'
+            % (event_id.encode(), level.encode()),
+            headers=headers,
+        )
+
+    url = f"/api/projects/{project['id']}/events/export"
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+
+    response = client.get(url, headers=auth | {"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["event_id"] for line in lines] == ["ev1", "ev2", "ev3"]
+
+    response = client.get(
+        url,
+        params={"level": "error", "after": lines[0]["id"]},
+        headers=auth | {"Accept-Encoding": "gzip"},
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert [json.loads(line)["event_id"] for line in response.text.splitlines()] == [
+        "ev3"
+    ]
+
+    # time bounds are read like the list endpoints, naive ones are UTC
+    client.post(
+        f"/api/{project['id']}/envelope/",
+        content=b'{"event_id": "ev4", "sent_at": "2030-01-01T00:00:00Z"}\n'
+        b'{"type": "event"}\n{"environment": "prod"}\n',
+        headers=headers,
+    )
+    for since in ("2029-12-31T23:00:00", "2030-01-01T01:00:00+02:00"):
+        for params in ({"since": since}, {"since": since, "environment": "prod"}):
+            response = client.get(url, params=params, headers=auth)
+            assert [json.loads(line)["event_id"] for line in response.text.split()] == [
+                "ev4"
+            ]
+            listed = client.get(
+                url.removesuffix("/export"), params=params, headers=auth
+            )
+            assert [e["event_id"] for e in listed.json()] == ["ev4"]
+    response = client.get(url, params={"environment": "staging"}, headers=auth)
+    assert response.text == ""
+
+
+def test_import_envelopes_bulk(client: TestClient, create_test_project):
+    project_id = create_test_project.json()["id"]
+    raw = [
+        b'{"event_id": "imp%d"}\n{"type": "event"}\n{"message": "boom"}\n' % i
+        for i in range(3)
+    ]
+    chunk = parse_chunk(project_id, "envelope", [*raw, raw[0], b"\xff"])
+
+    async def run():
+        async with database.create_async_session() as session:
+            importer = ImportEnvelopes(session=session, project_id=project_id)
+            await importer.execute(chunk)
+            return importer.stats
+
+    stats = client.portal.call(run)  # pyright: ignore[reportOptionalMemberAccess]
+    assert (stats.envelopes, stats.items, stats.duplicates) == (3, 3, 1)
+    assert stats.invalid == 1
+
+    # transactions have no envelope row, a second run must still skip them
+    transaction = (
+        b'{"event_id": "tx1"}\n{"type": "transaction"}\n'
+        b'{"event_id": "tx1", "transaction": "/index"}\n'
+    )
+    for _ in range(2):
+        chunk = parse_chunk(project_id, "envelope", [transaction])
+        stats = client.portal.call(run)  # pyright: ignore[reportOptionalMemberAccess]
+    assert (stats.transactions, stats.duplicates) == (0, 1)
+
+
+def test_import_export_lines_and_counter_only_envelopes(
+    client: TestClient, create_test_project, create_test_token
+):
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+    source = create_test_project.json()
+    client.post(
+        f"/api/{source['id']}/envelope/",
+        content=b'{"event_id": "multi"}\n{"type": "event"}\n{"message": "one"}\n'
+        b'{"type": "event"}\n{"message": "two"}\n{"type": "event"}\n{"message": "3"}\n',
+        headers={
+            "x-sentry-auth": f"Sentry sentry_key={source['key']}, sentry_version=7"
+        },
+    )
+    export = client.get(f"/api/projects/{source['id']}/events/export", headers=auth)
+    lines = export.content.splitlines()
+    assert len(lines) == 3
+
+    target = client.post(
+        "/api/v1/projects/",
+        json={"name": "Imported", "lang": "python"},
+        headers=auth,
+    ).json()
+    counters_only = (
+        b'{"event_id": "sess1"}\n{"type": "sessions"}\n'
+        b'{"aggregates": [{"started": "2023-01-01T00:00:00Z", "exited": 1}]}\n'
+    )
+    # the envelope's lines are split over two batches
+    batches = [
+        parse_chunk(target["id"], "ndjson", lines[:2]),
+        parse_chunk(target["id"], "ndjson", lines[2:]),
+        parse_chunk(target["id"], "envelope", [counters_only]),
+    ]
+
+    async def run():
+        async with database.create_async_session() as session:
+            importer = ImportEnvelopes(session=session, project_id=target["id"])
+            for batch in batches:
+                await importer.execute(batch)
+            await importer.flush()
+            return importer.stats
+
+    stats = client.portal.call(run)  # pyright: ignore[reportOptionalMemberAccess]
+    assert (stats.envelopes, stats.items, stats.duplicates) == (1, 3, 0)
+    assert stats.skipped_items == 1
+
+    events = client.get(f"/api/projects/{target['id']}/events", headers=auth).json()
+    assert [event["event_id"] for event in events] == ["multi"]
+    assert len(events[0]["items"]) == 3
+
+    async def stored_body():
+        async with database.create_async_session() as session:
+            result = await session.exec(
+                select(Envelope.payload).where(Envelope.project_id == target["id"])
+            )
+            return result.one()
+
+    body = client.portal.call(stored_body)  # pyright: ignore[reportOptionalMemberAccess]
+    envelope = unpack_sentry_envelope(body)
+    assert envelope.event_id == "multi"
+    assert [item.payload_json["message"] for item in envelope.items] == [
+        "one",
+        "two",
+        "3",
+    ]
@@ -0,0 +1,78 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from resentry.utils import jsoncodec
+from resentry.utils.jsoncodec import JSONDecodeError, OrjsonCodec, StdlibCodec
+
+
+def _orjson_codec() -> OrjsonCodec:
+    pytest.importorskip("orjson")
+    return OrjsonCodec()
+
+
+CODECS = [
+    pytest.param(StdlibCodec, id="json"),
+    pytest.param(_orjson_codec, id="orjson"),
+]
+
+
+@pytest.fixture(params=CODECS)
+def codec(request) -> jsoncodec.JSONCodec:
+    return request.param()
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"event_id": "abc", "level": "error", "tags": [["a", 1], ["b", None]]},
+        {"message": "naïve ünïcode ✓  ", "ratio": 0.5, "count": -3},
+        [1, 2.25, True, False, None, "", {}, []],
+    ],
+)
+def test_round_trip(codec, value):
+    encoded = codec.dumps(value)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == value
+    assert codec.loads(encoded.decode()) == value
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b'{"message": "bad \xff byte"}', {"message": "bad � byte"}),
+        (b"[18446744073709551616]", [1.8446744073709552e19]),
+        (b"[9223372036854775807]", [9223372036854775807]),
+        (b' {"a": 1, "a": 2}\n', {"a": 2}),
+    ],
+)
+def test_codecs_parse_alike(codec, data, expected):
+    assert codec.loads(data) == expected
+
+
+@pytest.mark.parametrize(
+    "data", [b"[NaN]", b"[-Infinity]", b"[1e400]", b"{", b"", b"\xef\xbb\xbf{}"]
+)
+def test_codecs_reject_alike(codec, data):
+    with pytest.raises(JSONDecodeError):
+        codec.loads(data)
+
+
+def test_non_str_keys(codec):
+    assert codec.loads(codec.dumps({1: "a"})) == {"1": "a"}
+
+
+def test_responses_use_the_configured_codec(client: TestClient, codec, monkeypatch):
+    calls: list[object] = []
+    dumps = codec.dumps
+
+    def counting_dumps(obj):
+        calls.append(obj)
+        return dumps(obj)
+
+    monkeypatch.setattr(codec, "dumps", counting_dumps)
+    # restored after the test
+    monkeypatch.setattr(jsoncodec, "codec", jsoncodec.codec)
+    jsoncodec.set_codec(codec)
+    response = client.get("/health/metrics")
+    assert response.status_code == 200
+    assert response.json() == calls[-1]
@@ -0,0 +1,39 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from client.loadtest import LoadTest, parse_dsn, parse_mix
+
+
+def test_parse_loadtest_options():
+    assert parse_mix("error=3,session") == {"error": 3, "session": 1}
+    with pytest.raises(ValueError):
+        parse_mix("metric=1")
+    assert parse_dsn("http://abc@localhost:8000/7") == (
+        "http://localhost:8000",
+        7,
+        "abc",
+    )
+
+
+def test_loadtest_open_loop(client: TestClient, create_test_project):
+    project = create_test_project.json()
+    test = LoadTest(
+        url="http://testserver",
+        project_id=project["id"],
+        key=project["key"],
+        mix={"error": 2, "transaction": 1, "session": 1},
+        duration=0.5,
+        rate=20,
+        compress=True,
+        transport=httpx.ASGITransport(app=client.app),
+    )
+
+    report = client.portal.call(test.run)  # pyright: ignore[reportOptionalMemberAccess]
+
+    assert report.mode == "open"
+    assert report.sent == 10
+    assert report.statuses == {200: 10}
+    assert not report.errors
+    assert sum(count for _, count in report.latency.buckets()) == 10
+    assert "Throughput" in report.lines()[1]
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from resentry.config import settings
+from resentry.core.dispatcher import Dispatcher
+from resentry.core.events import EventWorker, Sender, SlackSender, WebhookSender
+from resentry.database import database
+from resentry.domain.queue import Event, LogLevel
+from resentry.infra.delivery import CircuitOpenError, Delivery, DeliveryError
+
+
+def test_delivery_retries_and_opens_circuit():
+    calls: dict[str, int] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls[request.url.host] = calls.get(request.url.host, 0) + 1
+        status = {"down.test": 503, "gone.test": 404}.get(request.url.host, 200)
+        return httpx.Response(status)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            delivery = Delivery(client=client, retry_delay=0, failure_threshold=2)
+            for _ in range(2):
+                with pytest.raises(DeliveryError):
+                    await delivery.post("http://down.test/hook", json={})
+            # the circuit is open, nothing is sent
+            with pytest.raises(CircuitOpenError):
+                await delivery.post("http://down.test/hook", json={})
+            # client errors are not retried and concern one target only,
+            # they never open the circuit
+            for _ in range(3):
+                with pytest.raises(DeliveryError) as failed:
+                    await delivery.post("http://gone.test/hook", json={})
+                assert not failed.value.retryable
+            await delivery.post("http://up.test/hook", json={})
+            return delivery
+
+    delivery = asyncio.run(run())
+    assert calls == {"down.test": 6, "gone.test": 3, "up.test": 1}
+    assert delivery.breaker("http://down.test").open
+    assert not delivery.breaker("http://gone.test").open
+
+
+def test_delivery_limits_each_destination():
+    in_flight: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        await asyncio.sleep(0.01 if host == "slow.test" else 0)
+        in_flight[host] -= 1
+        return httpx.Response(200)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            delivery = Delivery(client=client, per_destination=2)
+            await asyncio.gather(
+                *(delivery.post("http://slow.test/", json={}) for _ in range(6)),
+                *(delivery.post("http://fast.test/", json={}) for _ in range(6)),
+            )
+
+    asyncio.run(run())
+    assert peak == {"slow.test": 2, "fast.test": 2}
+
+
+def test_dispatcher_sends_to_project_channels(
+    client: TestClient, create_test_project, create_test_token, monkeypatch
+):
+    project = create_test_project.json()
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+    url = f"/api/v1/projects/{project['id']}/channels"
+
+    response = client.post(url, json={"kind": "webhook", "target": "x"}, headers=auth)
+    assert response.status_code == 422
+    for level in ("info", "bogus"):
+        response = client.post(
+            url,
+            json={"kind": "webhook", "target": "http://hooks.test/", "level": level},
+            headers=auth,
+        )
+        assert response.status_code == 422
+    for channel in (
+        {"kind": "webhook", "target": "http://hooks.test/alerts"},
+        {"kind": "slack", "target": "http://chat.test/services/T0", "level": "Error"},
+        {"kind": "slack", "target": "http://chat.test/services/T1"},
+        {"kind": "email", "target": "ops@example.com", "enabled": False},
+    ):
+        response = client.post(url, json=channel, headers=auth)
+        assert response.status_code == 200
+    channels = client.get(url, headers=auth).json()
+    assert [c["kind"] for c in channels] == ["webhook", "slack", "slack", "email"]
+    assert channels[1]["level"] == "error"
+    # narrowing NOTIFY_LEVELS later keeps existing channels readable
+    monkeypatch.setattr(settings, "NOTIFY_LEVELS", ["fatal"])
+    assert client.get(url, headers=auth).json() == channels
+    monkeypatch.undo()
+    response = client.delete(f"{url}/{channels[2]['id']}", headers=auth)
+    assert response.status_code == 200
+    response = client.delete(f"{url}/{channels[2]['id']}", headers=auth)
+    assert response.status_code == 404
+
+    client.post(
+        f"/api/{project['id']}/envelope/",
+        content=b'{"event_id": "ev1"}\n{"type": "event"}\n{"message": "boom"}\n',
+        headers={
+            "x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"
+        },
+    )
+
+    posted: list[tuple[str, dict]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        posted.append((str(request.url), json.loads(request.content)))
+        return httpx.Response(200)
+
+    delivery = Delivery(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    worker = EventWorker()
+    worker.register_channel("webhook", WebhookSender(delivery=delivery))
+    worker.register_channel("slack", SlackSender(delivery=delivery))
+    dispatcher = Dispatcher(
+        event_worker=worker, session_factory=lambda: database.create_async_session()
+    )
+
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    assert call(dispatcher.dispatch_once) == 1
+    posted.sort()
+    assert [target for target, _ in posted] == [
+        "http://chat.test/services/T0",
+        "http://hooks.test/alerts",
+    ]
+    assert "boom" in posted[0][1]["text"]
+    assert posted[1][1]["project"]["name"] == "Test Project"
+    assert posted[1][1]["level"] == "error"
+    assert posted[1][1]["message"] == "boom"
+
+
+def test_dispatcher_retries_only_failed_destinations(
+    client: TestClient, create_test_project, create_test_token
+):
+    project = create_test_project.json()
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+    url = f"/api/v1/projects/{project['id']}/channels"
+    for target in ("http://gone.test/hook", "http://flaky.test/hook"):
+        client.post(url, json={"kind": "webhook", "target": target}, headers=auth)
+    client.post(
+        f"/api/{project['id']}/envelope/",
+        content=b'{"event_id": "ev1"}\n{"type": "event"}\n{"message": "boom"}\n',
+        headers={
+            "x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"
+        },
+    )
+
+    telegram: list[int] = []
+    posted: list[str] = []
+
+    class TelegramStandIn(Sender):
+        async def action(self, event: Event) -> None:
+            telegram.append(event.event_id)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        posted.append(request.url.host)
+        if request.url.host == "gone.test":
+            return httpx.Response(404)
+        # flaky.test is down for the first dispatch
+        return httpx.Response(503 if posted.count("flaky.test") == 1 else 200)
+
+    delivery = Delivery(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), retries=0
+    )
+    worker = EventWorker()
+    worker.register(LogLevel.error, TelegramStandIn())
+    worker.register_channel("webhook", WebhookSender(delivery=delivery))
+    dispatcher = Dispatcher(
+        event_worker=worker,
+        session_factory=lambda: database.create_async_session(),
+        retry_delay=0,
+    )
+
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    assert call(dispatcher.dispatch_once) == 1
+    assert call(dispatcher.dispatch_once) == 1
+    assert call(dispatcher.dispatch_once) == 0
+    # the 404 is dropped after one try, only the 503 is retried
+    assert len(telegram) == 1
+    assert sorted(posted) == ["flaky.test", "flaky.test", "gone.test"]
+
+
+def test_dispatcher_keeps_events_while_circuit_is_open(
+    client: TestClient, create_test_project, create_test_token
+):
+    project = create_test_project.json()
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+    client.post(
+        f"/api/v1/projects/{project['id']}/channels",
+        json={"kind": "webhook", "target": "http://hooks.test/alerts"},
+        headers=auth,
+    )
+    client.post(
+        f"/api/{project['id']}/envelope/",
+        content=b'{"event_id": "ev1"}\n{"type": "event"}\n{"message": "boom"}\n',
+        headers={
+            "x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"
+        },
+    )
+
+    posted: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        posted.append(request.url.host)
+        return httpx.Response(200)
+
+    delivery = Delivery(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        failure_threshold=1,
+        reset_timeout=0.2,
+    )
+    # another channel on the host just failed
+    delivery.breaker("http://hooks.test").failure()
+    worker = EventWorker()
+    worker.register_channel("webhook", WebhookSender(delivery=delivery))
+    dispatcher = Dispatcher(
+        event_worker=worker,
+        session_factory=lambda: database.create_async_session(),
+        retry_delay=0,
+    )
+
+    call = client.portal.call  # pyright: ignore[reportOptionalMemberAccess]
+    assert call(dispatcher.dispatch_once) == 1
+    # not dropped: retried once the circuit lets a trial call through
+    assert call(dispatcher.dispatch_once) == 0
+    time.sleep(0.3)
+    assert call(dispatcher.dispatch_once) == 1
+    assert posted == ["hooks.test"]
+    assert call(dispatcher.dispatch_once) == 0
@@ -82,3 +82,38 @@ def test_delete_project(client: TestClient, create_test_token):
     )
     assert response.status_code == 200
     assert response.json()["message"] == "Project deleted successfully"
+
+
+def test_project_rules(client: TestClient, create_test_token):
+    token = create_test_token()
+    auth = {"Authorization": f"Bearer {token}"}
+    project_id = client.post(
+        "/api/v1/projects/",
+        json={"name": "Test Project", "lang": "python"},
+        headers=auth,
+    ).json()["id"]
+
+    response = client.post(
+        f"/api/v1/projects/{project_id}/rules",
+        json={"action": "sample", "sample_rate": 0.1, "item_type": "transaction"},
+        headers=auth,
+    )
+    assert response.status_code == 200
+    rule_id = response.json()["id"]
+
+    # sample rules need a rate and message must be a valid regex
+    for body in ({"action": "sample"}, {"action": "drop", "message": "(unclosed"}):
+        response = client.post(
+            f"/api/v1/projects/{project_id}/rules", json=body, headers=auth
+        )
+        assert response.status_code == 422
+
+    response = client.get(f"/api/v1/projects/{project_id}/rules", headers=auth)
+    assert [rule["id"] for rule in response.json()] == [rule_id]
+
+    response = client.delete(
+        f"/api/v1/projects/{project_id}/rules/{rule_id}", headers=auth
+    )
+    assert response.status_code == 200
+    response = client.get(f"/api/v1/projects/{project_id}/rules", headers=auth)
+    assert response.json() == []
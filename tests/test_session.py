@@ -0,0 +1,97 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from resentry.database import database
+from resentry.database.models.envelope import Envelope
+from resentry.database.session import on_commit
+
+
+@pytest.fixture
+def sessions(client: TestClient, monkeypatch):
+    """Counts the sessions opened and the commits issued by requests."""
+    counts = {"opened": 0, "commits": 0}
+    create = database.create_async_session
+
+    def counting_create():
+        counts["opened"] += 1
+        return create()
+
+    def count_commit(session: Session) -> None:
+        counts["commits"] += 1
+
+    monkeypatch.setattr(database, "create_async_session", counting_create)
+    event.listen(Session, "after_commit", count_commit)
+    yield counts
+    event.remove(Session, "after_commit", count_commit)
+
+
+def test_rejected_ingest_opens_no_session(
+    client: TestClient, create_test_token, sessions
+):
+    token = create_test_token()
+    project = client.post(
+        "/api/v1/projects/",
+        json={"name": "Noisy Project", "lang": "python", "rate_limit_events": 1},
+        headers={"Authorization": f"Bearer {token}"},
+    ).json()
+    url = f"/api/{project['id']}/envelope/"
+    headers = {"x-sentry-auth": f"Sentry sentry_key={project['key']}, sentry_version=7"}
+    # the first envelope loads the project keys and rules into their caches
+    for i in range(2):
+        body = b'{"event_id": "%d"}\n{"type": "event"}\n{}\n' % i
+        assert client.post(url, content=body, headers=headers).status_code == 200
+
+    sessions["opened"] = 0
+    response = client.post(url, content=b"{}\n", headers=headers)
+    assert response.status_code == 429
+    forbidden = {"x-sentry-auth": f"Sentry sentry_key={'0' * 32}, sentry_version=7"}
+    response = client.post(url, content=b"{}\n", headers=forbidden)
+    assert response.status_code == 403
+    assert sessions["opened"] == 0
+
+
+def test_read_only_request_never_commits(
+    client: TestClient, create_test_project, create_test_token, sessions
+):
+    project = create_test_project.json()
+    auth = {"Authorization": f"Bearer {create_test_token()}"}
+    sessions.update(opened=0, commits=0)
+
+    response = client.get(f"/api/v1/projects/{project['id']}", headers=auth)
+    assert response.status_code == 200
+    response = client.get(f"/api/projects/{project['id']}/events", headers=auth)
+    assert response.status_code == 200
+    assert sessions["opened"] == 2
+    assert sessions["commits"] == 0
+
+
+def test_on_commit_runs_only_after_commit(client: TestClient, create_test_project):
+    project = create_test_project.json()
+    ran: list[str] = []
+
+    async def run():
+        async with database.create_async_session() as session:
+            session.add(Envelope(project_id=project["id"], payload=b"{}", event_id="a"))
+            on_commit(session, lambda: ran.append("rolled back"))
+            await session.flush()
+            await session.rollback()
+            assert ran == []
+
+            session.add(Envelope(project_id=project["id"], payload=b"{}", event_id="a"))
+            on_commit(session, lambda: ran.append("committed"))
+            await session.commit()
+            assert ran == ["committed"]
+
+            # a failing commit drops its hooks
+            session.add(Envelope(project_id=project["id"], payload=b"{}", event_id="a"))
+            on_commit(session, lambda: ran.append("duplicate"))
+            with pytest.raises(IntegrityError):
+                await session.commit()
+            await session.rollback()
+            await session.commit()
+
+    client.portal.call(run)  # pyright: ignore[reportOptionalMemberAccess]
+    assert ran == ["committed"]